@@ -1,19 +1,58 @@
+import asyncio
+import json
+import os
+from datetime import datetime
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.models.schemas import SearchRequest, SearchResponse
-from app.services.naver_search import search_naver_view
-from app.services.sheet_checker import (
-    check_sheet_exposure,
-    start_check_in_background,
-    task_state,
-)
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from app.models.schemas import BatchExposureRequest, DeepExposureRequest, SearchRequest, SearchResponse
+from app.services.admission import exposure_admission, Overloaded
+from app.services.egress import get_egress_pool
+from app.services.fetch_engine import check_deep_exposure_async, check_exposure_async, iter_exposure_async
+from app.services.job_events import event_bus, state_snapshot
+from app.services.job_manager import job_manager, ACTIVE_STATUSES
+from app.services.job_store import get_job_store
+from app.services.naver_search import DEEP_RANK_PAGES
+from app.services.rank_history import get_rank_history, volatility
+from app.services.scheduler import parse_clock
+from app.services.sheet_checker import SHEET_NAME, SPREADSHEET_ID
 
 router = APIRouter()
 
+# 배치 요청 하나에 넣을 수 있는 최대 쌍 수
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', '5000'))
+
+# SSE 연결 유지용 주석 전송 간격 (초)
+SSE_PING_INTERVAL = 15
+# 다른 프로세스에서 실행 중인 작업의 상태를 저장소에서 다시 읽는 간격 (초)
+STORED_JOB_POLL_INTERVAL = 1.0
+
 
 class SheetCheckRequest(BaseModel):
     start_date: str  # 시작일 (월/일 형식: 1/1)
     end_date: str    # 종료일 (월/일 형식: 1/31)
+    spreadsheet_id: Optional[str] = None  # 없으면 기본 스프레드시트
+    sheet_name: Optional[str] = None      # 없으면 기본 탭 (발행)
+    recheck: bool = False                 # 이미 결과가 있는 행도 순위 이력 우선순위대로 다시 체크
+    recheck_limit: Optional[int] = None   # 다시 체크할 때 검색할 키워드 수 상한
+
+
+class ScheduleRequest(BaseModel):
+    start_date: Optional[str] = None      # 고정 기간 시작일 (월/일), 또는
+    end_date: Optional[str] = None        # 고정 기간 종료일 (월/일)
+    days: Optional[int] = None            # 오늘까지 최근 며칠
+    start_at: str = "00:00"               # 매일 시작 시각
+    finish_by: Optional[str] = None       # 완료 목표 시각 (없으면 나누지 않고 바로 실행)
+    spreadsheet_id: Optional[str] = None  # 없으면 기본 스프레드시트
+    sheet_name: Optional[str] = None      # 없으면 기본 탭 (발행)
+    recheck: bool = False                 # 이미 결과가 있는 행도 순위 이력 우선순위대로 다시 체크
+    recheck_limit: Optional[int] = None   # 다시 체크할 때 검색할 키워드 수 상한
+
+
+class ResumeRequest(BaseModel):
+    job_id: Optional[str] = None  # 없으면 가장 최근에 중단된 작업
 
 
 @router.post("/check-exposure", response_model=SearchResponse)
@@ -26,57 +65,331 @@ async def check_exposure(request: SearchRequest) -> SearchResponse:
     if not request.blog_url.strip():
         raise HTTPException(status_code=400, detail="블로그 URL을 입력해주세요.")
 
-    result = search_naver_view(request.keyword.strip(), request.blog_url.strip())
+    try:
+        async with exposure_admission.admit():
+            result = await check_exposure_async(request.keyword.strip(), request.blog_url.strip())
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message,
+                            headers={"Retry-After": str(e.retry_after)})
 
     return result
 
 
+@router.post("/check-exposure/deep", response_model=SearchResponse)
+async def check_exposure_deep(request: DeepExposureRequest) -> SearchResponse:
+    """
+    깊은 노출 순위 확인 API
+    통합 검색 첫 페이지에 없으면 블로그 탭을 여러 페이지 동시에 넘겨보며 위치(페이지, 영역) 확인
+    """
+
+    if not request.keyword.strip():
+        raise HTTPException(status_code=400, detail="키워드를 입력해주세요.")
+
+    if not request.blog_url.strip():
+        raise HTTPException(status_code=400, detail="블로그 URL을 입력해주세요.")
+
+    try:
+        async with exposure_admission.admit():
+            result = await check_deep_exposure_async(request.keyword.strip(), request.blog_url.strip(),
+                                                     request.pages or DEEP_RANK_PAGES)
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message,
+                            headers={"Retry-After": str(e.retry_after)})
+
+    return result
+
+
+@router.post("/check-exposure/batch")
+async def check_exposure_batch(request: BatchExposureRequest):
+    """
+    여러 (키워드, 블로그 URL) 노출 확인 API
+    끝나는 순서대로 한 줄에 하나씩 JSON으로 전송 (application/x-ndjson, index는 요청 목록의 순번)
+    """
+
+    if not request.items:
+        raise HTTPException(status_code=400, detail="확인할 항목을 입력해주세요.")
+
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {BATCH_MAX_ITEMS}개까지 확인할 수 있습니다.")
+
+    pairs = [(item.keyword.strip(), item.blog_url.strip()) for item in request.items]
+    exclude = None if request.include_results else {"results"}
+
+    async def stream():
+        async for index, result in iter_exposure_async(pairs):
+            line = {"index": index, **result.model_dump(exclude=exclude)}
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post("/check-sheet")
-async def check_sheet(request: SheetCheckRequest):
-    """구글 시트 기간별 노출 체크 API (백그라운드 실행)"""
+def check_sheet(request: SheetCheckRequest):
+    """구글 시트 기간별 노출 체크 API (작업 대기열에 등록 후 백그라운드 실행)"""
 
     if not request.start_date.strip() or not request.end_date.strip():
         raise HTTPException(status_code=400, detail="시작일과 종료일을 입력해주세요.")
 
-    if task_state["status"] in ("running", "paused"):
-        raise HTTPException(status_code=409, detail="이미 실행 중인 작업이 있습니다.")
+    start_date = request.start_date.strip()
+    end_date = request.end_date.strip()
+    spreadsheet_id = (request.spreadsheet_id or "").strip() or SPREADSHEET_ID
+    sheet_name = (request.sheet_name or "").strip() or SHEET_NAME
+
+    # 같은 시트/기간 작업이 이미 진행 중이면 중복 실행하지 않음
+    active = job_manager.find_active(spreadsheet_id, sheet_name, start_date, end_date)
+    if active:
+        raise HTTPException(status_code=409, detail=f"같은 기간의 작업이 이미 실행 중입니다. (작업 ID: {active['job_id']})")
+
+    state = job_manager.submit(start_date, end_date, spreadsheet_id, sheet_name,
+                               recheck=request.recheck, recheck_limit=request.recheck_limit)
+
+    message = "노출 체크가 시작되었습니다." if state["status"] == "running" else "노출 체크가 대기열에 등록되었습니다."
+    return {"success": True, "job_id": state["job_id"], "status": state["status"], "message": message}
+
+
+@router.post("/resume")
+def resume_check(request: ResumeRequest):
+    """중단된 노출 체크 작업 이어서 실행 (완료된 행은 다시 검색하지 않음)"""
 
-    start_check_in_background(request.start_date.strip(), request.end_date.strip())
+    if request.job_id and job_manager.is_active(request.job_id):
+        raise HTTPException(status_code=409, detail="이미 실행 중인 작업입니다.")
 
-    return {"success": True, "message": "노출 체크가 시작되었습니다."}
+    state = job_manager.resume(request.job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="이어서 실행할 작업이 없습니다.")
+
+    return {"success": True, "job_id": state["job_id"], "status": state["status"], "message": "노출 체크를 이어서 시작합니다."}
+
+
+def _get_job_state(job_id: Optional[str]) -> dict:
+    """작업 ID로 진행 상태 조회 (없으면 404)"""
+    state = job_manager.get(job_id) if job_id else job_manager.latest()
+    if not state:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return state
+
+
+@router.get("/jobs")
+def list_jobs():
+    """전체 작업 목록"""
+    return {"jobs": job_manager.list()}
 
 
 @router.get("/status")
-async def get_status():
-    """현재 작업 상태 반환"""
+def get_status(job_id: Optional[str] = None):
+    """작업 상태 반환 (job_id가 없으면 가장 최근 작업)"""
+    state = _get_job_state(job_id)
     return {
-        "status": task_state["status"],
-        "current": task_state["current"],
-        "total": task_state["total"],
-        "message": task_state["message"],
-        "result": task_state["result"],
+        "status": state["status"],
+        "current": state["current"],
+        "total": state["total"],
+        "message": state["message"],
+        "result": state["result"],
+        "job_id": state["job_id"],
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 한 개"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _is_finished(data: dict) -> bool:
+    """작업이 끝났고 최종 결과까지 나온 상태인지"""
+    return data["status"] not in ACTIVE_STATUSES and data["result"] is not None
+
+
+@router.get("/events")
+async def job_events(job_id: str):
+    """작업 진행 상황 스트림 (Server-Sent Events: progress / row)"""
+    state = await run_in_threadpool(_get_job_state, job_id)
+
+    if not job_manager.is_local(job_id):
+        return StreamingResponse(
+            _stored_job_stream(job_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # 스냅샷보다 먼저 구독해야 그 사이 이벤트를 놓치지 않음
+    queue = event_bus.subscribe(job_id)
+
+    async def stream():
+        try:
+            snapshot = state_snapshot(state)
+            yield _sse("progress", snapshot)
+            if _is_finished(snapshot):
+                return
+
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_PING_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+
+                yield _sse(event, data)
+                if event == "progress" and _is_finished(data):
+                    return
+        finally:
+            event_bus.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stored_job_stream(job_id: str):
+    """다른 프로세스에서 실행 중인 작업: 저장소 상태를 주기적으로 읽어서 바뀔 때만 progress 전송"""
+    last = None
+    idle = 0.0
+    while True:
+        snapshot = state_snapshot(await run_in_threadpool(job_manager.get, job_id))
+        if snapshot != last:
+            yield _sse("progress", snapshot)
+            last = snapshot
+            idle = 0.0
+            if _is_finished(snapshot):
+                return
+        elif idle >= SSE_PING_INTERVAL:
+            yield ": ping\n\n"
+            idle = 0.0
+        await asyncio.sleep(STORED_JOB_POLL_INTERVAL)
+        idle += STORED_JOB_POLL_INTERVAL
+
+
+@router.get("/workers")
+def list_workers():
+    """작업 저장소의 행 큐를 처리 중인 작업 프로세스 목록"""
+    return {"workers": get_job_store().live_workers()}
+
+
+@router.get("/egress")
+async def list_egress_routes():
+    """검색 요청 경로별 상태 (건강 점수, 요청 수, 차단기, 속도 제한)"""
+    return {"routes": get_egress_pool().snapshot()}
+
+
+def _day_timestamp(value: Optional[str], name: str) -> Optional[float]:
+    """YYYY-MM-DD → 그날 0시 (로컬 시간) 타임스탬프 (잘못된 형식이면 400)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip(), "%Y-%m-%d").timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name}은 YYYY-MM-DD 형식으로 입력해주세요.")
+
+
+@router.get("/rank-history")
+def rank_history(link: Optional[str] = None, keyword: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None, limit: int = 1000):
+    """
+    글/키워드별 순위 이력 (start ~ end 날짜 포함, YYYY-MM-DD)
+    글+키워드마다 시간순 기록과 최근/최고 순위, 변동폭 반환 (순위 null은 노출 안됨)
+    """
+    if not (link or "").strip() and not (keyword or "").strip():
+        raise HTTPException(status_code=400, detail="블로그 URL 또는 키워드를 입력해주세요.")
+
+    end_at = _day_timestamp(end, "종료일")
+    records = get_rank_history().history(
+        link=(link or "").strip() or None,
+        keyword=(keyword or "").strip() or None,
+        start=_day_timestamp(start, "시작일"),
+        end=end_at + 24 * 3600 if end_at is not None else None,  # 종료일 포함
+        limit=max(1, min(limit, 10000)),
+    )
+
+    series = {}
+    for record in reversed(records):
+        entry = series.setdefault((record["post"], record["keyword"]), {
+            "post": record["post"], "keyword": record["keyword"], "link": record["link"], "points": [],
+        })
+        entry["points"].append({"rank": record["rank"], "checked_at": record["checked_at"], "job_id": record["job_id"]})
+
+    for entry in series.values():
+        ranks = [point["rank"] for point in entry["points"]]
+        exposed = [rank for rank in ranks if rank is not None]
+        entry.update(
+            last_rank=ranks[-1],
+            best_rank=min(exposed) if exposed else None,
+            volatility=round(volatility(ranks), 2),
+        )
+    return {"series": list(series.values()), "records": len(records)}
+
+
+@router.get("/schedules")
+def list_schedules():
+    """반복 작업 목록"""
+    return {"schedules": get_job_store().list_schedules()}
+
+
+@router.post("/schedules")
+def create_schedule(request: ScheduleRequest):
+    """반복 작업 등록 (매일 시작 시각부터 완료 목표 시각까지 나눠서 노출 체크)"""
+
+    fixed = bool((request.start_date or "").strip() and (request.end_date or "").strip())
+    if fixed == bool(request.days):
+        raise HTTPException(status_code=400, detail="고정 기간(시작일/종료일)과 최근 며칠 중 하나만 입력해주세요.")
+    if request.days is not None and request.days < 1:
+        raise HTTPException(status_code=400, detail="최근 며칠은 1 이상이어야 합니다.")
+    try:
+        parse_clock(request.start_at)
+        if request.finish_by:
+            parse_clock(request.finish_by)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="시각은 HH:MM 형식으로 입력해주세요.")
+
+    params = {
+        "spreadsheet_id": (request.spreadsheet_id or "").strip() or SPREADSHEET_ID,
+        "sheet_name": (request.sheet_name or "").strip() or SHEET_NAME,
+        "start_at": request.start_at.strip(),
+        "finish_by": (request.finish_by or "").strip() or None,
     }
+    if fixed:
+        params.update(start_date=request.start_date.strip(), end_date=request.end_date.strip())
+    else:
+        params["days"] = request.days
+    if request.recheck:
+        params.update(recheck=True, recheck_limit=request.recheck_limit)
+
+    schedule_id = get_job_store().create_schedule(params)
+    return {"success": True, "schedule_id": schedule_id, "params": params}
+
+
+@router.post("/schedules/{schedule_id}/enabled")
+def set_schedule_enabled(schedule_id: str, enabled: bool):
+    """반복 작업 켜기 / 끄기"""
+    if not get_job_store().set_schedule_enabled(schedule_id, enabled):
+        raise HTTPException(status_code=404, detail="반복 작업을 찾을 수 없습니다.")
+    return {"success": True, "schedule_id": schedule_id, "enabled": enabled}
+
+
+@router.delete("/schedules/{schedule_id}")
+def delete_schedule(schedule_id: str):
+    """반복 작업 삭제 (이미 실행 중인 회차 작업은 그대로 진행)"""
+    if not get_job_store().delete_schedule(schedule_id):
+        raise HTTPException(status_code=404, detail="반복 작업을 찾을 수 없습니다.")
+    return {"success": True, "schedule_id": schedule_id}
 
 
 @router.post("/pause")
-async def toggle_pause():
+def toggle_pause(job_id: str):
     """일시정지 / 재개 토글"""
-    if task_state["status"] == "running":
-        task_state["status"] = "paused"
-        task_state["message"] = "일시정지됨"
-        return {"success": True, "status": "paused"}
-    elif task_state["status"] == "paused":
-        task_state["status"] = "running"
-        return {"success": True, "status": "running"}
-    else:
+    _get_job_state(job_id)
+
+    status = job_manager.toggle_pause(job_id)
+    if not status:
         raise HTTPException(status_code=400, detail="실행 중인 작업이 없습니다.")
+    return {"success": True, "job_id": job_id, "status": status}
 
 
 @router.post("/stop")
-async def stop_task():
+def stop_task(job_id: str):
     """작업 중단"""
-    if task_state["status"] in ("running", "paused"):
-        task_state["status"] = "stopped"
-        return {"success": True, "message": "중단 요청됨"}
-    else:
+    _get_job_state(job_id)
+
+    if not job_manager.stop(job_id):
         raise HTTPException(status_code=400, detail="실행 중인 작업이 없습니다.")
+    return {"success": True, "job_id": job_id, "message": "중단 요청됨"}
@@ -1,10 +1,14 @@
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from pathlib import Path
 
 from app.api.routes import router as api_router
+from app.services.fetch_engine import get_engine
+from app.services.metrics import render_metrics
+from app.services.scheduler import get_scheduler
+from app.services.sheet_checker import get_row_worker
 
 app = FastAPI(
     title="네이버 블로그 노출 체크",
@@ -21,6 +25,26 @@ templates = Jinja2Templates(directory=BASE_DIR / "templates")
 app.include_router(api_router, prefix="/api", tags=["검색"])
 
 
+@app.on_event("startup")
+def start_row_worker():
+    """행 큐 작업자 시작 (프로세스마다 하나, 모든 프로세스의 작업을 나눠서 처리)"""
+    get_row_worker().start()
+
+
+@app.on_event("startup")
+def start_scheduler():
+    """반복 노출 체크 스케줄러 시작 (회차는 저장소에서 가져가므로 여러 프로세스에서 떠도 하루 한 번)"""
+    get_scheduler().start()
+
+
+@app.on_event("shutdown")
+def shutdown_engine():
+    """스케줄러 정지 + 처리 중인 행 반납 + 검색 엔진 커넥션 풀 정리"""
+    get_scheduler().stop()
+    get_row_worker().stop()
+    get_engine().close()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """메인 페이지"""
@@ -31,3 +55,10 @@ async def index(request: Request):
 async def health_check():
     """헬스 체크"""
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus 지표"""
+    body, content_type = render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
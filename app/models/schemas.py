@@ -7,6 +7,15 @@ class SearchRequest(BaseModel):
     blog_url: str = Field(..., min_length=1, description="확인할 블로그 URL (예: blog.naver.com/myblog)")
 
 
+class DeepExposureRequest(SearchRequest):
+    pages: Optional[int] = Field(default=None, ge=1, le=20, description="넘겨볼 블로그 탭 페이지 수 (없으면 기본값)")
+
+
+class BatchExposureRequest(BaseModel):
+    items: list[SearchRequest] = Field(..., description="확인할 (키워드, 블로그 URL) 목록")
+    include_results: bool = Field(default=False, description="줄마다 전체 검색 결과 목록 포함 여부")
+
+
 class BlogResult(BaseModel):
     rank: int = Field(..., description="검색 결과 순위")
     title: str = Field(..., description="블로그 글 제목")
@@ -21,7 +30,11 @@ class SearchResponse(BaseModel):
     keyword: str = Field(..., description="검색한 키워드")
     is_exposed: bool = Field(default=False, description="블로그 노출 여부")
     exposed_rank: Optional[int] = Field(default=None, description="노출된 순위 (없으면 None)")
+    exposed_page: Optional[int] = Field(default=None, description="노출된 페이지 (깊은 순위 확인에서만)")
+    exposed_section: Optional[str] = Field(default=None, description="노출된 영역 (integrated: 통합 검색, blog: 블로그 탭)")
     exposed_result: Optional[BlogResult] = Field(default=None, description="노출된 결과 상세 정보")
     total_results: int = Field(default=0, description="전체 검색 결과 수")
     results: list[BlogResult] = Field(default=[], description="전체 검색 결과 목록")
     message: str = Field(default="", description="상태 메시지")
+    cached: bool = Field(default=False, description="캐시된 검색 결과 사용 여부")
+    cache_age: Optional[float] = Field(default=None, description="캐시된 결과가 저장된 지 지난 시간 (초)")
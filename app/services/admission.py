@@ -0,0 +1,89 @@
+"""
+API 요청 수용 제어 (동시 처리 수 제한 + 대기열)
+
+처리 중인 요청이 한도에 차면 대기열에서 기다리고,
+대기열도 가득 차면 기다리지 않고 바로 거절해서 응답 지연이 끝없이 늘어나지 않게 한다.
+"""
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+
+# 동시에 처리할 /check-exposure 요청 수
+EXPOSURE_MAX_IN_FLIGHT = int(os.environ.get('EXPOSURE_MAX_IN_FLIGHT', '8'))
+# 처리 슬롯을 기다릴 수 있는 요청 수 (넘으면 429)
+EXPOSURE_MAX_WAITING = int(os.environ.get('EXPOSURE_MAX_WAITING', '32'))
+# 대기열에서 기다리는 최대 시간 (초, 넘으면 503)
+EXPOSURE_WAIT_TIMEOUT = float(os.environ.get('EXPOSURE_WAIT_TIMEOUT', '30'))
+
+
+class Overloaded(Exception):
+    """요청을 받을 수 없음 (status_code: 429 대기열 가득 참 / 503 대기 시간 초과)"""
+
+    def __init__(self, status_code: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """동시 처리 수 제한 + 길이 제한이 있는 대기열"""
+
+    def __init__(self, max_in_flight: int, max_waiting: int, wait_timeout: float):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_waiting = max(0, max_waiting)
+        self.wait_timeout = wait_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._avg_seconds = 1.0  # 요청당 평균 처리 시간 (Retry-After 계산용)
+
+    def retry_after(self) -> int:
+        """지금 대기열이 비워질 때까지 걸릴 것으로 보이는 시간 (초)"""
+        backlog = (self.waiting + self.in_flight) / self.max_in_flight
+        return max(1, math.ceil(backlog * self._avg_seconds))
+
+    def _reject(self, status_code: int, message: str):
+        self.rejected += 1
+        raise Overloaded(status_code, message, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self):
+        """처리 슬롯 하나 확보 (못 받으면 Overloaded)"""
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self._reject(429, "요청이 많아 잠시 후 다시 시도해주세요.")
+
+        self.waiting += 1
+        try:
+            # wait_for는 acquire가 끝난 직후 시간이 초과되면 슬롯을 돌려주지 않고 잃어버릴 수 있음 (3.11)
+            # timeout 안에서 직접 await하면 취소될 때 Semaphore.acquire가 받은 슬롯을 돌려줌
+            async with asyncio.timeout(self.wait_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self._reject(503, "처리 대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - start)
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_in_flight": self.max_in_flight,
+            "max_waiting": self.max_waiting,
+        }
+
+
+exposure_admission = AdmissionController(EXPOSURE_MAX_IN_FLIGHT, EXPOSURE_MAX_WAITING, EXPOSURE_WAIT_TIMEOUT)
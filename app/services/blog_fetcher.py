@@ -3,17 +3,60 @@
 """
 import requests
 from bs4 import BeautifulSoup
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
+from app.services.metrics import observe_cache, observe_fetch, POST_LOOKUP_SECONDS
+from app.services.rate_limiter import limiter_for_url
+from app.services.serp_archive import archive_page_later
+
+# 글 목록/RSS 주소 (벤치마크 등에서 로컬 대체 서버로 바꿀 때 사용)
+NAVER_BLOG_URL = os.environ.get('NAVER_BLOG_URL', 'https://blog.naver.com')
+NAVER_RSS_URL = os.environ.get('NAVER_RSS_URL', 'https://rss.blog.naver.com')
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
+# 블로그별 글 목록 캐시 (유지 시간 초, 최대 블로그 수)
+POST_CACHE_TTL = float(os.environ.get('POST_CACHE_TTL', '600'))
+POST_CACHE_SIZE = int(os.environ.get('POST_CACHE_SIZE', '256'))
+
+# 제목이 길 때 비교할 앞부분 길이
+TITLE_PREFIX_LEN = 20
+
+
+def _get(url: str, headers: dict) -> requests.Response:
+    """호스트별 속도 제한을 거쳐 GET 요청 (응답 결과를 속도 제한기에 알림: 정상 / 차단 / 오류)"""
+    limiter = limiter_for_url(url)
+    limiter.acquire()
+
+    start = time.perf_counter()
+    try:
+        response = requests.get(url, headers=headers, timeout=10)
+    except requests.RequestException:
+        observe_fetch(limiter.name, time.perf_counter() - start, 0, "error")
+        raise
+
+    blocked = response.status_code in (403, 429)
+    outcome = "blocked" if blocked else "ok" if response.status_code < 400 else "error"
+    observe_fetch(limiter.name, time.perf_counter() - start, len(response.content), outcome)
+    if blocked:
+        limiter.record_block()
+    elif response.status_code < 400:
+        limiter.record_success()
+    else:
+        limiter.record_error(response.status_code)
+
+    return response
+
 
 def get_blog_posts(blog_id: str) -> list:
     """블로그의 최근 글 목록 가져오기"""
 
     # 블로그 글 목록 페이지
-    url = f"https://blog.naver.com/PostList.naver?blogId={blog_id}&categoryNo=0&from=postList"
+    url = f"{NAVER_BLOG_URL}/PostList.naver?blogId={blog_id}&categoryNo=0&from=postList"
 
     headers = {
         "User-Agent": USER_AGENT,
@@ -23,7 +66,7 @@ def get_blog_posts(blog_id: str) -> list:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = _get(url, headers)
         response.raise_for_status()
 
         soup = BeautifulSoup(response.text, 'lxml')
@@ -55,7 +98,7 @@ def get_blog_posts(blog_id: str) -> list:
 def get_blog_posts_rss(blog_id: str) -> list:
     """RSS 피드로 블로그 글 목록 가져오기"""
 
-    url = f"https://rss.blog.naver.com/{blog_id}.xml"
+    url = f"{NAVER_RSS_URL}/{blog_id}.xml"
 
     headers = {
         "User-Agent": USER_AGENT,
@@ -63,8 +106,9 @@ def get_blog_posts_rss(blog_id: str) -> list:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = _get(url, headers)
         response.raise_for_status()
+        archive_page_later("rss", blog_id, response.content)
 
         # lxml-xml 파서 사용
         soup = BeautifulSoup(response.text, 'lxml-xml')
@@ -115,13 +159,85 @@ def normalize_title(title: str) -> str:
     return title.lower()
 
 
-def find_post_by_title(blog_id: str, target_title: str) -> Optional[str]:
-    """블로그에서 제목이 일치하는 글 찾기"""
+class PostIndex:
+    """블로그 한 곳의 글 목록 색인 (정규화한 제목 → 글 URL)"""
+
+    def __init__(self, posts: list):
+        self.posts = [(normalize_title(post['title']), post['url']) for post in posts]
+        self.exact = {}   # 정규화 제목 전체
+        self.prefix = {}  # 정규화 제목 앞 20자 (긴 제목만)
+
+        for normalized, url in self.posts:
+            self.exact.setdefault(normalized, url)
+            if len(normalized) > TITLE_PREFIX_LEN:
+                self.prefix.setdefault(normalized[:TITLE_PREFIX_LEN], url)
+
+    def find(self, target_normalized: str) -> Optional[str]:
+        """정규화한 제목으로 글 URL 찾기 (완전 일치 → 앞 20자 일치 → 부분 일치 순)"""
+        url = self.exact.get(target_normalized)
+        if url:
+            return url
+
+        if len(target_normalized) > TITLE_PREFIX_LEN:
+            url = self.prefix.get(target_normalized[:TITLE_PREFIX_LEN])
+            if url:
+                return url
+
+        # 부분 일치 (제목 일부만 입력했거나 글 제목이 더 짧은 경우)
+        for normalized, url in self.posts:
+            if target_normalized in normalized or normalized in target_normalized:
+                return url
 
-    if not target_title.strip():
         return None
 
-    target_normalized = normalize_title(target_title)
+
+class PostIndexCache:
+    """blog_id별 PostIndex 캐시 (TTL 만료 + LRU 제거, 스레드 안전)"""
+
+    def __init__(self, ttl: float = POST_CACHE_TTL, max_size: int = POST_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # blog_id → (저장 시각, PostIndex)
+        self._lock = threading.Lock()
+
+    def get(self, blog_id: str) -> Optional[PostIndex]:
+        with self._lock:
+            entry = self._entries.get(blog_id)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(blog_id)
+                self.hits += 1
+                observe_cache("post_index", "hit")
+                return entry[1]
+
+            if entry:
+                del self._entries[blog_id]
+            self.misses += 1
+            observe_cache("post_index", "miss")
+            return None
+
+    def put(self, blog_id: str, index: PostIndex):
+        with self._lock:
+            self._entries[blog_id] = (time.monotonic(), index)
+            self._entries.move_to_end(blog_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+post_index_cache = PostIndexCache()
+
+
+def get_post_index(blog_id: str) -> PostIndex:
+    """블로그 글 목록 색인 (캐시에 없을 때만 네트워크 요청)"""
+
+    index = post_index_cache.get(blog_id)
+    if index:
+        return index
 
     # RSS 먼저 시도 (더 정확함)
     posts = get_blog_posts_rss(blog_id)
@@ -130,19 +246,25 @@ def find_post_by_title(blog_id: str, target_title: str) -> Optional[str]:
         # RSS 실패하면 HTML 파싱
         posts = get_blog_posts(blog_id)
 
-    for post in posts:
-        post_normalized = normalize_title(post['title'])
+    index = PostIndex(posts)
 
-        # 제목 일치 확인 (부분 일치도 허용)
-        if target_normalized in post_normalized or post_normalized in target_normalized:
-            return post['url']
+    # 가져오기에 실패한 경우는 캐시하지 않음 (다음 요청에서 재시도)
+    if posts:
+        post_index_cache.put(blog_id, index)
 
-        # 앞 20자 비교 (제목이 길 경우)
-        if len(target_normalized) > 20 and len(post_normalized) > 20:
-            if target_normalized[:20] == post_normalized[:20]:
-                return post['url']
+    return index
 
-    return None
+
+def find_post_by_title(blog_id: str, target_title: str) -> Optional[str]:
+    """블로그에서 제목이 일치하는 글 찾기"""
+
+    if not target_title.strip():
+        return None
+
+    start = time.perf_counter()
+    url = get_post_index(blog_id).find(normalize_title(target_title))
+    POST_LOOKUP_SECONDS.labels("yes" if url else "no").observe(time.perf_counter() - start)
+    return url
 
 
 def extract_blog_id(url: str) -> Optional[str]:
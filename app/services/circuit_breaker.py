@@ -0,0 +1,169 @@
+"""
+호스트별 차단 회로 차단기 (closed → open → half-open)
+
+차단/캡차 응답이 연달아 오면 일정 시간 동안 그 호스트로의 요청을 모두 멈추고,
+시간이 지나면 요청 하나만 보내 확인(probe)한 뒤 정상이면 다시 연다.
+확인 요청도 차단되면 멈추는 시간을 두 배로 늘린다.
+"""
+import asyncio
+import os
+import threading
+import time
+
+from app.services.metrics import BREAKER_OPEN, BREAKER_TRIPS
+
+# 연속 차단 응답 몇 번이면 멈출지
+BREAKER_THRESHOLD = int(os.environ.get('BREAKER_THRESHOLD', '3'))
+# 처음 멈추는 시간 / 최대 (초)
+BREAKER_COOLDOWN = float(os.environ.get('BREAKER_COOLDOWN', '60'))
+BREAKER_MAX_COOLDOWN = float(os.environ.get('BREAKER_MAX_COOLDOWN', '900'))
+
+# 확인 요청 중일 때 다른 요청이 기다리는 시간 / 확인 요청 응답을 기다리는 최대 시간 (초)
+PROBE_WAIT = 1.0
+PROBE_TIMEOUT = 30.0
+
+
+class CircuitOpenError(Exception):
+    """차단기가 열려 있어 요청을 보내지 않음"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"{host} 요청 일시 중단 ({retry_after:.0f}초 후 재시도)")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """호스트 하나의 차단기 (스레드 안전)"""
+
+    def __init__(self, name: str, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN,
+                 max_cooldown: float = BREAKER_MAX_COOLDOWN):
+        self.name = name
+        self.threshold = max(1, threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.trips = 0
+
+        self._cooldown = cooldown
+        self._consecutive = 0
+        self._open_until = 0.0
+        self._probe_started = None  # half-open 확인 요청 시작 시각
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._open_until == 0.0:
+                return "closed"
+            return "open" if time.monotonic() < self._open_until else "half_open"
+
+    def remaining(self) -> float:
+        """열려 있는 남은 시간 (초, 확인 요청 상태는 제외)"""
+        with self._lock:
+            return max(0.0, self._open_until - time.monotonic()) if self._open_until else 0.0
+
+    def _wait_time(self, now: float) -> float:
+        """지금 요청하려면 기다려야 할 시간 (_lock을 잡고 호출)"""
+        if self._open_until == 0.0:
+            return 0.0
+        if now < self._open_until:
+            return self._open_until - now
+
+        # half-open: 확인 요청 하나만 통과
+        if self._probe_started is None or now - self._probe_started > PROBE_TIMEOUT:
+            return 0.0
+        return PROBE_WAIT
+
+    def pending(self) -> float:
+        """try_pass와 같은 기준의 대기 시간 (확인 요청 자리는 가져가지 않음)"""
+        with self._lock:
+            return self._wait_time(time.monotonic())
+
+    def try_pass(self) -> float:
+        """요청을 보내도 되면 0, 아니면 기다려야 할 시간(초)"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._wait_time(now)
+            if wait == 0 and self._open_until:
+                self._probe_started = now
+            return wait
+
+    def check(self):
+        """요청 전 확인 (열려 있으면 CircuitOpenError)"""
+        wait = self.try_pass()
+        if wait > 0:
+            raise CircuitOpenError(self.name, wait)
+
+    def wait(self):
+        """요청을 보내도 될 때까지 대기 (일반 스레드용)"""
+        while (wait := self.try_pass()) > 0:
+            time.sleep(wait)
+
+    async def wait_async(self):
+        while (wait := self.try_pass()) > 0:
+            await asyncio.sleep(wait)
+
+    def _stale(self) -> bool:
+        """
+        열려 있는데 확인 요청이 없음 → 지금 들어온 응답은 열리기 전에 보낸 요청의 늦은 응답
+        (열린 뒤로는 확인 요청만 보내므로, 호출할 때 _lock을 잡고 있어야 함)
+        """
+        return self._open_until != 0.0 and self._probe_started is None
+
+    def record_success(self):
+        """정상 응답 → 닫힘 (열려 있으면 확인 요청의 성공만 반영)"""
+        with self._lock:
+            if self._stale():
+                return
+            self._consecutive = 0
+            if self._open_until:
+                self._open_until = 0.0
+                self._probe_started = None
+                self._cooldown = self.base_cooldown
+                BREAKER_OPEN.labels(self.name).set(0)
+
+    def record_block(self, trip: bool = False):
+        """
+        차단 응답 → 연속 횟수가 기준을 넘거나 확인 요청이 차단되면 열림 (이미 열려 있으면 무시)
+        trip이면 연속 횟수와 상관없이 바로 열림 (호출한 쪽에서 이미 기준을 센 경우)
+        """
+        with self._lock:
+            if self._stale():
+                return
+            self._consecutive += 1
+            probing = self._probe_started is not None
+            if not probing and not trip and self._consecutive < self.threshold:
+                return
+            if probing:
+                self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+
+            self._open_until = time.monotonic() + self._cooldown
+            self._probe_started = None
+            self.trips += 1
+            BREAKER_TRIPS.labels(self.name).inc()
+            BREAKER_OPEN.labels(self.name).set(1)
+            print(f"차단 감지 ({self.name}): {self._cooldown:.0f}초 동안 요청 중단")
+
+    def record_error(self):
+        """차단이 아닌 실패 (네트워크 오류 등) → 확인 요청이었다면 다음 요청이 다시 확인"""
+        with self._lock:
+            self._probe_started = None
+
+    def snapshot(self) -> dict:
+        remaining = self.remaining()
+        with self._lock:
+            return {"trips": self.trips, "consecutive_blocks": self._consecutive,
+                    "cooldown": self._cooldown, "remaining": round(remaining, 1)}
+
+
+_breakers: dict = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    """호스트별 공유 차단기"""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
@@ -0,0 +1,563 @@
+"""
+비동기 검색 엔진 (커넥션 풀 공유 + 전역 동시 요청 수 제한)
+"""
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+import httpx
+
+from app.models.schemas import BlogResult, SearchResponse
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.egress import EgressRoute, get_egress_pool
+from app.services.naver_search import (
+    BLOCK_CHECK_BYTES,
+    DEEP_RANK_PAGE_SIZE,
+    DEEP_RANK_PAGES,
+    SERP_MAX_RANK,
+    STREAM_CHUNK_SIZE,
+    BlockedError,
+    build_blog_tab_url,
+    build_search_url,
+    deep_rank_response,
+    check_search_response,
+    get_headers,
+    is_blocked_response,
+    match_exposure,
+    parse_blog_results,
+)
+from app.services.metrics import observe_cache, observe_fetch
+from app.services.rate_limiter import SEARCH_HOST
+from app.services.serp_archive import archive_page, blog_tab_key, get_archive
+from app.services.serp_parser import RankFinder, extract_post_id
+
+# 동시에 진행할 수 있는 검색 요청 수 (모든 작업/API 요청 합산)
+FETCH_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', '4'))
+FETCH_TIMEOUT = float(os.environ.get('FETCH_TIMEOUT', '10'))
+# 키워드별 검색 결과 캐시 (초, 0이면 캐시 안 함)
+SERP_CACHE_TTL = float(os.environ.get('SERP_CACHE_TTL', '300'))
+SERP_CACHE_SIZE = int(os.environ.get('SERP_CACHE_SIZE', '512'))
+
+_DONE = object()
+
+
+def cache_key(keyword: str) -> str:
+    """같은 검색어로 볼 키워드 (앞뒤/중복 공백 무시)"""
+    return " ".join(keyword.split())
+
+
+class SerpCache:
+    """
+    키워드별 파싱된 검색 결과 캐시 (TTL 만료 + LRU 제거, 스레드 안전)
+    순위만 확인한 결과는 (키워드, 찾는 글, 최대 순위) 키로 같이 보관
+    """
+
+    def __init__(self, ttl: float = SERP_CACHE_TTL, max_size: int = SERP_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()  # 캐시 키 → (저장 시각, 결과)
+        self._lock = threading.Lock()
+
+    def get(self, key, count_miss: bool = True) -> Optional[tuple]:
+        """
+        (결과, 저장 후 지난 초) 또는 None
+        count_miss=False면 없어도 miss로 세지 않음 (새로 요청할지 진행 중인 요청에 합류할지 호출한 쪽에서 count)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                age = time.monotonic() - entry[0]
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    observe_cache("serp", "hit")
+                    return entry[1], age
+                del self._entries[key]
+
+        if count_miss:
+            self.count("miss")
+        return None
+
+    def count(self, result: str):
+        """캐시에 없던 조회 기록 (miss: 새로 요청 / coalesced: 진행 중인 같은 키워드 요청에 합류)"""
+        with self._lock:
+            if result == "coalesced":
+                self.coalesced += 1
+            else:
+                self.misses += 1
+        observe_cache("serp", result)
+
+    def put(self, key, results):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FetchEngine:
+    """
+    전용 이벤트 루프 스레드에서 httpx 커넥션 풀을 유지하는 검색 엔진
+
+    - 시트 작업(일반 스레드)과 API(FastAPI 이벤트 루프)가 같은 풀과 동시성 제한을 공유
+    - keep-alive 연결을 재사용하므로 요청마다 TLS 핸드셰이크를 반복하지 않음
+    - 검색 요청은 경로 풀(egress)에서 고른 경로의 클라이언트로 보냄 (경로마다 커넥션 풀)
+    """
+
+    def __init__(self, concurrency: int = FETCH_CONCURRENCY, timeout: float = FETCH_TIMEOUT):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients = {}  # 경로 이름 → httpx.AsyncClient
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self.cache = SerpCache()
+        self._inflight = {}  # 캐시 키 → [진행 중인 요청 Task, 기다리는 요청 수] (엔진 루프 안에서만 사용)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """엔진 전용 이벤트 루프 스레드 시작 (최초 1회)"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="fetch-engine", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def _submit(self, coro) -> concurrent.futures.Future:
+        """코루틴을 엔진 루프에서 실행하고 스레드 안전한 Future 반환"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """전역 동시 요청 수 제한 (엔진 루프 안에서만 호출)"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def _get_client(self, route: EgressRoute) -> httpx.AsyncClient:
+        """경로별 풀링된 HTTP 클라이언트 (엔진 루프 안에서만 호출)"""
+        client = self._clients.get(route.name)
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            )
+            client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True, **route.httpx_options(limits))
+            self._clients[route.name] = client
+        return client
+
+    async def _fetch_page(self, keyword: str) -> str:
+        """
+        검색 페이지 HTML 요청 (엔진 루프에서 실행)
+        모든 경로가 차단 감지로 멈춘 동안은 기다리지 않고 CircuitOpenError, 차단 응답이면 BlockedError
+        """
+        pool = get_egress_pool()
+        pool.check()
+
+        async with self._get_semaphore():
+            # 경로 선택 + 그 경로의 속도 제한 대기 (기다리는 사이 차단된 경로는 다시 고름)
+            route = await pool.acquire_async()
+            client = self._get_client(route)
+
+            start = time.perf_counter()
+            try:
+                response = await client.get(build_search_url(keyword), headers=get_headers())
+            except httpx.HTTPError:
+                observe_fetch(SEARCH_HOST, time.perf_counter() - start, 0, "error")
+                route.record_error()
+                raise
+            html = response.text
+
+            blocked = is_blocked_response(response.status_code, html)
+            observe_fetch(SEARCH_HOST, time.perf_counter() - start, len(response.content),
+                          "blocked" if blocked else "ok" if response.status_code < 400 else "error")
+            check_search_response(response.status_code, html, str(response.url), route)
+
+            response.raise_for_status()
+            self._archive_later(keyword, response.content)
+            return html
+
+    async def _fetch_results(self, keyword: str) -> list[BlogResult]:
+        """검색 페이지 요청 + 파싱 (엔진 루프에서 실행)"""
+        html = await self._fetch_page(keyword)
+
+        # 파싱은 CPU 작업이므로 루프를 막지 않도록 별도 스레드에서
+        return await asyncio.to_thread(parse_blog_results, html)
+
+    async def _fetch_ranks(self, keyword: str, target_ids, max_rank: int, page: int = 0) -> tuple:
+        """
+        검색 페이지를 받는 대로 파싱하면서 찾는 글들의 순위만 확인 (엔진 루프에서 실행)
+        다 찾거나 max_rank를 넘으면 연결을 끊고 나머지는 받지 않음 (조각 파싱은 짧아서 루프에서 바로)
+        page가 0이면 통합 검색, 1 이상이면 블로그 탭의 그 페이지 (순위는 페이지 안에서의 순서)
+        반환: ({포스트 ID: 순위}, 확인한 블로그 글 수)
+        """
+        url = build_blog_tab_url(keyword, page) if page else build_search_url(keyword)
+        pool = get_egress_pool()
+        pool.check()
+
+        async with self._get_semaphore():
+            route = await pool.acquire_async()
+            client = self._get_client(route)
+
+            start = time.perf_counter()
+            size = 0
+            outcome = "error"
+            try:
+                async with client.stream("GET", url, headers=get_headers()) as response:
+                    chunks = response.aiter_bytes(STREAM_CHUNK_SIZE)
+
+                    # 차단 페이지 확인은 앞부분만으로
+                    head = b""
+                    async for chunk in chunks:
+                        head += chunk
+                        if len(head) >= BLOCK_CHECK_BYTES:
+                            break
+                    size = len(head)
+                    text = head.decode('utf-8', errors='replace')  # 검색 페이지는 UTF-8
+
+                    outcome = ("blocked" if is_blocked_response(response.status_code, text)
+                               else "ok" if response.status_code < 400 else "error")
+                    check_search_response(response.status_code, text, str(response.url), route)
+                    response.raise_for_status()
+
+                    finder = RankFinder(target_ids, max_rank)
+                    parts = [head]
+                    if not finder.feed(head):
+                        async for chunk in chunks:
+                            size += len(chunk)
+                            parts.append(chunk)
+                            if finder.feed(chunk):
+                                break
+
+                    # 원본 보관을 켠 경우에만 나머지도 받음 (파싱은 하지 않음, 끝까지 받으므로 응답을 끊는 절약은 없음)
+                    if get_archive() is not None:
+                        async for chunk in chunks:
+                            size += len(chunk)
+                            parts.append(chunk)
+                        if page:
+                            self._archive_later(blog_tab_key(keyword, page), b"".join(parts), "blog_tab")
+                        else:
+                            self._archive_later(keyword, b"".join(parts))
+                    return finder.close(), finder.count
+            except httpx.HTTPStatusError:
+                raise
+            except httpx.HTTPError:
+                route.record_error()
+                raise
+            finally:
+                observe_fetch(SEARCH_HOST, time.perf_counter() - start, size, outcome)
+
+    def _archive_later(self, keyword: str, content: bytes, kind: str = "search"):
+        """원본 보관은 루프를 막지 않도록 스레드 풀에서 (결과를 기다리지 않음)"""
+        asyncio.get_running_loop().run_in_executor(None, archive_page, kind, keyword, content, time.time())
+
+    async def _deep_ranks(self, keyword: str, target_ids, pages: int) -> dict:
+        """
+        통합 검색 + 블로그 탭 1~pages페이지를 동시에 요청해서 찾는 글들의 위치 확인 (엔진 루프에서 실행)
+        - 요청은 전역 동시성 한도와 경로별 속도 제한을 그대로 거침 (앞 페이지부터 차례로 나감)
+        - 통합 검색에 있으면 그 순위, 없으면 블로그 탭에서 찾은 위치
+        - 모든 글의 위치가 정해지면 남은 페이지 요청은 취소 (아직 보내지 않은 요청은 보내지 않음)
+        - 찾지 못한 글이 있는데 실패한 페이지가 있으면 그 오류 (노출 안됨으로 볼 수 없음)
+        반환: {포스트 ID: {"rank", "page", "section", "page_rank"}} (찾지 못한 글은 없음)
+        """
+        targets = {post_id for post_id in target_ids if post_id}
+        if not targets:
+            return {}
+
+        tasks = {asyncio.ensure_future(self._fetch_ranks(keyword, targets, SERP_MAX_RANK)): 0}
+        for page in range(1, pages + 1):
+            tasks[asyncio.ensure_future(self._fetch_ranks(keyword, targets, 0, page))] = page
+
+        integrated = None  # 통합 검색 결과 {포스트 ID: 순위} (끝나기 전에는 None)
+        blog = {}          # 포스트 ID → 블로그 탭 위치
+        errors = []
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = tasks[task]
+                    try:
+                        ranks, _ = task.result()
+                    except Exception as e:
+                        errors.append(e)
+                        ranks = {}
+
+                    if page == 0:
+                        integrated = ranks
+                        continue
+                    for post_id, page_rank in ranks.items():
+                        # 같은 글이 여러 페이지에 있으면 앞 페이지
+                        if post_id not in blog or page < blog[post_id]["page"]:
+                            blog[post_id] = {
+                                "rank": (page - 1) * DEEP_RANK_PAGE_SIZE + page_rank,
+                                "page": page,
+                                "section": "blog",
+                                "page_rank": page_rank,
+                            }
+
+                # 통합 검색에서 찾았거나, 통합 검색에 없고 블로그 탭에서 찾은 뒤 그보다 앞 페이지가 다 끝난 글은 위치가 정해짐
+                waiting = [tasks[task] for task in pending if tasks[task]]
+                if integrated is not None and all(
+                        post_id in integrated or (post_id in blog and all(page > blog[post_id]["page"] for page in waiting))
+                        for post_id in targets):
+                    break
+                # 블로그 탭에서 다 찾았으면 찾은 페이지보다 뒤 페이지는 필요 없음 (통합 검색과 앞 페이지만 기다림)
+                if targets <= set(blog):
+                    last = max(blog[post_id]["page"] for post_id in targets)
+                    for task in [task for task in pending if tasks[task] > last]:
+                        task.cancel()
+                        pending.discard(task)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        positions = {}
+        for post_id in targets:
+            if integrated and post_id in integrated:
+                positions[post_id] = {"rank": integrated[post_id], "page": 1,
+                                      "section": "integrated", "page_rank": integrated[post_id]}
+            elif post_id in blog:
+                positions[post_id] = blog[post_id]
+        if errors and len(positions) < len(targets):
+            raise errors[0]
+        return positions
+
+    def find_deep_ranks_sync(self, keyword: str, target_ids, pages: int = DEEP_RANK_PAGES) -> dict:
+        """찾는 글들의 통합 검색/블로그 탭 위치 (일반 스레드용) → {포스트 ID: 위치}"""
+        return self._submit(self._deep_ranks(keyword, target_ids, pages)).result()
+
+    async def deep_ranks(self, keyword: str, target_ids, pages: int = DEEP_RANK_PAGES) -> dict:
+        """찾는 글들의 통합 검색/블로그 탭 위치 (어느 이벤트 루프에서든 await 가능)"""
+        return await asyncio.wrap_future(self._submit(self._deep_ranks(keyword, target_ids, pages)))
+
+    def find_ranks_sync(self, keyword: str, target_ids, max_rank: int = SERP_MAX_RANK) -> tuple:
+        """
+        찾는 글들의 순위만 확인 (일반 스레드용) → ({포스트 ID: 순위}, 확인한 블로그 글 수)
+        같은 키워드/찾는 글 조합이면 캐시 → 진행 중인 요청 순서로 재사용
+        """
+        return self._submit(self._ranks(keyword, target_ids, max_rank)).result()
+
+    def fetch_page_sync(self, keyword: str) -> str:
+        """검색 페이지 HTML만 가져오기 (일반 스레드용, 파싱은 호출한 쪽에서)"""
+        return self._submit(self._fetch_page(keyword)).result()
+
+    async def _search(self, keyword: str) -> tuple:
+        """
+        캐시 → 진행 중인 같은 키워드 요청 → 새 요청 순서로 결과 확보 (엔진 루프에서 실행)
+        반환: (결과 목록, 캐시된 지 지난 초 또는 새로 가져왔으면 None)
+        """
+        key = cache_key(keyword)
+        cached = self.cache.get(key, count_miss=False)
+        if cached:
+            return cached
+        return await self._shared(key, lambda: self._fetch_results(keyword)), None
+
+    async def _ranks(self, keyword: str, target_ids, max_rank: int) -> tuple:
+        """순위만 확인하는 요청을 (키워드, 찾는 글, 최대 순위) 단위로 캐시 / 합류 (엔진 루프에서 실행)"""
+        key = (cache_key(keyword), frozenset(filter(None, target_ids)), max_rank)
+        cached = self.cache.get(key, count_miss=False)
+        if cached:
+            return cached[0]
+        return await self._shared(key, lambda: self._fetch_ranks(keyword, target_ids, max_rank))
+
+    async def _shared(self, key, fetch):
+        """
+        진행 중인 같은 key 요청이 있으면 합류, 없으면 fetch()로 새 요청 (엔진 루프에서 실행)
+        기다리던 요청이 모두 취소되면 (반복 중단, 클라이언트 연결 끊김) 검색 요청도 취소
+        """
+        entry = self._inflight.get(key)
+        if entry is None:
+            self.cache.count("miss")
+            task = asyncio.ensure_future(fetch())
+            entry = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._fetch_done(key, done))
+        else:
+            self.cache.count("coalesced")
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # 기다리던 요청 하나가 취소되어도 같이 기다리는 요청은 계속 받을 수 있게
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                self._inflight.pop(key, None)
+                task.cancel()
+
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        """요청 완료: 진행 목록에서 빼고 성공한 결과만 캐시"""
+        entry = self._inflight.get(key)
+        if entry and entry[0] is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self.cache.put(key, task.result())
+
+    async def search_with_age(self, keyword: str) -> tuple:
+        """(결과 목록, 캐시 나이 초 또는 None) (어느 이벤트 루프에서든 await 가능)"""
+        return await asyncio.wrap_future(self._submit(self._search(keyword)))
+
+    async def search(self, keyword: str) -> list[BlogResult]:
+        """키워드 검색 결과 (어느 이벤트 루프에서든 await 가능)"""
+        results, _ = await self.search_with_age(keyword)
+        return results
+
+    def search_sync(self, keyword: str) -> list[BlogResult]:
+        """키워드 검색 결과 (일반 스레드용, 완료까지 대기)"""
+        return self._submit(self._search(keyword)).result()[0]
+
+    def iter_search(self, keywords: Iterable[str]) -> Iterator[tuple]:
+        """
+        여러 키워드를 동시성 한도만큼 미리 요청해두고 완료 순서대로
+        (키워드, 결과 목록, 오류) 튜플 반환. 중간에 반복을 멈추면 남은 요청은 취소됨.
+        """
+        keyword_iter = iter(keywords)
+        pending = {}
+
+        try:
+            while True:
+                while len(pending) < self.concurrency:
+                    keyword = next(keyword_iter, _DONE)
+                    if keyword is _DONE:
+                        break
+                    pending[self._submit(self._search(keyword))] = keyword
+
+                if not pending:
+                    return
+
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    keyword = pending.pop(future)
+                    try:
+                        yield keyword, future.result()[0], None
+                    except Exception as e:
+                        yield keyword, [], e
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _close(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def close(self):
+        """커넥션 풀 정리"""
+        if self._loop is not None:
+            self._submit(self._close()).result()
+
+
+_engine: Optional[FetchEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> FetchEngine:
+    """프로세스 전역 검색 엔진"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+        return _engine
+
+
+def _exposure_response(keyword: str, blog_url: str, results: list[BlogResult], age: Optional[float]) -> SearchResponse:
+    response = match_exposure(keyword, blog_url, results)
+    if age is not None:
+        response.cached = True
+        response.cache_age = round(age, 1)
+    return response
+
+
+def _error_response(keyword: str, error: Exception) -> SearchResponse:
+    """검색 실패 → 실패 응답"""
+    if isinstance(error, (BlockedError, CircuitOpenError)):
+        message = f"{str(error)}. 잠시 후 다시 시도해주세요."
+    elif isinstance(error, httpx.TimeoutException):
+        message = "요청 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+    elif isinstance(error, httpx.HTTPError):
+        message = f"네트워크 오류가 발생했습니다: {str(error)}"
+    else:
+        message = f"오류가 발생했습니다: {str(error)}"
+    return SearchResponse(success=False, keyword=keyword, message=message)
+
+
+async def check_exposure_async(keyword: str, blog_url: str) -> SearchResponse:
+    """search_naver_view의 비동기 버전 (공유 엔진 사용)"""
+
+    try:
+        results, age = await get_engine().search_with_age(keyword)
+        return _exposure_response(keyword, blog_url, results, age)
+    except Exception as e:
+        return _error_response(keyword, e)
+
+
+async def check_deep_exposure_async(keyword: str, blog_url: str, pages: int = DEEP_RANK_PAGES) -> SearchResponse:
+    """통합 검색에 없으면 블로그 탭 pages페이지까지 넘겨보며 노출 위치 확인 (공유 엔진 사용)"""
+
+    target_post_id = extract_post_id(blog_url)
+    if not target_post_id:
+        return deep_rank_response(keyword, None, pages)
+    try:
+        positions = await get_engine().deep_ranks(keyword, [target_post_id], pages)
+        return deep_rank_response(keyword, positions.get(target_post_id), pages)
+    except Exception as e:
+        return _error_response(keyword, e)
+
+
+async def iter_exposure_async(pairs: list[tuple]) -> AsyncIterator[tuple]:
+    """
+    여러 (키워드, 블로그 URL) 쌍의 노출 확인
+    - 같은 키워드는 한 번만 검색하고, 엔진 동시성 한도만큼만 요청을 띄워둠
+    - 키워드 검색이 끝나는 순서대로 (입력 순번, SearchResponse) 반환
+    """
+    groups = OrderedDict()  # 키워드 → [(순번, 키워드, 블로그 URL)]
+    for index, (keyword, blog_url) in enumerate(pairs):
+        groups.setdefault(cache_key(keyword), []).append((index, keyword, blog_url))
+
+    engine = get_engine()
+    keys = iter(list(groups))
+    pending = {}
+
+    try:
+        while True:
+            while len(pending) < engine.concurrency:
+                key = next(keys, _DONE)
+                if key is _DONE:
+                    break
+                pending[asyncio.ensure_future(engine.search_with_age(key))] = key
+
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                key = pending.pop(task)
+                try:
+                    results, age = task.result()
+                    error = None
+                except Exception as e:
+                    results, age, error = [], None, e
+
+                for index, keyword, blog_url in groups.pop(key):
+                    if error is None:
+                        yield index, _exposure_response(keyword, blog_url, results, age)
+                    else:
+                        yield index, _error_response(keyword, error)
+    finally:
+        # 연결이 끊기면 남은 검색 취소
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,77 @@
+"""
+작업 진행 이벤트 전달 (작업 스레드 → SSE 연결)
+
+작업은 일반 스레드에서 돌고 SSE 연결은 이벤트 루프에서 기다리므로,
+구독자마다 (루프, 큐)를 등록해두고 call_soon_threadsafe로 넣어준다.
+"""
+import asyncio
+import threading
+
+# 구독자 큐 크기 (느린 클라이언트는 오래된 이벤트부터 버림)
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# 진행 상태 이벤트에 담는 필드
+STATE_FIELDS = ("job_id", "status", "current", "total", "message", "result", "queues")
+
+
+def state_snapshot(state: dict) -> dict:
+    """진행 상태 dict → 이벤트로 보낼 값"""
+    return {field: state.get(field) for field in STATE_FIELDS}
+
+
+def _offer(queue: asyncio.Queue, item):
+    """큐에 넣기 (가득 차면 가장 오래된 이벤트를 버림, 루프 안에서 실행)"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+class JobEventBus:
+    """작업 ID별 구독자 목록"""
+
+    def __init__(self):
+        self._subscribers = {}  # job_id → {(loop, queue)}
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """현재 이벤트 루프에서 받을 큐 등록"""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add(entry)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        with self._lock:
+            entries = self._subscribers.get(job_id, set())
+            for entry in [entry for entry in entries if entry[1] is queue]:
+                entries.discard(entry)
+            if not entries:
+                self._subscribers.pop(job_id, None)
+
+    def publish(self, job_id: str, event: str, data: dict):
+        """어느 스레드에서든 호출 가능"""
+        with self._lock:
+            entries = list(self._subscribers.get(job_id, ()))
+
+        for loop, queue in entries:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, (event, data))
+            except RuntimeError:
+                # 연결이 끊겨 루프가 닫힌 경우
+                self.unsubscribe(job_id, queue)
+
+
+event_bus = JobEventBus()
+
+
+def publish_state(state: dict):
+    """진행 상태 변경 알림"""
+    if state.get("job_id"):
+        event_bus.publish(state["job_id"], "progress", state_snapshot(state))
+
+
+def publish_row(state: dict, row: dict):
+    """행 하나의 결과 알림"""
+    if state.get("job_id"):
+        event_bus.publish(state["job_id"], "row", row)
@@ -0,0 +1,242 @@
+"""
+노출 체크 작업 관리 (작업 ID, 대기열, 작업별 상태/일시정지/중단)
+
+여러 기간/스프레드시트 작업을 동시에 실행할 수 있고,
+모든 작업은 같은 검색 엔진과 호스트별 속도 제한을 공유한다.
+노출 체크 행은 작업 저장소의 행 큐를 거쳐 모든 프로세스의 행 작업자가 나눠서 처리하므로,
+다른 프로세스에서 시작한 작업도 저장소 상태로 조회/일시정지/중단할 수 있다.
+"""
+import os
+import threading
+from collections import deque, OrderedDict
+from typing import Optional
+
+from app.services.job_events import publish_state
+from app.services.job_store import get_job_store, RESUMABLE_STATUSES
+from app.services.sheet_checker import (
+    check_sheet_exposure,
+    new_task_state,
+    SHEET_NAME,
+    SPREADSHEET_ID,
+)
+
+# 동시에 실행할 작업 수 (나머지는 대기열에서 기다림)
+MAX_RUNNING_JOBS = int(os.environ.get('MAX_RUNNING_JOBS', '2'))
+# 메모리에 남겨둘 끝난 작업 수
+MAX_FINISHED_JOBS = 50
+
+ACTIVE_STATUSES = ("queued", "running", "paused")
+
+
+class JobManager:
+    """작업 대기열 + 작업별 진행 상태"""
+
+    def __init__(self, max_running: int = MAX_RUNNING_JOBS):
+        self.max_running = max(1, max_running)
+        self._jobs = OrderedDict()  # job_id → {"state": ..., "params": ...}
+        self._queue = deque()
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def submit(self, start_date: str, end_date: str, spreadsheet_id: str = SPREADSHEET_ID,
+               sheet_name: str = SHEET_NAME, job_id: Optional[str] = None,
+               deadline: Optional[float] = None, recheck: bool = False,
+               recheck_limit: Optional[int] = None) -> dict:
+        """
+        작업 등록 (job_id를 주면 저장소의 작업을 이어서 실행). 진행 상태 반환.
+        deadline(완료 목표 시각)을 주면 그때까지 나눠서 체크하며, 대부분 기다리는 작업이라 실행 슬롯을 쓰지 않고 바로 시작
+        recheck면 이미 결과가 있는 행도 순위 이력 우선순위대로 다시 체크 (recheck_limit: 검색할 키워드 수 상한)
+        """
+        params = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "spreadsheet_id": spreadsheet_id,
+            "sheet_name": sheet_name,
+        }
+        if deadline:
+            params["deadline"] = deadline
+        if recheck:
+            params.update(recheck=True, recheck_limit=recheck_limit)
+        store = get_job_store()
+        if job_id is None:
+            job_id = store.create_job(params)
+        store.set_status(job_id, "queued")
+        store.hold(job_id)  # 대기열에서 오래 기다려도 종료된 작업으로 보이지 않도록
+
+        state = new_task_state(job_id)
+        state["status"] = "queued"
+        state["message"] = "대기 중..."
+
+        with self._lock:
+            self._jobs[job_id] = {"state": state, "params": params}
+            if deadline:
+                self._start(job_id)
+            else:
+                self._queue.append(job_id)
+            self._trim()
+        self._start_next()
+        return state
+
+    def resume(self, job_id: Optional[str] = None) -> Optional[dict]:
+        """중단된 작업 이어서 실행 (job_id가 없으면 가장 최근에 중단된 작업)"""
+        store = get_job_store()
+        job = store.get_job(job_id) if job_id else store.latest_resumable()
+        if not job or job["status"] not in RESUMABLE_STATUSES or self.is_active(job["id"]):
+            return None
+
+        params = job["params"]
+        return self.submit(
+            params["start_date"],
+            params["end_date"],
+            params.get("spreadsheet_id", SPREADSHEET_ID),
+            params.get("sheet_name", SHEET_NAME),
+            job_id=job["id"],
+            deadline=params.get("deadline"),
+            recheck=params.get("recheck", False),
+            recheck_limit=params.get("recheck_limit"),
+        )
+
+    def _start_next(self):
+        """실행 슬롯이 비어 있으면 대기열의 다음 작업 시작"""
+        with self._lock:
+            while self._queue and len(self._running) < self.max_running:
+                job_id = self._queue.popleft()
+                job = self._jobs[job_id]
+                if job["state"]["status"] == "stopped":
+                    continue
+                self._running.add(job_id)
+                self._start(job_id)
+
+    def _start(self, job_id: str):
+        """작업 실행 스레드 시작 (lock 안에서 호출)"""
+        job = self._jobs[job_id]
+        job["state"]["status"] = "running"
+        publish_state(job["state"])
+        thread = threading.Thread(target=self._run, args=(job_id,), daemon=True)
+        thread.start()
+
+    def _run(self, job_id: str):
+        job = self._jobs[job_id]
+        params = job["params"]
+        try:
+            check_sheet_exposure(
+                params["start_date"],
+                params["end_date"],
+                job_id=job_id,
+                state=job["state"],
+                spreadsheet_id=params["spreadsheet_id"],
+                sheet_name=params["sheet_name"],
+                deadline=params.get("deadline"),
+                recheck=params.get("recheck", False),
+                recheck_limit=params.get("recheck_limit"),
+            )
+        finally:
+            get_job_store().release(job_id)
+            with self._lock:
+                self._running.discard(job_id)
+            self._start_next()
+
+    def _trim(self):
+        """끝난 작업이 너무 많으면 오래된 것부터 정리 (lock 안에서 호출)"""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job["state"]["status"] not in ACTIVE_STATUSES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job:
+            return job["state"]
+        stored = get_job_store().get_job(job_id)
+        return self._stored_state(stored) if stored else None
+
+    def is_local(self, job_id: str) -> bool:
+        """이 프로세스에서 시작한 작업인지"""
+        return job_id in self._jobs
+
+    def _stored_state(self, job: dict) -> dict:
+        """다른 프로세스의 작업 → 저장소 기록으로 만든 진행 상태"""
+        counts = get_job_store().row_counts(job["id"])
+        state = new_task_state(job["id"])
+        state.update(
+            status=job["status"],
+            total=sum(n for status, n in counts.items() if status != "skipped"),
+            current=counts.get("done", 0),
+            message="다른 프로세스에서 실행 중..." if job["status"] in ACTIVE_STATUSES else "",
+            result=job["result"],
+        )
+        return state
+
+    def latest(self) -> Optional[dict]:
+        """가장 최근에 등록된 작업"""
+        with self._lock:
+            if not self._jobs:
+                return None
+            return next(reversed(self._jobs.values()))["state"]
+
+    def list(self) -> list:
+        """이 프로세스의 작업 + 다른 프로세스에서 실행 중인 작업"""
+        with self._lock:
+            jobs = [dict(job["state"], params=job["params"]) for job in self._jobs.values()]
+        jobs += [dict(self._stored_state(job), params=job["params"])
+                 for job in get_job_store().active_jobs() if not self.is_local(job["id"])]
+        return jobs
+
+    def is_active(self, job_id: str) -> bool:
+        state = self.get(job_id)
+        return bool(state) and state["status"] in ACTIVE_STATUSES
+
+    def find_active(self, spreadsheet_id: str, sheet_name: str, start_date: str, end_date: str) -> Optional[dict]:
+        """같은 시트/기간으로 진행 중인 작업 (중복 실행 방지용)"""
+        with self._lock:
+            for job in self._jobs.values():
+                params = job["params"]
+                if (job["state"]["status"] in ACTIVE_STATUSES and
+                        params["spreadsheet_id"] == spreadsheet_id and
+                        params["sheet_name"] == sheet_name and
+                        params["start_date"] == start_date and
+                        params["end_date"] == end_date):
+                    return job["state"]
+        return None
+
+    def toggle_pause(self, job_id: str) -> Optional[str]:
+        """일시정지 / 재개 토글 → 바뀐 상태 (실행 중이 아니면 None)"""
+        state = self.get(job_id)
+        if not state:
+            return None
+        if state["status"] == "running":
+            state["status"] = "paused"
+            state["message"] = "일시정지됨"
+        elif state["status"] == "paused":
+            state["status"] = "running"
+        else:
+            return None
+
+        # 다른 프로세스의 행 작업자/작업은 저장소 상태를 보고 따름
+        get_job_store().set_status(job_id, state["status"])
+        publish_state(state)
+        return state["status"]
+
+    def stop(self, job_id: str) -> bool:
+        """작업 중단 요청 (대기 중인 작업은 바로 취소)"""
+        state = self.get(job_id)
+        if not state or state["status"] not in ACTIVE_STATUSES:
+            return False
+        if not self.is_local(job_id):
+            get_job_store().set_status(job_id, "stopped")
+            return True
+
+        with self._lock:
+            if job_id in self._queue:
+                self._queue.remove(job_id)
+                state["result"] = {"success": True, "message": "대기 중 취소됨", "processed": 0, "exposed": 0, "links_updated": 0}
+                get_job_store().finish(job_id, "stopped", state["result"])
+                get_job_store().release(job_id)
+            else:
+                get_job_store().set_status(job_id, "stopped")
+            state["status"] = "stopped"
+        publish_state(state)
+        return True
+
+
+job_manager = JobManager()
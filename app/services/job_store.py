@@ -0,0 +1,453 @@
+"""
+노출 체크 작업 저장소 (SQLite)
+
+작업 파라미터, 행별 진행 상태/결과, 누적 실행 시간을 기록해서
+프로세스가 재시작되어도 마지막 체크포인트부터 이어서 실행할 수 있게 한다.
+
+행 테이블은 여러 프로세스가 함께 쓰는 작업 큐이기도 하다.
+작업 프로세스는 키워드 단위로 행을 임대(lease)해서 처리하고,
+임대 시간 안에 끝내지 못하면(프로세스 종료 등) 다른 프로세스가 다시 가져간다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+JOB_DB_PATH = os.environ.get(
+    'JOB_DB_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'jobs.db')
+)
+
+# 재개할 수 있는 상태 (interrupted: 실행 중 프로세스가 종료됨)
+RESUMABLE_STATUSES = ("interrupted", "stopped")
+
+# 실행 중인 작업이 이 시간(초) 동안 갱신되지 않으면 실행하던 프로세스가 종료된 것으로 봄
+JOB_STALE_SECONDS = float(os.environ.get('JOB_STALE_SECONDS', '60'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    params      TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    runs        INTEGER NOT NULL DEFAULT 0,
+    elapsed     REAL NOT NULL DEFAULT 0,
+    time_saved  REAL NOT NULL DEFAULT 0,
+    result      TEXT
+);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id      TEXT NOT NULL,
+    row_num     INTEGER NOT NULL,
+    keyword     TEXT NOT NULL,
+    link        TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    rank        TEXT,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (job_id, row_num)
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    id            TEXT PRIMARY KEY,
+    params        TEXT NOT NULL,
+    enabled       INTEGER NOT NULL DEFAULT 1,
+    created_at    REAL NOT NULL,
+    last_period   TEXT,
+    last_job_id   TEXT
+);
+CREATE TABLE IF NOT EXISTS workers (
+    id          TEXT PRIMARY KEY,
+    host        TEXT NOT NULL,
+    pid         INTEGER NOT NULL,
+    started_at  REAL NOT NULL,
+    heartbeat   REAL NOT NULL,
+    rows        INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# 이전 버전 DB에 없는 열 (행 임대용, 다시 체크할 때의 우선순위)
+ROW_LEASE_COLUMNS = {
+    "owner": "TEXT",
+    "lease_until": "REAL",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "priority": "REAL NOT NULL DEFAULT 0",
+}
+
+# 임대할 수 있는 행 조건 (대기 / 재시도 횟수가 남은 실패 / 임대 시간이 지난 행)
+_LEASABLE = (
+    "(status = 'pending' OR (status = 'retry' AND attempts <= :max_retries)"
+    " OR (status = 'leased' AND lease_until < :now))"
+)
+
+
+class JobStore:
+    """작업/행 상태 저장소 (여러 스레드에서 공유)"""
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._local_jobs = set()  # 이 프로세스가 맡고 있는 작업 (대기/실행/일시정지 중)
+        # 다른 프로세스가 쓰는 중이면 잠시 기다림
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(job_rows)")}
+            for name, definition in ROW_LEASE_COLUMNS.items():
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE job_rows ADD COLUMN {name} {definition}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS job_rows_status ON job_rows (job_id, status)")
+
+    def _execute(self, sql: str, params=()) -> int:
+        """변경 문장 실행 → 바뀐 행 수"""
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def _query(self, sql: str, params=()) -> list:
+        """조회 결과를 lock 안에서 모두 읽어서 반환 (연결을 여러 스레드가 공유하므로 커서를 밖으로 넘기지 않음)"""
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _query_one(self, sql: str, params=()) -> Optional[sqlite3.Row]:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _job_from_row(self, row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create_job(self, params: dict) -> str:
+        """새 작업 등록 → 작업 ID"""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, params, status, created_at, updated_at) VALUES (?, ?, 'created', ?, ?)",
+            (job_id, json.dumps(params, ensure_ascii=False), now, now),
+        )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        row = self._query_one("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._job_from_row(row) if row else None
+
+    def latest_resumable(self) -> Optional[dict]:
+        """가장 최근에 중단된 작업"""
+        placeholders = ",".join("?" * len(RESUMABLE_STATUSES))
+        row = self._query_one(
+            f"SELECT * FROM jobs WHERE status IN ({placeholders}) ORDER BY updated_at DESC LIMIT 1",
+            RESUMABLE_STATUSES,
+        )
+        return self._job_from_row(row) if row else None
+
+    def start_run(self, job_id: str) -> float:
+        """실행 시작 기록. 재개하는 경우 이전 실행 시간만큼을 절약 시간에 더하고 그 값을 반환."""
+        job = self.get_job(job_id)
+        saved = job["elapsed"] if job and job["runs"] > 0 else 0.0
+        self._execute(
+            "UPDATE jobs SET status = 'running', runs = runs + 1, time_saved = time_saved + ?, updated_at = ? WHERE id = ?",
+            (saved, time.time(), job_id),
+        )
+        return saved
+
+    def set_status(self, job_id: str, status: str):
+        self._execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), job_id))
+
+    def job_status(self, job_id: str) -> Optional[str]:
+        row = self._query_one("SELECT status FROM jobs WHERE id = ?", (job_id,))
+        return row["status"] if row else None
+
+    def touch(self, job_ids: list):
+        """실행 중인 작업 갱신 시각 기록 (다른 프로세스가 종료된 작업으로 보지 않도록)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status IN ('queued', 'running', 'paused')",
+                [(now, job_id) for job_id in job_ids],
+            )
+
+    def hold(self, job_id: str):
+        """이 프로세스가 맡은 작업으로 등록 (release 전까지 mark_interrupted 전에 갱신 시각을 기록)"""
+        self._local_jobs.add(job_id)
+
+    def release(self, job_id: str):
+        self._local_jobs.discard(job_id)
+
+    def active_jobs(self) -> list:
+        """실행 중인 작업 (모든 프로세스)"""
+        rows = self._query(
+            "SELECT * FROM jobs WHERE status IN ('queued', 'running', 'paused') ORDER BY created_at"
+        )
+        return [self._job_from_row(row) for row in rows]
+
+    def finish(self, job_id: str, status: str, result: dict):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result, ensure_ascii=False), time.time(), job_id),
+        )
+
+    def mark_interrupted(self, stale_after: float = JOB_STALE_SECONDS) -> int:
+        """
+        실행 중으로 남아있지만 stale_after초 동안 갱신되지 않은 작업 → interrupted
+        이 프로세스가 맡은 작업은 먼저 갱신하므로 (대기열/일시정지에서 오래 기다려도) 건드리지 않음
+        다른 프로세스의 작업은 그 프로세스의 행 작업자가 주기적으로 이 함수를 불러서 갱신함
+        """
+        self.touch(list(self._local_jobs))
+        now = time.time()
+        count = self._execute(
+            "UPDATE jobs SET status = 'interrupted', updated_at = ? "
+            "WHERE status IN ('queued', 'running', 'paused') AND updated_at < ?",
+            (now, now - stale_after),
+        )
+        return count
+
+    def add_rows(self, job_id: str, rows: list):
+        """처리할 행 등록 (이미 있는 행은 그대로 둠)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO job_rows (job_id, row_num, keyword, link, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(job_id, row['row_num'], row['keyword'], row['link'], now) for row in rows],
+            )
+
+    def checkpoint(self, job_id: str, results: list, elapsed: float):
+        """행 결과 [(행 번호, 순위)] 저장 + 실행 시간 누적"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE job_rows SET status = 'done', rank = ?, owner = NULL, updated_at = ? WHERE job_id = ? AND row_num = ?",
+                [(rank, now, job_id, row_num) for row_num, rank in results],
+            )
+            self._conn.execute(
+                "UPDATE jobs SET elapsed = elapsed + ?, updated_at = ? WHERE id = ?",
+                (elapsed, now, job_id),
+            )
+
+    def mark_retry(self, job_id: str, row_nums: list):
+        """검색이 차단/실패한 행 → retry (결과 없이 남겨서 재개할 때 다시 검색)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE job_rows SET status = 'retry', rank = NULL, owner = NULL, updated_at = ? WHERE job_id = ? AND row_num = ?",
+                [(now, job_id, row_num) for row_num in row_nums],
+            )
+
+    def queue_rows(self, job_id: str, rows: list, status: str = "pending"):
+        """
+        이번 실행에서 처리할 행을 작업 큐에 등록 (완료되지 않은 나머지 행은 skipped)
+        재개하는 경우 이전 실행의 실패/임대 행도 처음부터 다시 처리
+        status가 scheduled면 바로 임대되지 않고 release_scheduled()로 조금씩 풀어줌
+        행에 priority가 있으면 큰 키워드부터 임대
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE job_rows SET status = 'skipped', owner = NULL, updated_at = ? WHERE job_id = ? AND status != 'done'",
+                (now, job_id),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_rows (job_id, row_num, keyword, link, status, priority, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (job_id, row_num) DO UPDATE SET keyword = excluded.keyword, link = excluded.link, "
+                "status = excluded.status, rank = NULL, owner = NULL, lease_until = NULL, attempts = 0, "
+                "priority = excluded.priority, updated_at = excluded.updated_at",
+                [(job_id, row['row_num'], row['keyword'], row['link'], status, row.get('priority', 0), now)
+                 for row in rows],
+            )
+
+    def release_scheduled(self, job_id: str, keywords: int) -> int:
+        """scheduled 행 중 우선순위가 큰(같으면 앞쪽) 키워드 keywords개에 속한 행 → pending (임대 가능). 풀어준 행 수 반환."""
+        if keywords <= 0:
+            return 0
+        count = self._execute(
+            "UPDATE job_rows SET status = 'pending', updated_at = ? WHERE job_id = ? AND status = 'scheduled' AND keyword IN ("
+            "  SELECT keyword FROM job_rows WHERE job_id = ? AND status = 'scheduled' "
+            "  GROUP BY keyword ORDER BY MAX(priority) DESC, MIN(row_num) LIMIT ?)",
+            (time.time(), job_id, job_id, keywords),
+        )
+        return count
+
+    def scheduled_keywords(self, job_id: str) -> int:
+        """아직 풀어주지 않은 키워드 수"""
+        row = self._query_one(
+            "SELECT COUNT(DISTINCT keyword) AS n FROM job_rows WHERE job_id = ? AND status = 'scheduled'", (job_id,)
+        )
+        return row["n"]
+
+    def lease_rows(self, owner: str, max_keywords: int, lease_seconds: float, max_retries: int) -> list:
+        """
+        실행 중인 작업 하나에서 키워드 max_keywords개에 속한 행 임대
+        (처음 시도하는 행 먼저, 그중 우선순위가 큰 키워드 먼저, 실패했던 행은 max_retries번까지 다시)
+        반환: [{"job_id", "row_num", "keyword", "link", "attempts"}] (없으면 빈 목록)
+        """
+        now = time.time()
+        params = {"owner": owner, "now": now, "until": now + lease_seconds,
+                  "max_retries": max_retries, "limit": max_keywords}
+        with self._lock, self._conn:
+            jobs = self._conn.execute("SELECT id FROM jobs WHERE status = 'running' ORDER BY created_at").fetchall()
+            for job in jobs:
+                # 조건 확인과 임대를 한 문장으로 (다른 프로세스와 같은 행을 가져가지 않음)
+                params["job_id"] = job["id"]
+                rows = self._conn.execute(
+                    f"UPDATE job_rows SET status = 'leased', owner = :owner, lease_until = :until, "
+                    f"attempts = attempts + 1, updated_at = :now "
+                    f"WHERE job_id = :job_id AND {_LEASABLE} AND keyword IN ("
+                    f"  SELECT keyword FROM job_rows WHERE job_id = :job_id AND {_LEASABLE} "
+                    f"  GROUP BY keyword ORDER BY MIN(attempts), MAX(priority) DESC, MIN(row_num) LIMIT :limit"
+                    f") RETURNING job_id, row_num, keyword, link, attempts",
+                    params,
+                ).fetchall()
+                if rows:
+                    return sorted((dict(row) for row in rows), key=lambda row: row["row_num"])
+        return []
+
+    def renew_leases(self, owner: str, lease_seconds: float):
+        """처리 중인 행 임대 연장"""
+        self._execute(
+            "UPDATE job_rows SET lease_until = ? WHERE owner = ? AND status = 'leased'",
+            (time.time() + lease_seconds, owner),
+        )
+
+    def release_leases(self, owner: str, job_id: Optional[str] = None, row_nums: Optional[list] = None) -> int:
+        """처리하지 못한 임대 행 반납 (일시정지/중단/프로세스 종료 시, row_nums를 주면 그 행만)"""
+        sql = ("UPDATE job_rows SET status = 'pending', owner = NULL, attempts = MAX(0, attempts - 1) "
+               "WHERE owner = ? AND status = 'leased'")
+        if row_nums is not None:
+            with self._lock, self._conn:
+                return sum(self._conn.execute(sql + " AND job_id = ? AND row_num = ?", (owner, job_id, row_num)).rowcount
+                           for row_num in row_nums)
+
+        params = (owner,)
+        if job_id:
+            sql += " AND job_id = ?"
+            params = (owner, job_id)
+        return self._execute(sql, params)
+
+    def open_rows(self, job_id: str, max_retries: int) -> int:
+        """아직 처리할 행 수 (예정 + 대기 + 임대 중 + 재시도 횟수가 남은 실패)"""
+        row = self._query_one(
+            "SELECT COUNT(*) AS n FROM job_rows WHERE job_id = ? AND "
+            "(status IN ('scheduled', 'pending', 'leased') OR (status = 'retry' AND attempts <= ?))",
+            (job_id, max_retries),
+        )
+        return row["n"]
+
+    def run_summary(self, job_id: str, since: float) -> dict:
+        """since 이후 처리된 행 → {"processed", "exposed", "retry"}"""
+        row = self._query_one(
+            "SELECT "
+            "  SUM(status = 'done' AND updated_at >= :since) AS processed, "
+            "  SUM(status = 'done' AND updated_at >= :since AND rank != '-') AS exposed, "
+            "  SUM(status = 'retry') AS retry "
+            "FROM job_rows WHERE job_id = :job_id",
+            {"job_id": job_id, "since": since},
+        )
+        return {key: row[key] or 0 for key in ("processed", "exposed", "retry")}
+
+    def worker_heartbeat(self, worker_id: str, host: str, pid: int, rows: int):
+        """작업 프로세스 생존 기록"""
+        now = time.time()
+        self._execute(
+            "INSERT INTO workers (id, host, pid, started_at, heartbeat, rows) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET heartbeat = excluded.heartbeat, rows = excluded.rows",
+            (worker_id, host, pid, now, now, rows),
+        )
+
+    def live_workers(self, within: float = JOB_STALE_SECONDS) -> list:
+        """within초 안에 생존 기록이 있는 작업 프로세스 (+ 지금 임대 중인 행 수)"""
+        rows = self._query(
+            "SELECT w.*, (SELECT COUNT(*) FROM job_rows r WHERE r.owner = w.id AND r.status = 'leased') AS leased "
+            "FROM workers w WHERE w.heartbeat >= ? ORDER BY w.started_at",
+            (time.time() - within,),
+        )
+        return [dict(row) for row in rows]
+
+    def claim_job(self, job_id: str, from_status: str, to_status: str) -> bool:
+        """작업 상태를 from_status일 때만 바꿈 (여러 프로세스 중 하나만 성공)"""
+        count = self._execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (to_status, time.time(), job_id, from_status),
+        )
+        return count == 1
+
+    def _schedule_from_row(self, row: sqlite3.Row) -> dict:
+        schedule = dict(row)
+        schedule["params"] = json.loads(schedule["params"])
+        schedule["enabled"] = bool(schedule["enabled"])
+        return schedule
+
+    def create_schedule(self, params: dict) -> str:
+        """반복 작업 등록 → 반복 작업 ID"""
+        schedule_id = uuid.uuid4().hex[:12]
+        self._execute(
+            "INSERT INTO schedules (id, params, created_at) VALUES (?, ?, ?)",
+            (schedule_id, json.dumps(params, ensure_ascii=False), time.time()),
+        )
+        return schedule_id
+
+    def list_schedules(self) -> list:
+        rows = self._query("SELECT * FROM schedules ORDER BY created_at")
+        return [self._schedule_from_row(row) for row in rows]
+
+    def get_schedule(self, schedule_id: str) -> Optional[dict]:
+        row = self._query_one("SELECT * FROM schedules WHERE id = ?", (schedule_id,))
+        return self._schedule_from_row(row) if row else None
+
+    def set_schedule_enabled(self, schedule_id: str, enabled: bool) -> bool:
+        count = self._execute("UPDATE schedules SET enabled = ? WHERE id = ?", (int(enabled), schedule_id))
+        return count == 1
+
+    def delete_schedule(self, schedule_id: str) -> bool:
+        return self._execute("DELETE FROM schedules WHERE id = ?", (schedule_id,)) == 1
+
+    def claim_period(self, schedule_id: str, period: str) -> bool:
+        """반복 작업의 이번 회차(period)를 실행하겠다고 기록 (여러 프로세스 중 하나만 성공)"""
+        count = self._execute(
+            "UPDATE schedules SET last_period = ?, last_job_id = NULL "
+            "WHERE id = ? AND enabled = 1 AND (last_period IS NULL OR last_period < ?)",
+            (period, schedule_id, period),
+        )
+        return count == 1
+
+    def set_schedule_job(self, schedule_id: str, job_id: str):
+        self._execute("UPDATE schedules SET last_job_id = ? WHERE id = ?", (job_id, schedule_id))
+
+    def done_rows(self, job_id: str) -> dict:
+        """완료된 행 → {행 번호: 순위}"""
+        rows = self._query(
+            "SELECT row_num, rank FROM job_rows WHERE job_id = ? AND status = 'done'", (job_id,)
+        )
+        return {row["row_num"]: row["rank"] for row in rows}
+
+    def finished_rows(self, start: float, end: float) -> list:
+        """start ~ end 사이에 결과가 나온 행 (모든 작업) → [{"job_id", "row_num", "keyword", "link", "rank", "updated_at"}]"""
+        rows = self._query(
+            "SELECT job_id, row_num, keyword, link, rank, updated_at FROM job_rows "
+            "WHERE status = 'done' AND updated_at >= ? AND updated_at < ? ORDER BY updated_at",
+            (start, end),
+        )
+        return [dict(row) for row in rows]
+
+    def row_counts(self, job_id: str) -> dict:
+        """상태별 행 수"""
+        rows = self._query(
+            "SELECT status, COUNT(*) AS n FROM job_rows WHERE job_id = ? GROUP BY status", (job_id,)
+        )
+        return {row["status"]: row["n"] for row in rows}
+
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """프로세스 전역 작업 저장소 (처음 열 때 이전 프로세스의 미완료 작업을 interrupted로 표시)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore()
+            _store.mark_interrupted()
+        return _store
@@ -0,0 +1,95 @@
+"""
+Prometheus 지표 (/metrics)
+
+작업 시간이 어디에 쓰이는지(검색 요청, 파싱, 시트 API, 속도 제한 대기) 보고
+동시성/속도 설정을 조정하기 위한 지표 모음
+"""
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5)
+WAIT_BUCKETS = (0, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 300)
+
+FETCH_SECONDS = Histogram(
+    'naver_fetch_seconds', "네이버 요청 응답 시간", ['host', 'outcome'], buckets=LATENCY_BUCKETS,
+)
+FETCH_BYTES = Histogram(
+    'naver_fetch_response_bytes', "네이버 응답 크기", ['host'],
+    buckets=(1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2e6),
+)
+PARSE_SECONDS = Histogram('serp_parse_seconds', "검색 결과 페이지 파싱 시간", buckets=PARSE_BUCKETS)
+LINKS_PER_PAGE = Histogram(
+    'serp_links_per_page', "검색 결과 페이지당 블로그 글 수", buckets=(0, 1, 5, 10, 20, 30, 50, 100),
+)
+POST_LOOKUP_SECONDS = Histogram(
+    'post_lookup_seconds', "제목으로 글 링크 찾기 시간", ['found'], buckets=LATENCY_BUCKETS,
+)
+SHEETS_SECONDS = Histogram(
+    'sheets_api_seconds', "구글 시트 API 응답 시간", ['operation'], buckets=LATENCY_BUCKETS,
+)
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    'rate_limiter_wait_seconds', "속도 제한으로 기다린 시간", ['host'], buckets=WAIT_BUCKETS,
+)
+BREAKER_OPEN = Gauge('circuit_breaker_open', "차단기 열림 여부 (1: 요청 중단 중)", ['host'])
+BREAKER_TRIPS = Counter('circuit_breaker_trips_total', "차단 감지로 요청을 멈춘 횟수", ['host'])
+EGRESS_HEALTH = Gauge('egress_route_health', "검색 요청 경로 건강 점수 (0~1)", ['route'])
+EGRESS_REQUESTS = Counter('egress_requests_total', "경로별 검색 요청 수", ['route', 'outcome'])
+CACHE_REQUESTS = Counter('cache_requests_total', "캐시 조회 수", ['cache', 'result'])
+PIPELINE_STAGE_SECONDS = Histogram(
+    'pipeline_stage_seconds', "노출 체크 파이프라인 단계별 항목 처리 시간", ['stage'], buckets=LATENCY_BUCKETS,
+)
+ROWS_PROCESSED = Counter('sheet_rows_processed_total', "처리한 시트 행 수", ['phase'])
+JOB_ROWS_PER_MINUTE = Gauge('sheet_job_rows_per_minute', "실행 중인 작업의 분당 처리 행 수", ['job_id'])
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """블록 실행 시간 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target = histogram.labels(**labels) if labels else histogram
+        target.observe(time.perf_counter() - start)
+
+
+def observe_fetch(host: str, seconds: float, size: int, outcome: str):
+    """네이버 요청 하나 기록 (outcome: ok / blocked / error)"""
+    FETCH_SECONDS.labels(host, outcome).observe(seconds)
+    if size:
+        FETCH_BYTES.labels(host).observe(size)
+
+
+def observe_cache(cache: str, result: str):
+    """캐시 조회 하나 기록 (result: hit / miss / coalesced)"""
+    CACHE_REQUESTS.labels(cache, result).inc()
+
+
+class JobThroughput:
+    """작업 하나의 분당 처리 행 수 (끝나면 지표에서 제거)"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.start = time.monotonic()
+        self.rows = 0
+
+    def add(self, phase: str, rows: int = 1):
+        self.rows += rows
+        ROWS_PROCESSED.labels(phase).inc(rows)
+        minutes = (time.monotonic() - self.start) / 60
+        if minutes > 0:
+            JOB_ROWS_PER_MINUTE.labels(self.job_id).set(self.rows / minutes)
+
+    def close(self):
+        try:
+            JOB_ROWS_PER_MINUTE.remove(self.job_id)
+        except KeyError:
+            pass
+
+
+def render_metrics() -> tuple:
+    """(본문, Content-Type)"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,12 +1,28 @@
+import os
 import requests
-from bs4 import BeautifulSoup
 import random
-import time
 import re
+import time
 from urllib.parse import urlparse, unquote, parse_qs
 from typing import Optional
 from app.models.schemas import BlogResult, SearchResponse
-
+from app.services.egress import EgressRoute, get_egress_pool
+from app.services.metrics import observe_fetch
+from app.services.rate_limiter import SEARCH_HOST
+from app.services.serp_archive import archive_page_later, get_archive
+from app.services.serp_parser import RankFinder, extract_post_id, parse_blog_results
+
+# 검색 주소 (부하 테스트 등에서 로컬 대체 서버로 바꿀 때 사용)
+NAVER_SEARCH_URL = os.environ.get('NAVER_SEARCH_URL', 'https://search.naver.com/search.naver')
+
+# 순위만 확인할 때 이 순위까지 세고 나머지 응답은 읽지 않음 (0이면 끝까지)
+SERP_MAX_RANK = int(os.environ.get('SERP_MAX_RANK', '0'))
+# 깊은 순위 확인에서 넘겨볼 블로그 탭 페이지 수 / 블로그 탭 한 페이지의 결과 수
+DEEP_RANK_PAGES = int(os.environ.get('DEEP_RANK_PAGES', '5'))
+DEEP_RANK_PAGE_SIZE = int(os.environ.get('DEEP_RANK_PAGE_SIZE', '30'))
+# 순위만 확인할 때 응답을 읽는 단위 / 차단 페이지 확인에 쓰는 앞부분 크기 (바이트)
+STREAM_CHUNK_SIZE = 16384
+BLOCK_CHECK_BYTES = 20000
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -17,6 +33,20 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
 ]
 
+# 차단/캡차 페이지에 나타나는 문구 (정상 검색 페이지 스크립트에 섞일 수 있는 "captcha" 단독은 제외)
+BLOCK_MARKERS = (
+    "ncaptcha",
+    "captcha.naver",
+    'id="captcha',
+    "자동입력 방지",
+    "비정상적인 검색",
+    "일시적으로 제한",
+)
+
+
+class BlockedError(Exception):
+    """차단/캡차/비정상 응답 (검색 결과로 쓰면 안 됨, 나중에 다시 시도해야 함)"""
+
 
 def get_headers() -> dict:
     """랜덤 User-Agent와 함께 요청 헤더 반환"""
@@ -52,111 +82,248 @@ def normalize_blog_url(url: str) -> str:
     return url
 
 
-def extract_post_id(url: str) -> Optional[str]:
-    """블로그 URL에서 포스트 ID(숫자) 추출"""
-    # blog.naver.com/blogid/12345 형식
-    match = re.search(r'blog\.naver\.com/[^/]+/(\d+)', url)
-    if match:
-        return match.group(1)
+def block_reason(status_code: int, text: str, url: str = "") -> Optional[str]:
+    """차단(429/403), 캡차 페이지, 빈 응답이면 그 이유, 정상이면 None"""
+    if status_code in (403, 429):
+        return f"HTTP {status_code}"
+    if "captcha" in url.lower():
+        return "캡차 페이지로 이동"
+    head = text[:20000].lower()
+    for marker in BLOCK_MARKERS:
+        if marker in head:
+            return f"차단 문구 ({marker})"
+    if status_code == 200 and not text.strip():
+        return "빈 응답"
+    return None
 
-    # blogid.blog.me/12345 형식
-    match = re.search(r'\.blog\.me/(\d+)', url)
-    if match:
-        return match.group(1)
 
-    return None
+def is_blocked_response(status_code: int, text: str) -> bool:
+    """차단(429/403) 또는 캡차 페이지인지 확인"""
+    return block_reason(status_code, text) is not None
 
 
-def search_naver_view(keyword: str, blog_url: str) -> SearchResponse:
-    """네이버 통합 검색에서 블로그 노출 여부 확인"""
+def check_search_response(status_code: int, text: str, url: str, route: EgressRoute):
+    """검색 응답 확인: 요청을 보낸 경로의 속도 제한기/차단기/건강 점수에 알리고, 차단이면 BlockedError"""
+    reason = block_reason(status_code, text, url)
+    if reason:
+        route.record_block()
+        raise BlockedError(f"네이버 검색 차단 감지: {reason}")
 
-    # 입력된 글 URL 정규화
-    target_url = normalize_blog_url(blog_url)
-    target_post_id = extract_post_id(blog_url)
+    if status_code < 400:
+        route.record_success()
+    else:
+        route.record_error(status_code)
+
+
+def build_search_url(keyword: str) -> str:
+    """네이버 통합 검색 URL 생성"""
+    return f"{NAVER_SEARCH_URL}?query={keyword}"
+
+
+def build_blog_tab_url(keyword: str, page: int) -> str:
+    """네이버 블로그 탭 검색 URL 생성 (page는 1부터)"""
+    return f"{NAVER_SEARCH_URL}?ssc=tab.blog.all&query={keyword}&start={(page - 1) * DEEP_RANK_PAGE_SIZE + 1}"
 
-    # 네이버 통합 검색 URL
-    search_url = f"https://search.naver.com/search.naver?query={keyword}"
 
+def fetch_blog_results(keyword: str) -> list[BlogResult]:
+    """네이버 통합 검색 결과 페이지를 가져와 블로그 글 목록으로 변환 (요청 실패 시 예외 발생)"""
+
+    # 보낼 수 있는 경로가 생길 때까지 기다림 (차단된 경로는 제외)
+    route = get_egress_pool().acquire()
+
+    start = time.perf_counter()
     try:
-        # 요청 전 랜덤 딜레이 (1~2초)
-        time.sleep(random.uniform(1, 2))
-
-        response = requests.get(search_url, headers=get_headers(), timeout=10)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'lxml')
-
-        results = []
-        is_exposed = False
-        exposed_rank = None
-        exposed_result = None
-        seen_post_ids = set()  # 중복 포스트 ID 제거용
-
-        # 모든 블로그 링크 찾기 (포스트 ID가 있는 것만)
-        all_links = soup.find_all('a', href=True)
-
-        for link in all_links:
-            href = link.get('href', '')
-
-            # 블로그 포스트 링크인지 확인 (숫자 ID가 있는 것)
-            if 'blog.naver.com' not in href:
-                continue
-
-            post_id = extract_post_id(href)
-            if not post_id:
-                continue
-
-            # 중복 제거 (포스트 ID 기준)
-            if post_id in seen_post_ids:
-                continue
-
-            # 제목 추출 - 의미있는 텍스트가 있는 링크만 결과로 추가
-            title = link.get_text(strip=True)
-            if not title or len(title) <= 3:
-                continue
-
-            seen_post_ids.add(post_id)
-
-            rank = len(results) + 1
-            result = BlogResult(
-                rank=rank,
-                title=title,
-                url=href,
-                description="",
-                blog_name="",
-                date=""
-            )
-            results.append(result)
-
-            # 포스트 ID로 매칭 확인
-            if target_post_id and post_id == target_post_id:
-                is_exposed = True
-                exposed_rank = rank
-                exposed_result = result
+        response = route.session.get(build_search_url(keyword), headers=get_headers(), timeout=10)
+    except requests.RequestException:
+        observe_fetch(SEARCH_HOST, time.perf_counter() - start, 0, "error")
+        route.record_error()
+        raise
+
+    blocked = is_blocked_response(response.status_code, response.text)
+    observe_fetch(SEARCH_HOST, time.perf_counter() - start, len(response.content),
+                  "blocked" if blocked else "ok" if response.status_code < 400 else "error")
+    check_search_response(response.status_code, response.text, response.url, route)
+
+    response.raise_for_status()
+    archive_page_later("search", keyword, response.content)
 
-        if not results:
-            return SearchResponse(
-                success=True,
-                keyword=keyword,
-                is_exposed=False,
-                total_results=0,
-                results=[],
-                message="검색 결과에서 블로그 글을 찾을 수 없습니다."
-            )
+    return parse_blog_results(response.text)
 
-        message = f"입력한 글이 {exposed_rank}위에 노출됩니다!" if is_exposed else f"입력한 글이 상위 {len(results)}개 결과에 노출되지 않습니다."
 
+def fetch_ranks(keyword: str, target_ids, max_rank: int = SERP_MAX_RANK) -> tuple:
+    """
+    검색 페이지를 받는 대로 파싱하면서 찾는 글들의 순위만 확인 (요청 실패 시 예외 발생)
+    찾는 글을 모두 찾거나 max_rank를 넘으면 나머지 응답은 받지 않음
+    반환: ({포스트 ID: 순위}, 확인한 블로그 글 수)
+    """
+
+    route = get_egress_pool().acquire()
+
+    start = time.perf_counter()
+    size = 0
+    outcome = "error"
+    try:
+        with route.session.get(build_search_url(keyword), headers=get_headers(), timeout=10, stream=True) as response:
+            chunks = response.iter_content(STREAM_CHUNK_SIZE)
+
+            # 차단 페이지 확인은 앞부분만으로
+            head = b""
+            for chunk in chunks:
+                head += chunk
+                if len(head) >= BLOCK_CHECK_BYTES:
+                    break
+            size = len(head)
+            # 검색 페이지는 UTF-8 (requests는 charset이 없는 text/html을 ISO-8859-1로 봄)
+            text = head.decode('utf-8', errors='replace')
+
+            outcome = ("blocked" if is_blocked_response(response.status_code, text)
+                       else "ok" if response.status_code < 400 else "error")
+            check_search_response(response.status_code, text, response.url, route)
+            response.raise_for_status()
+
+            finder = RankFinder(target_ids, max_rank)
+            parts = [head]
+            if not finder.feed(head):
+                for chunk in chunks:
+                    size += len(chunk)
+                    parts.append(chunk)
+                    if finder.feed(chunk):
+                        break
+
+            # 원본 보관을 켠 경우에만 나머지도 받음 (파싱은 하지 않음, 끝까지 받으므로 응답을 끊는 절약은 없음)
+            if get_archive() is not None:
+                for chunk in chunks:
+                    size += len(chunk)
+                    parts.append(chunk)
+                archive_page_later("search", keyword, b"".join(parts))
+            return finder.close(), finder.count
+    except requests.HTTPError:
+        raise
+    except requests.RequestException:
+        route.record_error()
+        raise
+    finally:
+        observe_fetch(SEARCH_HOST, time.perf_counter() - start, size, outcome)
+
+
+def rank_response(keyword: str, rank: Optional[int], counted: int) -> SearchResponse:
+    """순위만 확인한 결과 → 응답 (결과 목록 없음, total_results는 확인한 글 수)"""
+    is_exposed = rank is not None
+    message = f"입력한 글이 {rank}위에 노출됩니다!" if is_exposed else f"입력한 글이 상위 {counted}개 결과에 노출되지 않습니다."
+    return SearchResponse(
+        success=True,
+        keyword=keyword,
+        is_exposed=is_exposed,
+        exposed_rank=rank,
+        total_results=counted,
+        results=[],
+        message=message
+    )
+
+
+def deep_rank_response(keyword: str, position: Optional[dict], pages: int) -> SearchResponse:
+    """깊은 순위 확인 결과 → 응답 (position: {"rank", "page", "section", "page_rank"} 또는 None)"""
+    if position is None:
         return SearchResponse(
             success=True,
             keyword=keyword,
-            is_exposed=is_exposed,
-            exposed_rank=exposed_rank,
-            exposed_result=exposed_result,
-            total_results=len(results),
-            results=results,
-            message=message
+            is_exposed=False,
+            message=f"입력한 글이 통합 검색과 블로그 탭 {pages}페이지 안에 노출되지 않습니다."
         )
 
+    if position["section"] == "integrated":
+        message = f"입력한 글이 통합 검색 {position['rank']}위에 노출됩니다!"
+    else:
+        message = (f"입력한 글이 블로그 탭 {position['page']}페이지 {position['page_rank']}번째 "
+                   f"({position['rank']}위)에 노출됩니다!")
+    return SearchResponse(
+        success=True,
+        keyword=keyword,
+        is_exposed=True,
+        exposed_rank=position["rank"],
+        exposed_page=position["page"],
+        exposed_section=position["section"],
+        message=message
+    )
+
+
+def match_exposure(keyword: str, blog_url: str, results: list[BlogResult]) -> SearchResponse:
+    """파싱된 검색 결과에서 입력한 글의 노출 순위 확인 (같은 키워드의 여러 글에 재사용 가능)"""
+
+    target_post_id = extract_post_id(blog_url)
+
+    if not results:
+        return SearchResponse(
+            success=True,
+            keyword=keyword,
+            is_exposed=False,
+            total_results=0,
+            results=[],
+            message="검색 결과에서 블로그 글을 찾을 수 없습니다."
+        )
+
+    exposed_result = None
+
+    # 포스트 ID로 매칭 확인
+    if target_post_id:
+        for result in results:
+            if extract_post_id(result.url) == target_post_id:
+                exposed_result = result
+                break
+
+    is_exposed = exposed_result is not None
+    exposed_rank = exposed_result.rank if is_exposed else None
+
+    message = f"입력한 글이 {exposed_rank}위에 노출됩니다!" if is_exposed else f"입력한 글이 상위 {len(results)}개 결과에 노출되지 않습니다."
+
+    return SearchResponse(
+        success=True,
+        keyword=keyword,
+        is_exposed=is_exposed,
+        exposed_rank=exposed_rank,
+        exposed_result=exposed_result,
+        total_results=len(results),
+        results=results,
+        message=message
+    )
+
+
+def search_naver_view(keyword: str, blog_url: str, match_only: bool = False,
+                      max_rank: int = SERP_MAX_RANK, deep: bool = False,
+                      pages: int = DEEP_RANK_PAGES) -> SearchResponse:
+    """
+    네이버 통합 검색에서 블로그 노출 여부 확인
+    match_only면 순위만 확인 (찾으면 나머지 응답은 받지 않고, 결과 목록 없이 반환)
+    deep이면 통합 검색에 없을 때의 위치까지 블로그 탭 pages페이지를 동시에 넘겨보며 확인 (결과 목록 없이 반환)
+    """
+
+    try:
+        if deep:
+            # 순환 import 방지 (fetch_engine → naver_search)
+            from app.services.fetch_engine import get_engine
+
+            target_post_id = extract_post_id(blog_url)
+            if not target_post_id:
+                return deep_rank_response(keyword, None, pages)
+            positions = get_engine().find_deep_ranks_sync(keyword, [target_post_id], pages)
+            return deep_rank_response(keyword, positions.get(target_post_id), pages)
+
+        if match_only:
+            target_post_id = extract_post_id(blog_url)
+            if not target_post_id:
+                return rank_response(keyword, None, 0)
+            ranks, counted = fetch_ranks(keyword, [target_post_id], max_rank)
+            return rank_response(keyword, ranks.get(target_post_id), counted)
+
+        results = fetch_blog_results(keyword)
+        return match_exposure(keyword, blog_url, results)
+
+    except BlockedError as e:
+        return SearchResponse(
+            success=False,
+            keyword=keyword,
+            message=f"{str(e)}. 잠시 후 다시 시도해주세요."
+        )
     except requests.exceptions.Timeout:
         return SearchResponse(
             success=False,
@@ -0,0 +1,182 @@
+"""
+글/키워드별 순위 이력 저장소 (SQLite 시계열)
+
+시트 W열에는 마지막 순위만 남으므로, 노출 체크 결과를 (글, 키워드, 순위, 시각)으로 따로 쌓아서
+순위 변화를 조회하고 다시 체크할 행의 우선순위를 정하는 데 쓴다.
+
+- 글은 포스트 ID로 구분 (같은 글의 링크 형식이 달라도 같은 이력)
+- 노출 안됨("-")은 순위 없음(NULL)으로 기록
+- 우선순위: 마지막 체크 후 지난 시간 × (1 + 최근 순위 변동폭 가중치), 한 번도 체크하지 않은 글이 가장 먼저
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from app.services.serp_parser import extract_post_id
+
+RANK_HISTORY_DB = os.environ.get(
+    'RANK_HISTORY_DB',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'rank_history.db')
+)
+# 변동폭 계산에 쓰는 최근 기록 수
+RANK_VOLATILITY_WINDOW = int(os.environ.get('RANK_VOLATILITY_WINDOW', '5'))
+# 평균 순위 변동폭 1당 우선순위 가중치 (0이면 오래된 순서만 봄)
+RANK_VOLATILITY_WEIGHT = float(os.environ.get('RANK_VOLATILITY_WEIGHT', '0.3'))
+
+# 변동폭 계산에서 노출 안됨을 볼 순위 (검색 결과 한 페이지 밖)
+_NOT_EXPOSED_RANK = 31
+# SQLite 변수 개수 제한 안에서 한 번에 조회할 글 수
+_QUERY_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ranks (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    post        TEXT NOT NULL,
+    keyword     TEXT NOT NULL,
+    link        TEXT NOT NULL,
+    rank        INTEGER,
+    checked_at  REAL NOT NULL,
+    job_id      TEXT
+);
+CREATE INDEX IF NOT EXISTS ranks_series ON ranks (post, keyword, checked_at);
+CREATE INDEX IF NOT EXISTS ranks_keyword ON ranks (keyword, checked_at);
+CREATE INDEX IF NOT EXISTS ranks_time ON ranks (checked_at);
+"""
+
+
+def post_key(link: str) -> str:
+    """이력에서 글을 구분하는 키 (포스트 ID, 없으면 링크)"""
+    return extract_post_id(link) or link.strip()
+
+
+def keyword_key(keyword: str) -> str:
+    """같은 키워드로 볼 키 (앞뒤/중복 공백 무시)"""
+    return " ".join(keyword.split())
+
+
+def parse_rank(rank_value: str) -> Optional[int]:
+    """시트 순위 값 → 순위 (노출 안됨이면 None)"""
+    rank_value = str(rank_value).strip()
+    return int(rank_value) if rank_value.isdigit() else None
+
+
+def volatility(ranks: list) -> float:
+    """최근 순위(최신순)의 평균 변동폭 (노출 안됨은 한 페이지 밖 순위로 봄)"""
+    values = [_NOT_EXPOSED_RANK if rank is None else min(rank, _NOT_EXPOSED_RANK) for rank in ranks]
+    if len(values) < 2:
+        return 0.0
+    return sum(abs(a - b) for a, b in zip(values, values[1:])) / (len(values) - 1)
+
+
+class RankHistory:
+    """순위 이력 저장소 (여러 스레드에서 공유)"""
+
+    def __init__(self, path: str = RANK_HISTORY_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def record(self, observations: list, checked_at: Optional[float] = None, job_id: Optional[str] = None):
+        """체크 결과 기록 (observations: [(키워드, 링크, 순위 값)], 순위 값은 시트에 쓰는 값 그대로)"""
+        checked_at = checked_at or time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO ranks (post, keyword, link, rank, checked_at, job_id) VALUES (?, ?, ?, ?, ?, ?)",
+                [(post_key(link), keyword_key(keyword), link.strip(), parse_rank(rank_value), checked_at, job_id)
+                 for keyword, link, rank_value in observations],
+            )
+
+    def history(self, link: Optional[str] = None, keyword: Optional[str] = None,
+                start: Optional[float] = None, end: Optional[float] = None, limit: int = 1000) -> list:
+        """이력 조회 (최신순) → [{"post", "keyword", "link", "rank", "checked_at", "job_id"}]"""
+        sql = "SELECT post, keyword, link, rank, checked_at, job_id FROM ranks WHERE 1 = 1"
+        params = []
+        if link:
+            sql += " AND post = ?"
+            params.append(post_key(link))
+        if keyword:
+            sql += " AND keyword = ?"
+            params.append(keyword_key(keyword))
+        if start is not None:
+            sql += " AND checked_at >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND checked_at < ?"
+            params.append(end)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY checked_at DESC LIMIT ?", params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def recent(self, posts: list, window: int = RANK_VOLATILITY_WINDOW) -> dict:
+        """글마다 키워드별 최근 기록 → {(글, 키워드): [(순위, 체크 시각)] (최신순)}"""
+        recent = {}
+        posts = sorted(set(posts))
+        for i in range(0, len(posts), _QUERY_CHUNK):
+            chunk = posts[i:i + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT post, keyword, rank, checked_at FROM ("
+                    f"  SELECT post, keyword, rank, checked_at, ROW_NUMBER() OVER ("
+                    f"    PARTITION BY post, keyword ORDER BY checked_at DESC) AS n "
+                    f"  FROM ranks WHERE post IN ({placeholders})"
+                    f") WHERE n <= ? ORDER BY checked_at DESC",
+                    chunk + [window],
+                ).fetchall()
+            for row in rows:
+                recent.setdefault((row["post"], row["keyword"]), []).append((row["rank"], row["checked_at"]))
+        return recent
+
+    def priorities(self, pairs: list, now: Optional[float] = None) -> list:
+        """
+        다시 체크할 우선순위 (pairs: [(키워드, 링크)], 같은 순서로 반환, 클수록 먼저)
+        마지막 체크 후 지난 시간(시간) × (1 + 평균 변동폭 × RANK_VOLATILITY_WEIGHT), 기록이 없으면 무한대
+        """
+        now = now or time.time()
+        recent = self.recent([post_key(link) for _, link in pairs])
+        scores = []
+        for keyword, link in pairs:
+            series = recent.get((post_key(link), keyword_key(keyword)))
+            if not series:
+                scores.append(float("inf"))
+                continue
+            staleness = max(0.0, now - series[0][1]) / 3600
+            scores.append(staleness * (1 + volatility([rank for rank, _ in series]) * RANK_VOLATILITY_WEIGHT))
+        return scores
+
+    def stats(self) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS records, COUNT(DISTINCT post || ' ' || keyword) AS series, "
+                "MIN(checked_at) AS first, MAX(checked_at) AS last FROM ranks"
+            ).fetchone()
+        return dict(row)
+
+
+_history: Optional[RankHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_rank_history() -> RankHistory:
+    """프로세스 전역 순위 이력 저장소"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = RankHistory()
+        return _history
+
+
+def record_ranks(observations: list, job_id: Optional[str] = None):
+    """체크 결과 기록 (기록 실패가 노출 체크를 막지 않도록 오류는 출력만)"""
+    if not observations:
+        return
+    try:
+        get_rank_history().record(observations, job_id=job_id)
+    except Exception as e:
+        print(f"순위 이력 기록 실패: {e}")
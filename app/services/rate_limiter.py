@@ -0,0 +1,166 @@
+"""
+호스트별 적응형 토큰 버킷 속도 제한
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from app.services.metrics import RATE_LIMIT_WAIT_SECONDS
+
+SEARCH_HOST = "search.naver.com"
+SHEETS_HOST = "sheets.googleapis.com"
+
+# 호스트별 설정 (rate: 초당 요청 수)
+HOST_LIMITS = {
+    SEARCH_HOST: {
+        "rate": float(os.environ.get('NAVER_RATE', '0.5')),
+        "min_rate": float(os.environ.get('NAVER_MIN_RATE', '0.1')),
+        "max_rate": float(os.environ.get('NAVER_MAX_RATE', '2.0')),
+    },
+    "blog.naver.com": {"rate": 1.0, "min_rate": 0.1, "max_rate": 3.0},
+    "rss.blog.naver.com": {"rate": 1.0, "min_rate": 0.1, "max_rate": 3.0},
+    # 시트 쓰기 할당량: 사용자당 분당 60회
+    SHEETS_HOST: {
+        "rate": float(os.environ.get('SHEETS_RATE', '1.0')),
+        "min_rate": 0.2,
+        "max_rate": float(os.environ.get('SHEETS_RATE', '1.0')),
+    },
+}
+DEFAULT_LIMIT = {"rate": 1.0, "min_rate": 0.1, "max_rate": 2.0}
+
+
+class AdaptiveRateLimiter:
+    """
+    지터가 들어간 토큰 버킷 (스레드/작업 간 공유)
+
+    - 정상 응답(2xx/3xx)이 이어지면 속도를 조금씩 올림
+    - 429/403/캡차 응답이면 속도를 절반으로 낮추고 지수 백오프 동안 요청 중단
+    - 서버 오류(5xx)면 속도를 조금 낮춤 (그 밖의 4xx는 속도를 바꾸지 않음)
+    """
+
+    def __init__(self, rate: float, min_rate: float, max_rate: float, burst: float = 1.0,
+                 jitter: float = 0.3, increase_step: float = 0.05, error_factor: float = 0.8,
+                 backoff_base: float = 5.0, backoff_max: float = 300.0, name: str = ""):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.jitter = jitter
+        self.increase_step = increase_step
+        self.error_factor = error_factor
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._block_streak = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """경과 시간만큼 토큰 보충 (lock 안에서 호출)"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        """토큰 하나를 예약하고 기다려야 할 시간(초) 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            # 토큰이 음수가 되는 만큼 뒤에 온 요청이 차례로 기다림
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            wait = max(wait, self._blocked_until - now)
+
+        if wait > 0:
+            wait += random.uniform(0, self.jitter / self.rate)
+        return wait
+
+    def next_available(self) -> float:
+        """지금 요청하면 기다려야 할 시간(초, 예약하지 않음)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self) -> float:
+        """요청 가능할 때까지 대기 (일반 스레드용). 기다린 시간 반환."""
+        wait = self._reserve()
+        RATE_LIMIT_WAIT_SECONDS.labels(self.name).observe(wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """요청 가능할 때까지 대기 (이벤트 루프용). 기다린 시간 반환. 기다리다 취소되면 예약한 토큰은 돌려줌."""
+        wait = self._reserve()
+        RATE_LIMIT_WAIT_SECONDS.labels(self.name).observe(wait)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                with self._lock:
+                    self._tokens = min(self.burst, self._tokens + 1)
+                raise
+        return wait
+
+    def record_success(self):
+        """정상 응답 → 속도 소폭 증가"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._block_streak = 0
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def record_error(self, status_code: int):
+        """차단이 아닌 오류 응답 → 속도를 올리지 않음 (5xx면 error_factor만큼 낮춤)"""
+        if status_code < 500:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.error_factor)
+
+    def record_block(self):
+        """차단 응답 → 속도 절반 + 지수 백오프"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._block_streak += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            backoff = min(self.backoff_max, self.backoff_base * 2 ** (self._block_streak - 1))
+            self._blocked_until = max(self._blocked_until, now + backoff)
+            self._tokens = min(self._tokens, 0.0)
+
+    def snapshot(self) -> dict:
+        """현재 상태 (상태 조회/디버깅용)"""
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "blocked_for": round(max(0.0, self._blocked_until - time.monotonic()), 1),
+                "block_streak": self._block_streak,
+            }
+
+
+_limiters: dict = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host: str, limits: Optional[dict] = None) -> AdaptiveRateLimiter:
+    """호스트별 공유 속도 제한기 (limits: 처음 만들 때 HOST_LIMITS 대신 쓸 설정)"""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(name=host, **(limits or HOST_LIMITS.get(host, DEFAULT_LIMIT)))
+            _limiters[host] = limiter
+        return limiter
+
+
+def limiter_for_url(url: str) -> AdaptiveRateLimiter:
+    """URL의 호스트에 해당하는 속도 제한기"""
+    return get_limiter(urlparse(url).hostname or "")
@@ -0,0 +1,161 @@
+"""
+반복 노출 체크 스케줄러 (프로세스 안에서 실행)
+
+반복 작업(스프레드시트, 탭, 기간, 시작/완료 목표 시각)을 작업 저장소에 두고
+매일 시작 시각이 지나면 그날 회차 작업을 한 번 등록한다.
+작업은 완료 목표 시각까지 키워드를 고르게 나눠서 체크하므로 (KeywordPacer)
+한꺼번에 몰려서 네이버 제한에 걸리지 않고, 하루 동안 작업 프로세스를 고르게 쓴다.
+
+- 회차는 저장소에서 원자적으로 가져가므로 여러 프로세스가 떠 있어도 하루 한 번만 실행
+- 서버가 꺼져 있던 날이 있으면 다음 회차의 기간을 그만큼 앞으로 늘려서 따라잡음
+- 회차 작업이 프로세스 종료로 중단됐으면 다른(또는 다시 뜬) 프로세스가 이어서 실행
+
+반복 작업 설정 (params)
+- spreadsheet_id, sheet_name
+- start_date / end_date : 고정 기간 (월/일), 또는
+- days                  : 오늘까지 최근 며칠 (예: 7이면 6일 전 ~ 오늘)
+- start_at              : 매일 시작 시각 "HH:MM" (기본 00:00)
+- finish_by             : 완료 목표 시각 "HH:MM" (없으면 나눠서 하지 않고 바로 실행)
+- recheck, recheck_limit: 이미 결과가 있는 행도 순위 이력 우선순위대로 다시 체크 (검색할 키워드 수 상한)
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from app.services.job_store import get_job_store
+
+# 반복 작업 확인 간격 (초)
+SCHEDULER_INTERVAL = float(os.environ.get('SCHEDULER_INTERVAL', '30'))
+# 서버가 꺼져 있던 날을 따라잡을 때 기간을 앞으로 늘리는 최대 일수
+SCHEDULE_MAX_CATCHUP_DAYS = 30
+
+
+def parse_clock(value: Optional[str], default: str = "00:00") -> tuple:
+    """"HH:MM" → (시, 분)"""
+    hour, _, minute = (value or default).strip().partition(":")
+    hour, minute = int(hour), int(minute or 0)
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"잘못된 시각: {value}")
+    return hour, minute
+
+
+def _month_day(day: date) -> str:
+    """시트 날짜 형식 (월/일)"""
+    return f"{day.month}/{day.day}"
+
+
+def schedule_window(params: dict, today: date, last_period: Optional[str]) -> tuple:
+    """
+    이번 회차의 체크 기간 (시작일, 종료일)
+    최근 며칠 방식이면 지난 회차 이후 건너뛴 날만큼 시작일을 앞당김 (시트 날짜에 연도가 없으므로 1/1 이전으로는 넘기지 않음)
+    """
+    if not params.get("days"):
+        return params["start_date"], params["end_date"]
+
+    start = today - timedelta(days=int(params["days"]) - 1)
+    if last_period:
+        missed = (today - date.fromisoformat(last_period)).days - 1
+        start -= timedelta(days=min(max(0, missed), SCHEDULE_MAX_CATCHUP_DAYS))
+    if start.year < today.year:
+        start = date(today.year, 1, 1)
+    return _month_day(start), _month_day(today)
+
+
+def schedule_deadline(params: dict, now: datetime) -> Optional[float]:
+    """
+    이번 회차의 완료 목표 시각 (타임스탬프)
+    완료 시각이 시작 시각보다 이르면 다음 날로 보고, 이미 지났으면 None (나누지 않고 바로 실행)
+    """
+    if not params.get("finish_by"):
+        return None
+    hour, minute = parse_clock(params.get("start_at"))
+    start_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    hour, minute = parse_clock(params["finish_by"])
+    finish = start_at.replace(hour=hour, minute=minute)
+    if finish <= start_at:
+        finish += timedelta(days=1)
+    return finish.timestamp() if finish > now else None
+
+
+class Scheduler:
+    """반복 작업을 확인해서 그날 회차 작업을 등록하는 스레드"""
+
+    def __init__(self, interval: float = SCHEDULER_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"반복 작업 확인 오류: {e}")
+            self._stop.wait(self.interval)
+
+    def tick(self, now: Optional[datetime] = None):
+        """등록된 반복 작업마다 이번 회차 실행 / 중단된 회차 이어서 실행"""
+        now = now or datetime.now()
+        store = get_job_store()
+        for schedule in store.list_schedules():
+            if not schedule["enabled"]:
+                continue
+            try:
+                self._run_schedule(store, schedule, now)
+            except Exception as e:
+                print(f"반복 작업 실행 오류 ({schedule['id']}): {e}")
+
+    def _run_schedule(self, store, schedule: dict, now: datetime):
+        # 순환 import 방지 (job_manager → sheet_checker)
+        from app.services.job_manager import job_manager
+
+        params = schedule["params"]
+        if (now.hour, now.minute) < parse_clock(params.get("start_at")):
+            return
+
+        period = now.date().isoformat()
+        if store.claim_period(schedule["id"], period):
+            start_date, end_date = schedule_window(params, now.date(), schedule["last_period"])
+            deadline = schedule_deadline(params, now)
+            state = job_manager.submit(start_date, end_date, params["spreadsheet_id"], params["sheet_name"],
+                                       deadline=deadline, recheck=params.get("recheck", False),
+                                       recheck_limit=params.get("recheck_limit"))
+            store.set_schedule_job(schedule["id"], state["job_id"])
+            print(f"반복 작업 {schedule['id']} 실행: {start_date} ~ {end_date} (작업 ID: {state['job_id']})")
+            return
+
+        # 이번 회차 작업이 프로세스 종료로 중단됐으면 이어서 실행 (한 프로세스만 가져감)
+        job_id = schedule["last_job_id"]
+        if job_id and store.claim_job(job_id, "interrupted", "queued"):
+            job = store.get_job(job_id)
+            job_params = job["params"]
+            deadline = job_params.get("deadline")
+            job_manager.submit(job_params["start_date"], job_params["end_date"], job_params["spreadsheet_id"],
+                               job_params["sheet_name"], job_id=job_id,
+                               deadline=deadline if deadline and deadline > time.time() else None,
+                               recheck=job_params.get("recheck", False),
+                               recheck_limit=job_params.get("recheck_limit"))
+            print(f"반복 작업 {schedule['id']}의 중단된 작업 이어서 실행 (작업 ID: {job_id})")
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """프로세스 전역 스케줄러"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+        return _scheduler
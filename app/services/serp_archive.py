@@ -0,0 +1,226 @@
+"""
+가져온 검색 결과 페이지 / RSS 피드 원본 보관소 (압축, 내용 주소 방식)
+
+파싱 로직이 바뀌거나 결과가 이상해 보일 때 네이버에 다시 요청하지 않고
+보관한 원본으로 순위를 다시 계산할 수 있게 한다 (reparse_archive.py).
+
+- 원본: objects/<sha256 앞 2자리>/<sha256>.gz (같은 내용은 한 번만 저장)
+- 목록: index.db (종류, 키워드/블로그 ID, 가져온 시각 → 원본 해시)
+- 전체 크기가 SERP_ARCHIVE_MAX_MB를 넘으면 오래된 것부터 삭제
+
+기본은 보관 안 함 (SERP_ARCHIVE_DIR에 폴더를 지정해야 켜짐).
+켜면 순위만 확인하는 요청도 원본을 남기려고 페이지 끝까지 받으므로
+찾는 글이 나오면 응답을 끊는 절약(SERP_MATCH_ONLY)이 없어지고 디스크도 최대 SERP_ARCHIVE_MAX_MB까지 쓴다.
+"""
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# 보관 폴더 (빈 값이면 보관 안 함, 예: ./serp_archive)
+SERP_ARCHIVE_DIR = os.environ.get('SERP_ARCHIVE_DIR', '')
+# 압축된 원본 전체 크기 한도 (MB)
+SERP_ARCHIVE_MAX_MB = float(os.environ.get('SERP_ARCHIVE_MAX_MB', '1024'))
+
+# 한도를 넘으면 이 비율까지 줄임 (매번 조금씩 지우지 않도록)
+_PRUNE_TARGET = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha         TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    sha         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_key ON entries (kind, key, fetched_at);
+CREATE INDEX IF NOT EXISTS entries_time ON entries (fetched_at);
+CREATE INDEX IF NOT EXISTS entries_sha ON entries (sha);
+"""
+
+
+def archive_key(key: str) -> str:
+    """같은 키워드로 볼 키 (앞뒤/중복 공백 무시)"""
+    return " ".join(key.split())
+
+
+def blog_tab_key(keyword: str, page: int) -> str:
+    """블로그 탭 페이지 원본의 키 (키워드 + 페이지 번호)"""
+    return f"{archive_key(keyword)} #{page}"
+
+
+class SerpArchive:
+    """원본 보관소 (여러 스레드에서 공유)"""
+
+    def __init__(self, root: str = SERP_ARCHIVE_DIR, max_bytes: int = int(SERP_ARCHIVE_MAX_MB * 1024 * 1024)):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self.total_bytes = self._conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.root, 'objects', sha[:2], f"{sha}.gz")
+
+    def put(self, kind: str, key: str, data: bytes, fetched_at: Optional[float] = None) -> str:
+        """원본 하나 보관 (kind: search / blog_tab / rss) → 내용 해시"""
+        sha = hashlib.sha256(data).hexdigest()
+        fetched_at = fetched_at or time.time()
+
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM blobs WHERE sha = ?", (sha,)).fetchone()
+
+        if not exists:
+            # 압축/파일 쓰기는 잠금 밖에서 (같은 내용을 동시에 써도 결과는 같음)
+            path = self._path(sha)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = gzip.compress(data, compresslevel=6, mtime=0)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+
+        with self._lock, self._conn:
+            if not exists:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (sha, size, stored_size) VALUES (?, ?, ?)",
+                    (sha, len(data), len(compressed)),
+                )
+                self.total_bytes += len(compressed) if cursor.rowcount else 0
+            self._conn.execute(
+                "INSERT INTO entries (kind, key, fetched_at, sha) VALUES (?, ?, ?, ?)",
+                (kind, archive_key(key), fetched_at, sha),
+            )
+
+        if self.total_bytes > self.max_bytes:
+            self.prune()
+        return sha
+
+    def read(self, sha: str) -> bytes:
+        """원본 내용 (압축 해제)"""
+        with open(self._path(sha), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def entries(self, kind: str = "search", start: Optional[float] = None, end: Optional[float] = None,
+                key: Optional[str] = None) -> list:
+        """보관 목록 (가져온 시각 순) → [{"kind", "key", "fetched_at", "sha"}]"""
+        sql = "SELECT kind, key, fetched_at, sha FROM entries WHERE kind = ?"
+        params = [kind]
+        if start is not None:
+            sql += " AND fetched_at >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND fetched_at < ?"
+            params.append(end)
+        if key is not None:
+            sql += " AND key = ?"
+            params.append(archive_key(key))
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY fetched_at", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest(self, kind: str, key: str, before: Optional[float] = None) -> Optional[dict]:
+        """before 시각 이전에 가져온 가장 최근 원본"""
+        sql = "SELECT kind, key, fetched_at, sha FROM entries WHERE kind = ? AND key = ?"
+        params = [kind, archive_key(key)]
+        if before is not None:
+            sql += " AND fetched_at <= ?"
+            params.append(before)
+        with self._lock:
+            row = self._conn.execute(sql + " ORDER BY fetched_at DESC LIMIT 1", params).fetchone()
+        return dict(row) if row else None
+
+    def prune(self):
+        """전체 크기가 한도의 90%가 될 때까지 오래된 항목과 더 이상 쓰지 않는 원본 삭제"""
+        target = self.max_bytes * _PRUNE_TARGET
+        removed = []
+        with self._lock, self._conn:
+            while self.total_bytes > target:
+                oldest = self._conn.execute(
+                    "SELECT id, sha FROM entries ORDER BY fetched_at LIMIT 50"
+                ).fetchall()
+                if not oldest:
+                    break
+
+                for entry in oldest:
+                    if self.total_bytes <= target:
+                        break
+                    self._conn.execute("DELETE FROM entries WHERE id = ?", (entry["id"],))
+                    if self._conn.execute("SELECT 1 FROM entries WHERE sha = ?", (entry["sha"],)).fetchone():
+                        continue
+                    # 다른 항목이 쓰지 않는 원본만 삭제
+                    blob = self._conn.execute("SELECT stored_size FROM blobs WHERE sha = ?", (entry["sha"],)).fetchone()
+                    self._conn.execute("DELETE FROM blobs WHERE sha = ?", (entry["sha"],))
+                    self.total_bytes -= blob["stored_size"] if blob else 0
+                    removed.append(entry["sha"])
+
+        for sha in removed:
+            try:
+                os.remove(self._path(sha))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT kind, COUNT(*) AS n FROM entries GROUP BY kind").fetchall()
+            blobs = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return {
+            "entries": {row["kind"]: row["n"] for row in entries},
+            "blobs": blobs[0],
+            "raw_bytes": blobs[1],
+            "stored_bytes": self.total_bytes,
+        }
+
+
+_archive: Optional[SerpArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> Optional[SerpArchive]:
+    """프로세스 전역 보관소 (SERP_ARCHIVE_DIR가 비어 있으면 None)"""
+    global _archive
+    if not SERP_ARCHIVE_DIR:
+        return None
+    with _archive_lock:
+        if _archive is None:
+            _archive = SerpArchive()
+        return _archive
+
+
+_writer: Optional[ThreadPoolExecutor] = None
+
+
+def archive_page_later(kind: str, key: str, data: bytes):
+    """원본 보관을 백그라운드 스레드에서 (검색 요청 스레드가 압축/파일 쓰기를 기다리지 않도록)"""
+    global _writer
+    if not SERP_ARCHIVE_DIR or not data:
+        return
+    with _archive_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="serp-archive")
+    _writer.submit(archive_page, kind, key, data, time.time())
+
+
+def archive_page(kind: str, key: str, data: bytes, fetched_at: Optional[float] = None):
+    """가져온 원본 보관 (보관 실패가 검색을 막지 않도록 오류는 출력만)"""
+    try:
+        archive = get_archive()
+        if archive is not None and data:
+            archive.put(kind, key, data, fetched_at)
+    except Exception as e:
+        print(f"원본 보관 실패 ({kind} {key}): {e}")
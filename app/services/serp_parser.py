@@ -0,0 +1,195 @@
+"""
+네이버 검색 결과 페이지 파서 (lxml 직접 사용)
+
+BeautifulSoup 트리 전체를 만들고 모든 <a>를 도는 대신,
+href에 blog.naver.com이 들어간 링크만 XPath로 골라 처리한다.
+결과(순위, 제목, URL)는 기존 BeautifulSoup 구현과 동일하다.
+
+순위만 필요하면 RankFinder로 응답을 받는 대로 조금씩 파싱하다가
+찾는 글이 나오거나 최대 순위를 넘으면 멈출 수 있다 (결과 목록을 만들지 않음).
+"""
+import re
+import time
+from typing import Iterable, Optional
+
+import lxml.html
+from lxml import etree
+
+from app.models.schemas import BlogResult
+from app.services.metrics import LINKS_PER_PAGE, PARSE_SECONDS
+
+# 포스트 ID 패턴 (blog.naver.com/blogid/12345, blogid.blog.me/12345)
+NAVER_POST_RE = re.compile(r'blog\.naver\.com/[^/]+/(\d+)')
+BLOG_ME_POST_RE = re.compile(r'\.blog\.me/(\d+)')
+
+# href에 blog.naver.com이 들어간 링크만 (libxml2 안에서 걸러짐, 문서 순서 유지)
+BLOG_LINK_XPATH = etree.XPath('//a[contains(@href, "blog.naver.com")]')
+
+# BeautifulSoup의 get_text()가 건너뛰는 태그
+_SKIP_TEXT_TAGS = frozenset(("script", "style", "template"))
+
+
+def extract_post_id(url: str) -> Optional[str]:
+    """블로그 URL에서 포스트 ID(숫자) 추출"""
+    match = NAVER_POST_RE.search(url)
+    if match:
+        return match.group(1)
+
+    match = BLOG_ME_POST_RE.search(url)
+    if match:
+        return match.group(1)
+
+    return None
+
+
+def _append_text(element, parts: list):
+    """element 아래 텍스트를 strip해서 parts에 추가 (주석/스크립트 제외)"""
+    if element.text and element.tag not in _SKIP_TEXT_TAGS:
+        parts.append(element.text.strip())
+
+    for child in element:
+        # 주석/처리 명령은 tag가 문자열이 아님 → 본문은 건너뛰고 tail만 사용
+        if isinstance(child.tag, str):
+            _append_text(child, parts)
+        if child.tail:
+            parts.append(child.tail.strip())
+
+
+def link_text(element) -> str:
+    """BeautifulSoup의 get_text(strip=True)와 같은 규칙으로 링크 텍스트 추출"""
+    if len(element) == 0:
+        return (element.text or "").strip()
+
+    parts = []
+    _append_text(element, parts)
+    return "".join(parts)
+
+
+def _parse_document(html):
+    """HTML 문자열/바이트 → lxml 문서 (빈 문서면 None)"""
+    if not html or not html.strip():
+        return None
+
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # 인코딩 선언이 들어간 str은 lxml이 거부 → bytes로 다시 시도
+        if isinstance(html, str):
+            return lxml.html.document_fromstring(html.encode('utf-8'))
+        raise
+    except etree.ParserError:
+        return None
+
+
+def parse_blog_results(html) -> list[BlogResult]:
+    """검색 결과 HTML에서 블로그 글 목록 추출 (포스트 ID 기준 중복 제거, 노출 순서대로 순위 부여)"""
+
+    start = time.perf_counter()
+    results = _extract_blog_results(html)
+    PARSE_SECONDS.observe(time.perf_counter() - start)
+    LINKS_PER_PAGE.observe(len(results))
+    return results
+
+
+def _extract_blog_results(html) -> list[BlogResult]:
+    document = _parse_document(html)
+    if document is None:
+        return []
+
+    results = []
+    seen_post_ids = set()  # 중복 포스트 ID 제거용
+
+    for link in BLOG_LINK_XPATH(document):
+        href = link.get('href')
+
+        post_id = extract_post_id(href)
+        if not post_id or post_id in seen_post_ids:
+            continue
+
+        # 제목 추출 - 의미있는 텍스트가 있는 링크만 결과로 추가
+        title = link_text(link)
+        if len(title) <= 3:
+            continue
+
+        seen_post_ids.add(post_id)
+
+        results.append(BlogResult(
+            rank=len(results) + 1,
+            title=title,
+            url=href,
+            description="",
+            blog_name="",
+            date=""
+        ))
+
+    return results
+
+
+class RankFinder:
+    """
+    검색 결과 HTML을 조각(bytes)으로 받아 점진적으로 파싱하면서 찾는 글의 순위만 확인
+    - 순위 규칙은 parse_blog_results와 같음 (포스트 ID 중복 제거, 제목이 짧은 링크 제외)
+    - 찾는 글을 모두 찾았거나 max_rank개를 넘으면 done (0이면 끝까지)
+    """
+
+    def __init__(self, target_ids: Iterable[str], max_rank: int = 0):
+        self.targets = {post_id for post_id in target_ids if post_id}
+        self.max_rank = max_rank
+        self.ranks = {}   # 포스트 ID → 순위
+        self.count = 0    # 지금까지 센 블로그 글 수
+        self.done = not self.targets
+        self._seen = set()
+        self._parser = etree.HTMLPullParser(events=("end",), tag="a")
+
+    def feed(self, chunk: bytes) -> bool:
+        """조각 하나 파싱. 더 읽을 필요가 없으면 True."""
+        if not self.done:
+            self._parser.feed(chunk)
+            self._read_events()
+        return self.done
+
+    def close(self) -> dict:
+        """응답 끝 (남은 부분 파싱) → {포스트 ID: 순위}"""
+        if not self.done:
+            try:
+                self._parser.close()
+            except etree.XMLSyntaxError:
+                pass
+            self._read_events()
+            self.done = True
+        return self.ranks
+
+    def _read_events(self):
+        for _, link in self._parser.read_events():
+            if not self.done:
+                self._add(link)
+            # 확인한 링크의 하위 요소는 더 필요 없음
+            link.clear(keep_tail=True)
+
+    def _add(self, link):
+        href = link.get('href')
+        if not href or 'blog.naver.com' not in href:
+            return
+
+        post_id = extract_post_id(href)
+        if not post_id or post_id in self._seen:
+            return
+        if len(link_text(link)) <= 3:
+            return
+
+        self._seen.add(post_id)
+        self.count += 1
+        if post_id in self.targets and post_id not in self.ranks:
+            self.ranks[post_id] = self.count
+
+        if len(self.ranks) == len(self.targets) or (self.max_rank and self.count >= self.max_rank):
+            self.done = True
+
+
+def find_ranks(chunks: Iterable[bytes], target_ids: Iterable[str], max_rank: int = 0) -> dict:
+    """HTML 조각들에서 찾는 글들의 순위 → {포스트 ID: 순위} (다 찾으면 나머지는 읽지 않음)"""
+    finder = RankFinder(target_ids, max_rank)
+    for chunk in chunks:
+        if finder.feed(chunk):
+            break
+    return finder.close()
@@ -5,27 +5,55 @@ import gspread
 from google.oauth2.service_account import Credentials
 import os
 import re
+import socket
+import threading
 import time
+import uuid
 import json
-import threading
-from app.services.naver_search import search_naver_view
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.egress import get_egress_pool
+from app.services.naver_search import extract_post_id, match_exposure, parse_blog_results
+from app.services.fetch_engine import cache_key, get_engine
 from app.services.blog_fetcher import find_post_by_title, extract_blog_id
+from app.services.job_events import publish_row, publish_state
+from app.services.job_store import get_job_store
+from app.services.metrics import JobThroughput, PIPELINE_STAGE_SECONDS
+from app.services.rank_history import get_rank_history, record_ranks
+from app.services.sheet_pipeline import Pipeline
+from app.services.sheet_reader import SheetColumns
+from app.services.sheet_writer import BufferedSheetWriter
 
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
     'https://www.googleapis.com/auth/drive'
 ]
 
-# 전역 작업 상태
-task_state = {
-    "status": "idle",      # idle / running / paused / completed / stopped
-    "current": 0,
-    "total": 0,
-    "message": "",
-    "result": None,
-}
+# 노출 체크에 사용하는 열
+SHEET_COLUMNS = ("A", "E", "O", "Q", "T", "W")
+
+# 링크 업데이트(1단계)에서 동시에 처리할 블로그 수
+LINK_WORKERS = int(os.environ.get('LINK_WORKERS', '4'))
+# 노출 체크(2단계) 파이프라인의 파싱 스레드 수
+PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', '1'))
+# 노출 체크에서 검색 페이지 전체를 파싱하지 않고 찾는 글의 순위만 확인 (찾으면 나머지 응답은 받지 않음)
+# 순위 결과도 (키워드, 찾는 글) 단위로 검색 결과 캐시에 두고 같은 요청이 진행 중이면 합류
+SERP_MATCH_ONLY = os.environ.get('SERP_MATCH_ONLY', '1') == '1'
+# 검색이 차단/실패한 행을 다시 검색하는 횟수
+EXPOSURE_RETRY_PASSES = int(os.environ.get('EXPOSURE_RETRY_PASSES', '1'))
+# 행 작업자가 한 번에 임대하는 키워드 수 / 임대 시간(초) / 큐가 비었을 때 확인 간격(초)
+WORK_BATCH_KEYWORDS = int(os.environ.get('WORK_BATCH_KEYWORDS', '8'))
+WORK_LEASE_SECONDS = float(os.environ.get('WORK_LEASE_SECONDS', '60'))
+WORK_POLL_INTERVAL = float(os.environ.get('WORK_POLL_INTERVAL', '1'))
+# 작업 프로세스 생존 기록 / 임대 연장 간격(초)
+WORKER_HEARTBEAT_SECONDS = 10
+# 완료 목표 시각이 있는 작업에서 마지막 키워드를 목표보다 먼저 풀어주는 최대 여유(초)
+PACE_MARGIN_SECONDS = 600
+
 
 SPREADSHEET_ID = os.environ.get('SPREADSHEET_ID', '1me29DkuUo52Lf4MV2i38ZEpWKuOwEEhjtm8gt7jYRgU')
+SHEET_NAME = os.environ.get('SHEET_NAME', '발행')
 CREDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'credentials.json')
 
 
@@ -76,62 +104,541 @@ def has_post_id(url: str) -> bool:
     return bool(re.search(r'/\d+(?:\?.*)?$', url.rstrip("'")))
 
 
-def _wait_if_paused():
-    """일시정지 상태이면 재개될 때까지 대기. stopped이면 True 반환."""
-    while task_state["status"] == "paused":
+def new_task_state(job_id: Optional[str] = None) -> dict:
+    """작업 하나의 진행 상태"""
+    return {
+        "status": "idle",      # idle / queued / running / paused / completed / stopped
+        "current": 0,
+        "total": 0,
+        "message": "",
+        "result": None,
+        "job_id": job_id,
+        "queues": {},          # 노출 체크 파이프라인 단계별 대기 항목 수
+    }
+
+
+# 작업별 마지막 갱신 시각 기록 (링크 업데이트처럼 긴 단계에서도 종료된 작업으로 보이지 않도록)
+_last_touch: dict = {}
+
+
+def _update_progress(state: dict, **fields):
+    """진행 상태 변경 + 구독자(SSE)에게 알림"""
+    state.update(fields)
+    publish_state(state)
+
+    job_id = state.get("job_id")
+    now = time.monotonic()
+    if job_id and now - _last_touch.get(job_id, 0.0) > 5:
+        _last_touch[job_id] = now
+        get_job_store().touch([job_id])
+
+
+def _wait_if_paused(state: dict, writer: BufferedSheetWriter = None):
+    """일시정지 상태이면 재개될 때까지 대기. stopped이면 True 반환.
+    일시정지/중단 시에는 쌓여있던 시트 업데이트를 먼저 전송."""
+    if writer and state["status"] in ("paused", "stopped"):
+        writer.flush()
+    while state["status"] == "paused":
         time.sleep(0.5)
-    return task_state["status"] == "stopped"
+    return state["status"] == "stopped"
+
+
+def _resolve_blog_links(blog_id: str, rows: list, state: dict) -> list:
+    """블로그 하나에 속한 행들의 실제 글 링크 찾기 → [(행 번호, 새 URL 또는 None)]"""
+    resolved = []
+    for row_num, title in rows:
+        if _wait_if_paused(state):
+            break
+        resolved.append((row_num, find_post_by_title(blog_id, title)))
+    return resolved
+
+
+def _wait_for_breaker(state: dict, seconds: float) -> bool:
+    """차단 감지로 검색이 멈춘 동안 대기 (일시정지 중이면 재개까지). stopped이면 True 반환."""
+    _update_progress(state, message=f"네이버 차단 감지, {seconds:.0f}초 후 재개...")
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline or state["status"] == "paused":
+        if state["status"] == "stopped":
+            return True
+        time.sleep(0.5)
+    return state["status"] == "stopped"
+
+
+def _fetch_stage(item: dict, state: dict) -> dict:
+    """
+    파이프라인 검색 단계: 캐시에 없으면 검색 페이지 HTML 가져오기 (차단기가 열려 있으면 닫힐 때까지 대기)
+    SERP_MATCH_ONLY면 HTML 대신 키워드에 속한 글들의 순위만 확인 → item["found"]
+    """
+    engine = get_engine()
+    # miss는 실제로 새로 요청하는 쪽에서 한 번만 셈 (순위만 확인하면 엔진이 셈)
+    cached = engine.cache.get(cache_key(item["keyword"]), count_miss=False)
+    if cached:
+        item["results"] = cached[0]
+        return item
+    if not SERP_MATCH_ONLY:
+        engine.cache.count("miss")
+
+    while True:
+        try:
+            if SERP_MATCH_ONLY:
+                target_ids = [extract_post_id(row_data['link']) for row_data in item["rows"]]
+                item["found"], _ = engine.find_ranks_sync(item["keyword"], target_ids)
+            else:
+                item["html"] = engine.fetch_page_sync(item["keyword"])
+        except CircuitOpenError as e:
+            if not _wait_for_breaker(state, e.retry_after):
+                continue
+            item["error"] = e
+        except Exception as e:
+            item["error"] = e
+        return item
+
+
+def _parse_stage(item: dict) -> dict:
+    """
+    파이프라인 파싱 단계: HTML 파싱 + 키워드에 속한 행마다 순위 확인 → item["ranks"]
+    검색이 차단/실패한 키워드의 행은 순위 대신 None (노출 안됨이 아니라 다시 검색할 행)
+    """
+    if item.get("error"):
+        item["ranks"] = [(row_data, None) for row_data in item["rows"]]
+        return item
+
+    if "found" in item:
+        found = item["found"]
+        item["ranks"] = [(row_data, str(found.get(extract_post_id(row_data['link']), "-")))
+                         for row_data in item["rows"]]
+        return item
+
+    results = item.get("results")
+    if results is None:
+        results = parse_blog_results(item["html"])
+        get_engine().cache.put(cache_key(item["keyword"]), results)
+        item.pop("html", None)
+
+    ranks = []
+    for row_data in item["rows"]:
+        result = match_exposure(item["keyword"], row_data['link'], results)
+        ranks.append((row_data, str(result.exposed_rank) if result.is_exposed else "-"))
+    item["ranks"] = ranks
+    return item
+
+
+def _finish(state: dict, status: str, result: dict) -> dict:
+    """작업 종료 상태를 진행 상태와 작업 저장소에 기록"""
+    get_job_store().finish(state["job_id"], status, result)
+    get_job_store().release(state["job_id"])
+    _local_states.pop(state["job_id"], None)
+    _last_touch.pop(state["job_id"], None)
+    # 끝난 작업에 마지막 대기 항목 수가 남지 않도록
+    _update_progress(state, status=status, result=result, queues={})
+    return result
+
+
+def open_worksheet(spreadsheet_id: str, sheet_name: str):
+    """시트 열기 (인증 정보가 없으면 None)"""
+    creds = get_credentials()
+    if not creds:
+        return None
+    return gspread.authorize(creds).open_by_key(spreadsheet_id).worksheet(sheet_name)
+
+
+# 이 프로세스에서 실행 중인 작업의 진행 상태 (행 작업자가 행 결과를 바로 알릴 때 사용)
+_local_states: dict = {}
+
+
+class RowWorker:
+    """
+    행 작업자: 작업 저장소의 행 큐에서 키워드 단위로 행을 임대해서 노출 체크
+    (프로세스마다 하나, 어느 프로세스에서 시작한 작업이든 처리)
 
+    임대 → 검색 → 파싱 → 시트 기록을 하나의 파이프라인으로 계속 돌리고
+    (임대 묶음 사이에 멈추지 않음), 시트에 전송될 때까지 임대를 연장한다.
+    프로세스가 종료되면 임대 시간이 지난 뒤 다른 프로세스의 작업자가 다시 가져간다.
+    """
 
-def check_sheet_exposure(start_date: str, end_date: str) -> dict:
+    def __init__(self):
+        self.id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.rows = 0
+        self._sheets = {}   # (스프레드시트 ID, 시트 이름) → 시트
+        self._writers = {}  # 작업 ID → 시트 기록 버퍼
+        self._unsaved = {}  # 작업 ID → 시트 버퍼에만 있고 아직 완료로 저장하지 않은 [(행 번호, 순위)]
+        self._lock = threading.Lock()
+        self._control = {"status": "running"}  # 파이프라인 중단용
+        self._pipeline: Optional[Pipeline] = None  # 지금 돌고 있는 파이프라인 (단계별 대기 항목 수 보고용)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="row-worker", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """새 행이 등록됨 (기다리지 않고 바로 임대 시도)"""
+        self._wake.set()
+
+    def stop(self):
+        """종료 (처리하지 못한 임대 행은 바로 반납)"""
+        self._stop.set()
+        self._wake.set()
+        self._control["status"] = "stopped"
+        if self._thread:
+            self._thread.join(timeout=10)
+        get_job_store().release_leases(self.id)
+
+    def depths(self) -> dict:
+        """파이프라인 단계별 대기 항목 수 (이 프로세스에서 처리 중인 모든 작업의 행 합산)"""
+        pipeline = self._pipeline
+        return pipeline.depths() if pipeline else {}
+
+    def _heartbeat(self):
+        """생존 기록 + 처리 중인 행 임대 연장 (차단 대기처럼 오래 걸려도 임대가 끝나지 않도록)"""
+        store = get_job_store()
+        while not self._stop.wait(WORKER_HEARTBEAT_SECONDS):
+            try:
+                store.worker_heartbeat(self.id, socket.gethostname(), os.getpid(), self.rows)
+                store.renew_leases(self.id, WORK_LEASE_SECONDS)
+                store.mark_interrupted()
+            except Exception as e:
+                print(f"행 작업자 생존 기록 실패: {e}")
+
+    def _loop(self):
+        store = get_job_store()
+        store.worker_heartbeat(self.id, socket.gethostname(), os.getpid(), self.rows)
+        threading.Thread(target=self._heartbeat, name="row-worker-heartbeat", daemon=True).start()
+
+        while not self._stop.is_set():
+            pipeline = Pipeline(self._control, ("fetch", "parse", "write"))
+            self._pipeline = pipeline
+            pipeline.source(self._leased_items(), "fetch")
+            pipeline.stage(self._fetch, "fetch", "parse", workers=get_engine().concurrency)
+            pipeline.stage(lambda item: item if item.get("released") else _parse_stage(item),
+                           "parse", "write", workers=PARSE_WORKERS)
+            try:
+                for item in pipeline.results("write"):
+                    self._write(item)
+            except Exception as e:
+                print(f"행 작업자 오류: {e}")
+
+            # 파이프라인이 멈추면 처리 중이던 행은 반납하고 다시 시작
+            self._flush_all()
+            store.release_leases(self.id)
+            self._stop.wait(WORK_POLL_INTERVAL)
+
+    def _leased_items(self):
+        """파이프라인 입력: 임대한 행을 키워드별로 묶어서 계속 내보냄 (큐가 비면 쌓인 시트 기록을 보내고 기다림)"""
+        store = get_job_store()
+        pool = get_egress_pool()
+        while not self._stop.is_set():
+            # 이 프로세스의 검색 경로가 모두 막힌 동안은 다른 프로세스가 가져가도록 임대하지 않음
+            if pool.remaining() > 0:
+                self._flush_all()
+                self._stop.wait(min(pool.remaining(), WORK_POLL_INTERVAL * 5))
+                continue
+
+            rows = store.lease_rows(self.id, WORK_BATCH_KEYWORDS, WORK_LEASE_SECONDS, EXPOSURE_RETRY_PASSES)
+            if not rows:
+                self._flush_all()
+                self._wake.wait(WORK_POLL_INTERVAL)
+                self._wake.clear()
+                continue
+
+            keyword_groups = {}
+            for row in rows:
+                keyword_groups.setdefault(row["keyword"], []).append(row)
+            for keyword, group in keyword_groups.items():
+                yield {"job_id": rows[0]["job_id"], "keyword": keyword, "rows": group}
+
+    def _fetch(self, item: dict) -> dict:
+        """검색 단계: 그 사이 일시정지/중단된 작업의 행은 검색하지 않고 반납 표시"""
+        if get_job_store().job_status(item["job_id"]) != "running":
+            item["released"] = True
+            return item
+        return _fetch_stage(item, self._control)
+
+    def _writer(self, job_id: str) -> BufferedSheetWriter:
+        writer = self._writers.get(job_id)
+        if writer is None:
+            job = get_job_store().get_job(job_id)
+            key = (job["params"].get("spreadsheet_id", SPREADSHEET_ID), job["params"].get("sheet_name", SHEET_NAME))
+            if key not in self._sheets:
+                sheet = open_worksheet(*key)
+                if sheet is None:
+                    raise RuntimeError("인증 정보가 없습니다.")
+                self._sheets[key] = sheet
+            writer = BufferedSheetWriter(self._sheets[key])
+            self._writers[job_id] = writer
+            self._unsaved[job_id] = []
+        return writer
+
+    def _save(self, job_id: str):
+        """시트에 전송된 행 → 완료로 저장 (실행 시간은 작업을 시작한 프로세스가 누적)"""
+        rows = self._unsaved.get(job_id)
+        if rows:
+            get_job_store().checkpoint(job_id, rows, 0)
+            self.rows += len(rows)
+            self._unsaved[job_id] = []
+
+    def _write(self, item: dict):
+        """
+        파이프라인 마지막 단계: 순위를 시트 버퍼에 기록
+        행은 시트에 전송된 뒤에 완료로 저장하고 (그 전까지는 임대 유지),
+        일시정지/중단된 작업의 행은 반납한다.
+        """
+        write_start = time.perf_counter()
+        store = get_job_store()
+        job_id = item["job_id"]
+        keyword = item["keyword"]
+        state = _local_states.get(job_id)
+
+        # 다른 프로세스에서 일시정지/중단해도 저장소 상태로 알 수 있음
+        if item.get("released") or store.job_status(job_id) != "running":
+            store.release_leases(self.id, job_id, [row_data['row_num'] for row_data in item["rows"]])
+            return
+
+        if item.get("error"):
+            print(f"검색 실패 ({keyword}): {item['error']}")
+
+        record_ranks([(keyword, row_data['link'], rank_value)
+                      for row_data, rank_value in item["ranks"] if rank_value is not None], job_id)
+
+        retry = []
+        with self._lock:
+            writer = self._writer(job_id)
+            for row_data, rank_value in item["ranks"]:
+                if state is not None:
+                    publish_row(state, {"row_num": row_data['row_num'], "keyword": keyword, "link": row_data['link'], "rank": rank_value})
+                if rank_value is None:
+                    retry.append(row_data['row_num'])
+                    continue
+                self._unsaved[job_id].append((row_data['row_num'], rank_value))
+                try:
+                    writer.update_cell(row_data['row_num'], 23, rank_value)  # W열
+                except Exception as e:
+                    self._drop_writer(job_id, e)
+                    break
+                if writer.pending_count == 0:
+                    self._save(job_id)
+
+        store.mark_retry(job_id, retry)
+        PIPELINE_STAGE_SECONDS.labels("write").observe(time.perf_counter() - write_start)
+
+    def _drop_writer(self, job_id: str, error: Exception):
+        """시트 전송 실패: 전송하지 못한 행은 반납해서 다시 처리 (lock 안에서 호출)"""
+        print(f"시트 쓰기 실패: {error}")
+        rows = self._unsaved.pop(job_id, [])
+        writer = self._writers.pop(job_id, None)
+        if writer:
+            writer.close(flush=False)
+        get_job_store().release_leases(self.id, job_id, [row_num for row_num, _ in rows])
+
+    def _flush_all(self):
+        """쌓인 시트 기록 전송 + 완료로 저장"""
+        with self._lock:
+            for job_id, writer in list(self._writers.items()):
+                try:
+                    writer.flush()
+                    self._save(job_id)
+                except Exception as e:
+                    self._drop_writer(job_id, e)
+
+
+_row_worker: Optional[RowWorker] = None
+_row_worker_lock = threading.Lock()
+
+
+def get_row_worker() -> RowWorker:
+    """프로세스 전역 행 작업자"""
+    global _row_worker
+    with _row_worker_lock:
+        if _row_worker is None:
+            _row_worker = RowWorker()
+        return _row_worker
+
+
+class KeywordPacer:
+    """
+    완료 목표 시각까지 남은 키워드를 고르게 풀어주는 속도 조절
+    (남은 키워드 수 / 남은 시간으로 매번 다시 계산하므로 일시정지/재시작 뒤에도 남은 시간에 맞춰 따라잡음)
+    """
+
+    def __init__(self, deadline: float):
+        now = time.time()
+        # 마지막 키워드도 목표 시각 전에 끝나도록 여유 (남은 시간의 10%, 최대 10분)
+        self.deadline = deadline - min(PACE_MARGIN_SECONDS, max(0.0, deadline - now) * 0.1)
+        self.credit = 1.0  # 처음 키워드는 바로
+        self.last = now
+
+    def hold(self):
+        """일시정지 중: 그 시간만큼은 쌓지 않음"""
+        self.last = time.time()
+
+    def due(self, remaining: int) -> int:
+        """지금 풀어줄 키워드 수"""
+        now = time.time()
+        left = self.deadline - now
+        if left <= 0:
+            return remaining
+        self.credit += remaining * (now - self.last) / left
+        self.last = now
+        count = min(remaining, int(self.credit))
+        self.credit -= count
+        return count
+
+
+def _wait_for_rows(state: dict, job_id: str, rows: list, throughput: JobThroughput,
+                   deadline: Optional[float] = None) -> tuple:
+    """
+    노출 체크할 행을 작업 큐에 등록하고 (모든 프로세스의) 행 작업자가 끝낼 때까지 진행 상황 집계
+    일시정지/중단은 저장소 상태로 행 작업자에게 전달
+    deadline(완료 목표 시각)을 주면 행을 한꺼번에 풀지 않고 그때까지 키워드 단위로 고르게 풀어줌
+    반환: (처리한 행 수, 노출된 행 수, 재시도가 필요한 행 수)
+    """
+    store = get_job_store()
+    since = time.time()
+    pacer = KeywordPacer(deadline) if deadline else None
+    store.queue_rows(job_id, rows, "scheduled" if pacer else "pending")
+    _local_states[job_id] = state
+
+    processed = exposed = 0
+    last_checkpoint = time.monotonic()
+    status = "running"  # 마지막으로 확인한 저장소 상태
+    while True:
+        # 진행 상태(다른 프로세스의 요청 포함)와 저장소 상태 맞추기
+        stored = store.job_status(job_id)
+        if stored != status and stored in ("running", "paused", "stopped"):
+            state["status"] = stored
+        elif state["status"] != stored:
+            store.set_status(job_id, state["status"])
+        status = state["status"]
+        if status == "stopped":
+            break
+
+        if pacer and status == "running":
+            if store.release_scheduled(job_id, pacer.due(store.scheduled_keywords(job_id))):
+                get_row_worker().wake()
+        elif pacer:
+            pacer.hold()
+        elif processed == 0:
+            get_row_worker().wake()
+
+        # 남은 행 수를 먼저 확인 (그 사이에 끝난 행도 집계에 들어가도록)
+        remaining = store.open_rows(job_id, EXPOSURE_RETRY_PASSES)
+        summary = store.run_summary(job_id, since)
+        throughput.add("exposure", summary["processed"] - processed)
+        processed, exposed = summary["processed"], summary["exposed"]
+
+        now = time.monotonic()
+        store.checkpoint(job_id, [], now - last_checkpoint)
+        last_checkpoint = now
+        if remaining == 0:
+            return processed, exposed, summary["retry"]
+
+        if status == "running":
+            workers = len(store.live_workers())
+            message = (f"노출 체크 중... ({processed}/{len(rows)}, 작업 프로세스 {workers}개)" if workers
+                       else "작업 프로세스를 기다리는 중...")
+            if pacer:
+                message += f" - {time.strftime('%H:%M', time.localtime(deadline))}까지 나눠서 확인"
+            _update_progress(state, current=processed, queues=get_row_worker().depths(), message=message)
+        time.sleep(WORK_POLL_INTERVAL)
+
+    # 중단: 행 작업자가 처리 중이던 행을 저장/반납할 때까지 잠시 기다린 뒤 집계
+    deadline = time.monotonic() + WORKER_HEARTBEAT_SECONDS
+    while store.row_counts(job_id).get("leased") and time.monotonic() < deadline:
+        time.sleep(WORK_POLL_INTERVAL / 4)
+    summary = store.run_summary(job_id, since)
+    return summary["processed"], summary["exposed"], summary["retry"]
+
+
+def select_rechecks(rows: list, limit: Optional[int] = None) -> list:
+    """
+    다시 체크할 행에 우선순위를 매기고 (순위 이력 기준) 우선순위가 큰 키워드부터 limit개 키워드의 행만 남김
+    (같은 키워드의 행은 검색 한 번으로 함께 확인하므로 키워드 단위로 자름)
+    """
+    scores = get_rank_history().priorities([(row['keyword'], row['link']) for row in rows])
+    keyword_scores = {}
+    for row, score in zip(rows, scores):
+        row['priority'] = score
+        keyword_scores[row['keyword']] = max(keyword_scores.get(row['keyword'], 0.0), score)
+
+    keywords = sorted(keyword_scores, key=keyword_scores.get, reverse=True)
+    if limit is not None:
+        keywords = set(keywords[:max(0, limit)])
+    return [row for row in rows if row['keyword'] in keywords]
+
+
+def check_sheet_exposure(start_date: str, end_date: str, job_id: Optional[str] = None,
+                         state: Optional[dict] = None, spreadsheet_id: str = SPREADSHEET_ID,
+                         sheet_name: str = SHEET_NAME, deadline: Optional[float] = None,
+                         recheck: bool = False, recheck_limit: Optional[int] = None) -> dict:
     """
     구글 시트에서 기간 내 데이터 처리
 
     1단계: 링크 업데이트 (블로그 홈 → 실제 글 링크)
-    2단계: 노출 체크
+    2단계: 노출 체크 (행 큐에 등록 → 모든 프로세스의 행 작업자가 처리, 여기서는 진행 상황 집계)
 
     조건:
     - A열 날짜가 start_date ~ end_date 범위 내
     - T열 = TRUE
-    - W열 = 비어있음
+    - W열 = 비어있음 (recheck면 이미 결과가 있는 행도)
+
+    job_id를 주면 저장소에 기록된 작업을 이어서 실행 (이미 결과가 나온 행은 다시 검색하지 않음)
+    state는 진행 상태 dict (일시정지/중단은 status 값을 바꿔서 요청)
+    deadline(완료 목표 시각, 타임스탬프)을 주면 노출 체크를 그때까지 고르게 나눠서 진행
+    recheck면 순위 이력에서 오래됐거나 순위가 자주 바뀌는 행부터 다시 체크 (recheck_limit: 검색할 키워드 수 상한)
     """
 
-    task_state["status"] = "running"
-    task_state["current"] = 0
-    task_state["total"] = 0
-    task_state["message"] = "시트 데이터 로딩 중..."
-    task_state["result"] = None
+    store = get_job_store()
+    if job_id is None:
+        params = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "spreadsheet_id": spreadsheet_id,
+            "sheet_name": sheet_name,
+        }
+        if recheck:
+            params.update(recheck=True, recheck_limit=recheck_limit)
+        job_id = store.create_job(params)
+    store.hold(job_id)
+    time_saved = store.start_run(job_id)
+    done_rows = store.done_rows(job_id)
+    last_checkpoint = time.monotonic()
+
+    if state is None:
+        state = new_task_state(job_id)
+    if state["status"] not in ("paused", "stopped"):
+        state["status"] = "running"
+    state["job_id"] = job_id
+    _update_progress(state, current=0, total=0, message="시트 데이터 로딩 중...", result=None)
 
     creds = get_credentials()
     if not creds:
         result = {"success": False, "message": "인증 정보가 없습니다. (credentials.json 또는 GOOGLE_CREDENTIALS 환경변수)"}
-        task_state["status"] = "completed"
-        task_state["result"] = result
-        return result
+        return _finish(state, "completed", result)
 
+    writer = None
+    throughput = JobThroughput(job_id)
     try:
         client = gspread.authorize(creds)
-        sheet = client.open_by_key(SPREADSHEET_ID).worksheet("발행")
+        sheet = client.open_by_key(spreadsheet_id).worksheet(sheet_name)
+        writer = BufferedSheetWriter(sheet)
 
-        all_values = sheet.get_all_values()
+        # 사용하는 열만 읽기 (A: 날짜, E: 키워드, O: 제목, Q: 링크, T: 체크, W: 순위)
+        view = SheetColumns(sheet, SHEET_COLUMNS).load()
 
         # 1단계: 링크 업데이트 (Q열에 포스트ID 없고 T열=TRUE인 행)
         links_updated = 0
-        task_state["message"] = "링크 업데이트 중..."
-
-        for row_idx in range(2, len(all_values)):
-            if _wait_if_paused():
-                result = {"success": True, "message": f"중단됨. 링크 {links_updated}개 업데이트", "processed": 0, "exposed": 0, "links_updated": links_updated}
-                task_state["status"] = "stopped"
-                task_state["result"] = result
-                return result
-
-            row = all_values[row_idx]
+        _update_progress(state, message="링크 업데이트 중...")
 
-            a_val = row[0].strip() if len(row) > 0 else ""  # A열 (날짜)
-            t_val = row[19].strip().upper() if len(row) > 19 else ""  # T열
-            link = row[16].strip() if len(row) > 16 else ""  # Q열
-            title = row[14].strip() if len(row) > 14 else ""  # O열
+        # 블로그별로 묶기 (블로그 하나의 글 목록은 한 번만 가져옴)
+        blog_groups = {}
+        for row_num in range(3, view.row_count + 1):
+            a_val = view.get(row_num, "A").strip()  # A열 (날짜)
+            t_val = view.get(row_num, "T").strip().upper()  # T열
+            link = view.get(row_num, "Q").strip()  # Q열
+            title = view.get(row_num, "O").strip()  # O열
 
             # 조건: 기간 내 & T열=TRUE & Q열에 포스트ID 없음 & 제목 있음
             if (is_date_in_range(a_val, start_date, end_date) and
@@ -140,39 +647,77 @@ def check_sheet_exposure(start_date: str, end_date: str) -> dict:
 
                 blog_id = extract_blog_id(link)
                 if blog_id:
-                    new_url = find_post_by_title(blog_id, title)
-                    if new_url:
-                        sheet.update_cell(row_idx + 1, 17, new_url)  # Q열 업데이트
-                        links_updated += 1
-                        time.sleep(0.5)
+                    blog_groups.setdefault(blog_id, []).append((row_num, title))
+
+        link_total = sum(len(rows) for rows in blog_groups.values())
+        if link_total:
+            links_checked = 0
+            _update_progress(state, total=link_total, current=0, message=f"링크 업데이트 중... (0/{link_total})")
+
+            # 서로 다른 블로그는 병렬로 처리
+            executor = ThreadPoolExecutor(max_workers=LINK_WORKERS)
+            futures = {
+                executor.submit(_resolve_blog_links, blog_id, rows, state): blog_id
+                for blog_id, rows in blog_groups.items()
+            }
 
-        # 시트 데이터 다시 읽기 (링크 업데이트 반영)
-        if links_updated > 0:
-            all_values = sheet.get_all_values()
+            try:
+                for future in as_completed(futures):
+                    if _wait_if_paused(state, writer):
+                        result = {"success": True, "message": f"중단됨. 링크 {links_updated}개 업데이트", "processed": 0, "exposed": 0, "links_updated": links_updated}
+                        return _finish(state, "stopped", result)
+
+                    blog_id = futures[future]
+                    try:
+                        resolved = future.result()
+                    except Exception as e:
+                        print(f"링크 찾기 실패 ({blog_id}): {e}")
+                        resolved = []
+
+                    for row_num, new_url in resolved:
+                        if new_url:
+                            writer.update_cell(row_num, 17, new_url)  # Q열 업데이트
+                            view.set(row_num, "Q", new_url)  # 다시 읽지 않고 로컬 사본에 반영
+                            links_updated += 1
+
+                    links_checked += len(blog_groups[blog_id])
+                    throughput.add("links", len(blog_groups[blog_id]))
+                    _update_progress(state, current=links_checked, message=f"링크 업데이트 중... ({links_checked}/{link_total})")
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
 
         # 2단계: 노출 체크할 행 필터링
         rows_to_process = []
-        for row_idx in range(2, len(all_values)):
-            row = all_values[row_idx]
-
-            a_val = row[0].strip() if len(row) > 0 else ""  # A열 (날짜)
-            t_val = row[19].strip().upper() if len(row) > 19 else ""  # T열
-            w_val = row[22].strip() if len(row) > 22 else ""  # W열
-            keyword = row[4].strip() if len(row) > 4 else ""  # E열
-            link = row[16].strip() if len(row) > 16 else ""  # Q열
-
-            # 조건: 기간 내 & T열=TRUE & W열=비어있음 & 키워드/링크 있음 & 포스트ID 있음
+        restored = 0
+        for row_num in range(3, view.row_count + 1):
+            a_val = view.get(row_num, "A").strip()  # A열 (날짜)
+            t_val = view.get(row_num, "T").strip().upper()  # T열
+            w_val = view.get(row_num, "W").strip()  # W열
+            keyword = view.get(row_num, "E").strip()  # E열
+            link = view.get(row_num, "Q").strip()  # Q열
+
+            # 조건: 기간 내 & T열=TRUE & W열=비어있음(다시 체크면 상관없음) & 키워드/링크 있음 & 포스트ID 있음
             if (is_date_in_range(a_val, start_date, end_date) and
                 t_val == "TRUE" and
-                w_val == "" and
+                (w_val == "" or recheck) and
                 keyword and link and has_post_id(link)):
+
+                # 이전 실행에서 결과가 나왔지만 시트에 기록되지 못한 행 → 저장된 결과로 기록
+                if done_rows.get(row_num):
+                    writer.update_cell(row_num, 23, done_rows[row_num])  # W열
+                    restored += 1
+                    continue
+
                 rows_to_process.append({
-                    'row_num': row_idx + 1,
+                    'row_num': row_num,
                     'keyword': keyword,
                     'link': link
                 })
 
-        if not rows_to_process and links_updated == 0:
+        if recheck:
+            rows_to_process = select_rechecks(rows_to_process, recheck_limit)
+
+        if not rows_to_process and links_updated == 0 and restored == 0:
             result = {
                 "success": True,
                 "message": f"처리할 데이터가 없습니다. (기간: {start_date} ~ {end_date})",
@@ -180,65 +725,52 @@ def check_sheet_exposure(start_date: str, end_date: str) -> dict:
                 "exposed": 0,
                 "links_updated": 0
             }
-            task_state["status"] = "completed"
-            task_state["result"] = result
-            return result
-
-        # 노출 체크
-        processed = 0
-        exposed = 0
-        task_state["total"] = len(rows_to_process)
-        task_state["message"] = f"노출 체크 중... (0/{len(rows_to_process)})"
-
-        for row_data in rows_to_process:
-            if _wait_if_paused():
-                result = {"success": True, "message": f"중단됨. 링크 {links_updated}개 업데이트, {processed}개 노출체크, {exposed}개 노출됨", "processed": processed, "exposed": exposed, "links_updated": links_updated}
-                task_state["status"] = "stopped"
-                task_state["result"] = result
-                return result
-
-            link = row_data['link']
-            keyword = row_data['keyword']
-            row_num = row_data['row_num']
-
-            result = search_naver_view(keyword, link)
-
-            if result.is_exposed:
-                rank_value = str(result.exposed_rank)
-                exposed += 1
-            else:
-                rank_value = "-"
+            return _finish(state, "completed", result)
 
-            sheet.update_cell(row_num, 23, rank_value)  # W열
-            processed += 1
-            task_state["current"] = processed
-            task_state["message"] = f"노출 체크 중... ({processed}/{len(rows_to_process)})"
-            time.sleep(0.5)
+        # 노출 체크: 행 큐에 등록하면 모든 프로세스의 행 작업자가 나눠서 처리
+        writer.flush()
+        store.checkpoint(job_id, [], time.monotonic() - last_checkpoint)
+        _update_progress(state, total=len(rows_to_process), current=0, message=f"노출 체크 중... (0/{len(rows_to_process)})")
+        processed, exposed, retry = _wait_for_rows(state, job_id, rows_to_process, throughput, deadline)
+
+        if _wait_if_paused(state, writer):
+            result = {"success": True, "message": f"중단됨. 링크 {links_updated}개 업데이트, {processed}개 노출체크, {exposed}개 노출됨", "processed": processed, "exposed": exposed, "links_updated": links_updated}
+            return _finish(state, "stopped", result)
+
+        writer.flush()
+
+        message = f"완료! 링크 {links_updated}개 업데이트, {processed}개 노출체크, {exposed}개 노출됨"
+        if retry:
+            message += f", 검색 차단/실패로 {retry}개 재시도 필요"
+        if restored or time_saved:
+            message += f" (이전 실행 결과 {restored}개 복원, 약 {time_saved:.0f}초 절약)"
 
         result = {
             "success": True,
-            "message": f"완료! 링크 {links_updated}개 업데이트, {processed}개 노출체크, {exposed}개 노출됨",
+            "message": message,
             "processed": processed,
             "exposed": exposed,
-            "links_updated": links_updated
+            "links_updated": links_updated,
+            "retry": retry,
+            "restored": restored,
+            "time_saved": round(time_saved, 1),
         }
-        task_state["status"] = "completed"
-        task_state["message"] = result["message"]
-        task_state["result"] = result
-        return result
+        state["message"] = result["message"]
+        return _finish(state, "completed", result)
 
     except Exception as e:
+        # 이미 확인한 결과는 최대한 기록해둠
+        if writer:
+            try:
+                writer.flush()
+            except Exception as flush_error:
+                print(f"시트 쓰기 실패: {flush_error}")
+
         result = {"success": False, "message": f"오류: {str(e)}"}
-        task_state["status"] = "completed"
-        task_state["result"] = result
-        return result
-
-
-def start_check_in_background(start_date: str, end_date: str):
-    """백그라운드 스레드에서 노출 체크 실행"""
-    thread = threading.Thread(
-        target=check_sheet_exposure,
-        args=(start_date, end_date),
-        daemon=True
-    )
-    thread.start()
+        return _finish(state, "completed", result)
+
+    finally:
+        if writer:
+            writer.close(flush=False)
+        throughput.close()
+
@@ -0,0 +1,144 @@
+"""
+단계별 파이프라인 (생산자/소비자 스레드 + 길이 제한 큐)
+
+각 단계는 앞 단계 큐에서 꺼내 처리하고 다음 단계 큐에 넣는다.
+큐 길이가 제한되어 있어서 뒤 단계가 밀리면 앞 단계도 기다리고(메모리 일정),
+일시정지/중단은 진행 상태(state["status"])를 모든 단계가 확인해서 따른다.
+"""
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator
+
+from app.services.metrics import PIPELINE_STAGE_SECONDS, timed
+
+# 단계 사이 큐 길이
+PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', '16'))
+
+_DONE = object()
+_POLL_INTERVAL = 0.2
+
+
+class Pipeline:
+    """
+    사용법:
+        pipeline = Pipeline(state, ("fetch", "parse", "write"))
+        pipeline.source(items, "fetch")
+        pipeline.stage(fetch_func, "fetch", "parse", workers=4)
+        pipeline.stage(parse_func, "parse", "write")
+        for item in pipeline.results("write"):   # 마지막 단계는 호출한 스레드에서
+            ...
+    """
+
+    def __init__(self, state: dict, queue_names: Iterable[str], queue_size: int = PIPELINE_QUEUE_SIZE):
+        self.state = state
+        self.queues = OrderedDict((name, queue.Queue(maxsize=queue_size)) for name in queue_names)
+        self.error = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def depths(self) -> dict:
+        """단계별 대기 중인 항목 수"""
+        return {name: q.qsize() for name, q in self.queues.items()}
+
+    def stop(self):
+        """모든 단계 종료 요청"""
+        self._stop.set()
+
+    def _stopping(self) -> bool:
+        if self.state["status"] == "stopped":
+            self._stop.set()
+        return self._stop.is_set()
+
+    def _should_stop(self) -> bool:
+        """일시정지 중이면 재개될 때까지 대기. 중단이면 True."""
+        while self.state["status"] == "paused" and not self._stop.is_set():
+            time.sleep(_POLL_INTERVAL)
+        return self._stopping()
+
+    def _put(self, name: str, item) -> bool:
+        """큐가 비기를 기다리며 넣기 (중단되면 False)"""
+        while not self._stopping():
+            try:
+                self.queues[name].put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, name: str):
+        """항목 꺼내기 (중단되면 _DONE)"""
+        while not self._stopping():
+            try:
+                return self.queues[name].get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: Exception):
+        if self.error is None:
+            self.error = error
+        self._stop.set()
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def source(self, items: Iterable, out_name: str):
+        """첫 단계: items를 차례로 out_name 큐에 넣음"""
+        def run():
+            try:
+                for item in items:
+                    if self._should_stop() or not self._put(out_name, item):
+                        return
+                self._put(out_name, _DONE)
+            except Exception as e:
+                self._fail(e)
+
+        self._start(run)
+
+    def stage(self, func: Callable, in_name: str, out_name: str, workers: int = 1):
+        """중간 단계: in_name 큐 항목마다 func(item) 결과를 out_name 큐에 넣음 (workers개 스레드)"""
+        remaining = [max(1, workers)]
+        lock = threading.Lock()
+
+        def run():
+            try:
+                while not self._should_stop():
+                    item = self._get(in_name)
+                    if item is _DONE:
+                        # 같은 단계의 다른 스레드도 끝나도록 되돌려놓음
+                        self._put(in_name, _DONE)
+                        break
+                    with timed(PIPELINE_STAGE_SECONDS, stage=in_name):
+                        output = func(item)
+                    if not self._put(out_name, output):
+                        break
+            except Exception as e:
+                self._fail(e)
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    self._put(out_name, _DONE)
+
+        for _ in range(remaining[0]):
+            self._start(run)
+
+    def results(self, name: str) -> Iterator:
+        """마지막 단계 입력 (호출한 스레드에서 소비). 단계에서 예외가 나면 다시 발생시킴."""
+        try:
+            while True:
+                item = self._get(name)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self.stop()
+
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,52 @@
+"""
+구글 시트 열 단위 읽기 (필요한 열만 batch_get으로 가져와 메모리에 보관)
+"""
+from gspread.utils import Dimension
+from app.services.metrics import SHEETS_SECONDS, timed
+
+
+class SheetColumns:
+    """
+    필요한 열만 읽어둔 시트 뷰
+
+    - load(): 지정한 열만 batch_get 한 번으로 가져옴 (get_all_values 대신)
+    - set(): 시트에 쓴 값을 로컬 사본에도 반영 → 다시 읽을 필요 없음
+    - 행 번호는 시트와 같은 1부터 시작
+    """
+
+    def __init__(self, sheet, columns):
+        self.sheet = sheet
+        self.columns = [col.upper() for col in columns]
+        self._data = {col: [] for col in self.columns}
+        self.row_count = 0
+
+    def load(self) -> "SheetColumns":
+        """지정한 열 전체를 한 번의 API 호출로 읽기"""
+        ranges = [f"{col}1:{col}" for col in self.columns]
+        with timed(SHEETS_SECONDS, operation="read"):
+            value_ranges = self.sheet.batch_get(ranges, major_dimension=Dimension.cols)
+
+        self.row_count = 0
+        for col, value_range in zip(self.columns, value_ranges):
+            # 열 기준으로 요청했으므로 [[1행, 2행, ...]] 형태 (빈 열은 [])
+            values = list(value_range[0]) if value_range else []
+            self._data[col] = values
+            self.row_count = max(self.row_count, len(values))
+
+        return self
+
+    def get(self, row_num: int, col: str) -> str:
+        """셀 값 (없으면 빈 문자열)"""
+        values = self._data[col]
+        if row_num - 1 < len(values):
+            value = values[row_num - 1]
+            return value if isinstance(value, str) else str(value)
+        return ""
+
+    def set(self, row_num: int, col: str, value):
+        """로컬 사본의 셀 값 변경 (시트 쓰기는 따로 해야 함)"""
+        values = self._data[col]
+        if len(values) < row_num:
+            values.extend([""] * (row_num - len(values)))
+        values[row_num - 1] = value
+        self.row_count = max(self.row_count, row_num)
@@ -0,0 +1,139 @@
+"""
+구글 시트 버퍼 쓰기 (셀 업데이트를 모아서 batch_update로 한 번에 전송)
+"""
+import os
+import threading
+import time
+from typing import Optional
+from gspread.exceptions import APIError
+from gspread.utils import rowcol_to_a1, ValueInputOption
+from app.services.metrics import SHEETS_SECONDS, timed
+from app.services.rate_limiter import get_limiter, SHEETS_HOST
+
+# 이 행 수만큼 쌓이거나 가장 먼저 쌓인 업데이트가 이 시간(초)만큼 기다리면 전송
+WRITE_BATCH_ROWS = int(os.environ.get('SHEET_WRITE_BATCH_ROWS', '50'))
+WRITE_FLUSH_INTERVAL = float(os.environ.get('SHEET_WRITE_FLUSH_INTERVAL', '10'))
+
+# 재시도할 응답 코드 (할당량 초과 + 일시적인 서버 오류)
+RETRY_STATUS_CODES = (429, 500, 502, 503)
+
+
+def _is_retryable(error: APIError) -> bool:
+    """할당량 초과 등 재시도하면 되는 오류인지 확인"""
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in RETRY_STATUS_CODES
+
+
+class BufferedSheetWriter:
+    """
+    시트 셀 업데이트 버퍼 (스레드 안전)
+
+    - update_cell()은 버퍼에 넣기만 하고, 쌓인 행 수가 기준에 도달하면 바로 전송
+    - 더 쓸 업데이트가 없어도 flush_interval이 지나면 타이머 스레드가 전송
+    - 전송이 성공한 뒤에만 버퍼에서 제거하므로 재시도 중에도 유실/순서 뒤바뀜 없음
+    - 일시정지/중단/작업 완료 시에는 flush()로 강제 전송
+    """
+
+    def __init__(self, sheet, batch_rows: int = WRITE_BATCH_ROWS,
+                 flush_interval: float = WRITE_FLUSH_INTERVAL,
+                 max_retries: int = 5, backoff_base: float = 2.0):
+        self.sheet = sheet
+        self.batch_rows = max(1, batch_rows)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+        self.api_calls = 0
+        self.cells_written = 0
+
+        self._pending = []  # [(행, 열, 값)] 들어온 순서 그대로
+        self._rows = set()  # 버퍼에 있는 행 번호
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._lock = threading.Lock()         # 버퍼
+        self._flush_lock = threading.Lock()   # 전송은 한 번에 하나씩 (순서 유지)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def update_cell(self, row: int, col: int, value):
+        """셀 업데이트 예약 (쌓인 행 수가 기준에 도달하면 바로 전송, 아니면 타이머 예약)"""
+        with self._lock:
+            self._pending.append((row, col, value))
+            self._rows.add(row)
+            full = len(self._rows) >= self.batch_rows
+            if not full:
+                self._schedule()
+
+        if full:
+            self.flush()
+
+    def _schedule(self):
+        """버퍼가 차지 않아도 flush_interval 뒤에 전송되도록 타이머 예약 (lock 안에서 호출)"""
+        if self._timer is None and not self._closed and self.flush_interval > 0:
+            self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            # 버퍼는 그대로 남으므로 다음 전송 때 다시 시도
+            print(f"시트 쓰기 실패 (다음 전송 때 다시 시도): {e}")
+
+    def close(self, flush: bool = True):
+        """타이머 정리 (flush면 남은 업데이트도 전송)"""
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if flush:
+            self.flush()
+
+    def flush(self) -> int:
+        """쌓인 업데이트를 한 번에 전송. 전송한 셀 수 반환."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return 0
+
+            for attempt in range(self.max_retries + 1):
+                # batch_update가 range 값을 직접 바꾸므로 재시도마다 새로 생성
+                data = [
+                    {"range": rowcol_to_a1(row, col), "values": [[value]]}
+                    for row, col, value in batch
+                ]
+                get_limiter(SHEETS_HOST).acquire()
+                try:
+                    self.api_calls += 1
+                    with timed(SHEETS_SECONDS, operation="write"):
+                        self.sheet.batch_update(data, value_input_option=ValueInputOption.user_entered)
+                    break
+                except APIError as e:
+                    if not _is_retryable(e) or attempt == self.max_retries:
+                        raise
+                    wait = self.backoff_base * 2 ** attempt
+                    print(f"시트 쓰기 재시도 ({attempt + 1}/{self.max_retries}, {wait:.0f}초 후): {e}")
+                    time.sleep(wait)
+
+            # 전송 성공한 만큼만 버퍼에서 제거 (전송하는 동안 들어온 업데이트는 남김)
+            with self._lock:
+                del self._pending[:len(batch)]
+                self._rows = {row for row, _, _ in self._pending}
+                if self._pending:
+                    self._schedule()
+            self.cells_written += len(batch)
+            return len(batch)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+검색 결과 파서 벤치마크
+- 대상: benchmarks/fixtures/serp/*.html (저장해둔 검색 결과 페이지)
+- 비교: 기존 BeautifulSoup 구현 vs app.services.serp_parser (lxml)
+- 출력: 페이지별 파싱 시간(중앙값), 최대 메모리, 결과 일치 여부
+- 순위만 확인 (serp_parser.find_ranks): 찾는 글이 1위/마지막/없음일 때 시간과 읽은 양
+
+사용법:
+    python benchmarks/bench_serp_parser.py [--repeat 20] [--fixtures DIR]
+"""
+import argparse
+import glob
+import re
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bs4 import BeautifulSoup
+from app.models.schemas import BlogResult
+from app.services import serp_parser
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'serp')
+
+
+def legacy_extract_post_id(url: str):
+    """기존 구현 (비교용)"""
+    match = re.search(r'blog\.naver\.com/[^/]+/(\d+)', url)
+    if match:
+        return match.group(1)
+    match = re.search(r'\.blog\.me/(\d+)', url)
+    if match:
+        return match.group(1)
+    return None
+
+
+def legacy_parse_blog_results(html: str) -> list[BlogResult]:
+    """기존 BeautifulSoup 구현 (비교용)"""
+    soup = BeautifulSoup(html, 'lxml')
+
+    results = []
+    seen_post_ids = set()
+
+    for link in soup.find_all('a', href=True):
+        href = link.get('href', '')
+        if 'blog.naver.com' not in href:
+            continue
+
+        post_id = legacy_extract_post_id(href)
+        if not post_id:
+            continue
+        if post_id in seen_post_ids:
+            continue
+
+        title = link.get_text(strip=True)
+        if not title or len(title) <= 3:
+            continue
+
+        seen_post_ids.add(post_id)
+        results.append(BlogResult(rank=len(results) + 1, title=title, url=href))
+
+    return results
+
+
+PARSERS = {
+    "bs4": legacy_parse_blog_results,
+    "lxml": serp_parser.parse_blog_results,
+}
+
+
+def load_fixtures(fixture_dir: str) -> dict:
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(fixture_dir, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            fixtures[os.path.basename(path)] = f.read()
+    return fixtures
+
+
+def time_parser(parse, html: str, repeat: int) -> float:
+    """파싱 시간 중앙값 (ms)"""
+    parse(html)  # 워밍업
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(html)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def match_only_row(html: str, repeat: int, chunk_size: int = 16384) -> tuple:
+    """
+    순위만 확인 (조각 단위 파싱, 찾으면 멈춤)
+    반환: (1위 ms, 마지막 ms, 없음 ms, 1위일 때 읽은 KB, 전체 파싱 순위와 일치 여부)
+    """
+    data = html.encode('utf-8')
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    post_ids = [serp_parser.extract_post_id(r.url) for r in serp_parser.parse_blog_results(html)]
+    expected = {post_id: rank for rank, post_id in enumerate(post_ids, 1)}
+    same = serp_parser.find_ranks(chunks, post_ids) == expected
+
+    def consumed(target_ids) -> int:
+        read = []
+
+        def counted():
+            for chunk in chunks:
+                read.append(len(chunk))
+                yield chunk
+
+        serp_parser.find_ranks(counted(), target_ids)
+        return sum(read)
+
+    timings = []
+    for target in (post_ids[:1], post_ids[-1:], ["0"]):
+        timings.append(time_parser(lambda _: serp_parser.find_ranks(chunks, target), html, repeat))
+    return (*timings, consumed(post_ids[:1]) // 1024, same)
+
+
+def _rss_peak_kb() -> int:
+    """현재 프로세스의 최대 RSS (KB)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_rss_peak() -> bool:
+    """최대 RSS 기록 초기화 (리눅스만 가능)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def measure_memory(name: str, fixture_dir: str):
+    """
+    별도 프로세스에서 파서 하나만 실행해 메모리 측정
+    - rss_kb: 파싱 중 늘어난 최대 RSS (libxml2 등 C 메모리 포함)
+    - py_peak_kb: tracemalloc 기준 파이썬 객체 최대 사용량
+    """
+    fixtures = load_fixtures(fixture_dir)
+    parse = PARSERS[name]
+    parse("<html></html>")  # import/초기화 비용 제외
+
+    _reset_rss_peak()
+    base_rss = _rss_peak_kb()
+    for html in fixtures.values():
+        parse(html)
+    rss = _rss_peak_kb() - base_rss
+
+    tracemalloc.start()
+    for html in fixtures.values():
+        parse(html)
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{rss} {py_peak // 1024}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 결과 파서 벤치마크")
+    parser.add_argument('--repeat', type=int, default=20, help="페이지당 반복 횟수")
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help="검색 결과 HTML 폴더")
+    parser.add_argument('--memory-worker', choices=list(PARSERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.memory_worker:
+        measure_memory(args.memory_worker, args.fixtures)
+        return
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"픽스처가 없습니다: {args.fixtures}")
+        return
+
+    print(f"{'page':<28} {'KB':>6} {'links':>6} {'bs4 ms':>9} {'lxml ms':>9} {'speedup':>8}  same")
+    mismatches = 0
+    for name, html in fixtures.items():
+        expected = legacy_parse_blog_results(html)
+        actual = serp_parser.parse_blog_results(html)
+        same = [r.model_dump() for r in expected] == [r.model_dump() for r in actual]
+        mismatches += 0 if same else 1
+
+        bs4_ms = time_parser(legacy_parse_blog_results, html, args.repeat)
+        lxml_ms = time_parser(serp_parser.parse_blog_results, html, args.repeat)
+        print(f"{name:<28} {len(html.encode('utf-8')) // 1024:>6} {len(actual):>6} "
+              f"{bs4_ms:>9.2f} {lxml_ms:>9.2f} {bs4_ms / lxml_ms:>7.1f}x  {'OK' if same else 'DIFF'}")
+
+    print()
+    print(f"{'match-only':<28} {'KB':>6} {'read KB':>8} {'1st ms':>8} {'last ms':>8} {'miss ms':>8}  same")
+    for name, html in fixtures.items():
+        first_ms, last_ms, miss_ms, read_kb, same = match_only_row(html, args.repeat)
+        mismatches += 0 if same else 1
+        print(f"{name:<28} {len(html.encode('utf-8')) // 1024:>6} {read_kb:>8} "
+              f"{first_ms:>8.2f} {last_ms:>8.2f} {miss_ms:>8.2f}  {'OK' if same else 'DIFF'}")
+
+    print()
+    print(f"{'parser':<8} {'peak RSS KB':>12} {'py peak KB':>11}")
+    for name in PARSERS:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--fixtures', args.fixtures, '--memory-worker', name],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        print(f"{name:<8} {output[0]:>12} {output[1]:>11}")
+
+    if mismatches:
+        print(f"\n경고: {mismatches}개 페이지에서 결과가 다릅니다.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+시트 노출 체크 종단간 처리량 벤치마크 (네이버/구글 시트 없이 로컬에서)
+- 대상: check_sheet_exposure (웹 작업), check_sheet.py (스크립트)
+- 네이버: stand_ins.NaverStandIn (저장한 검색 페이지 + 생성한 RSS, 지연/오류 비율 설정)
+- 시트: stand_ins.FakeWorksheet (메모리 시트, API 호출 수 집계)
+- 검색 경로: --proxies를 주면 stand_ins.ProxyStandIn 여러 개를 거쳐 검색 (경로별 속도 제한/차단 확인)
+- 출력: 처리 행 수, 걸린 시간, 분당 처리 행 수, 시트 API 호출 수, 외부 요청 수
+
+사용법:
+    python benchmarks/e2e/run_e2e.py [--rows 300] [--keywords 120] [--latency 0.2] [--error-rate 0.02]
+    python benchmarks/e2e/run_e2e.py --runner job --json before.json   # 커밋 간 비교용 결과 저장
+    python benchmarks/e2e/run_e2e.py --naver-rate 0.5                  # 운영 속도 제한 그대로
+    python benchmarks/e2e/run_e2e.py --proxies 4 --blocked-proxies 1   # 경로 4개 중 1개는 차단된 IP
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+
+from stand_ins import FakeClient, FakeWorksheet, NaverStandIn, ProxyStandIn, rss_post_title
+
+# 시트 열 (1부터 시작)
+COL_DATE, COL_KEYWORD, COL_TITLE, COL_LINK, COL_CHECK, COL_RANK = 1, 5, 15, 17, 20, 23
+SHEET_WIDTH = 26
+
+
+def build_rows(stand_in: NaverStandIn, rows: int, keywords: int, unresolved: float,
+               exposed: float, seed: int) -> list:
+    """
+    시트 데이터 생성 (헤더 2행 + rows행)
+    - exposed 비율만큼은 해당 키워드 검색 페이지에 있는 글 링크 (노출됨)
+    - unresolved 비율만큼은 블로그 홈 링크 + RSS에 있는 제목 (1단계 링크 업데이트 대상)
+    """
+    from app.services.serp_parser import parse_blog_results
+
+    rng = random.Random(seed)
+    page_posts = {}
+    data = [[""] * SHEET_WIDTH, [""] * SHEET_WIDTH]
+
+    for i in range(rows):
+        row = [""] * SHEET_WIDTH
+        keyword = f"벤치마크 키워드 {i % keywords}"
+        row[COL_DATE - 1] = f"{rng.randint(1, 12)}/{rng.randint(1, 28)}"
+        row[COL_KEYWORD - 1] = keyword
+        row[COL_CHECK - 1] = "TRUE"
+
+        if rng.random() < unresolved:
+            blog_id = f"benchblog{i % 20}"
+            row[COL_TITLE - 1] = rss_post_title(blog_id, rng.randint(1, 20))
+            row[COL_LINK - 1] = f"https://blog.naver.com/{blog_id}"
+        else:
+            page = stand_in.page_for(keyword)
+            if page not in page_posts:
+                page_posts[page] = [result.url for result in parse_blog_results(page)]
+            posts = page_posts[page]
+            if posts and rng.random() < exposed:
+                row[COL_LINK - 1] = rng.choice(posts)
+            else:
+                row[COL_LINK - 1] = f"https://blog.naver.com/benchmiss{i}/{224000000000 + i}"
+            row[COL_TITLE - 1] = f"벤치마크 글 {i}"
+
+        data.append(row)
+    return data
+
+
+def reset_state(stand_in: NaverStandIn):
+    """실행마다 같은 조건에서 시작하도록 캐시/카운터 초기화"""
+    from app.services.blog_fetcher import post_index_cache
+    from app.services.fetch_engine import get_engine
+
+    get_engine().cache.clear()
+    post_index_cache.clear()
+    stand_in.reset_counts()
+
+
+def run_job(stand_in: NaverStandIn, rows: list, sheets_latency: float) -> dict:
+    """웹 작업 경로 (check_sheet_exposure)"""
+    import app.services.sheet_checker as sheet_checker
+
+    sheet = FakeWorksheet(rows, latency=sheets_latency)
+    reset_state(stand_in)
+
+    with mock.patch.object(sheet_checker, 'get_credentials', return_value=object()), \
+            mock.patch.object(sheet_checker.gspread, 'authorize', return_value=FakeClient(sheet)), \
+            contextlib.redirect_stdout(io.StringIO()):
+        # 노출 체크 행은 행 큐를 거쳐 이 프로세스의 행 작업자가 처리
+        sheet_checker.get_row_worker().start()
+        start = time.perf_counter()
+        result = sheet_checker.check_sheet_exposure('1/1', '12/31')
+        elapsed = time.perf_counter() - start
+
+    if not result.get("success"):
+        raise RuntimeError(result.get("message"))
+    return summarize("job", sheet, stand_in, result["processed"] + result["links_updated"], elapsed)
+
+
+def run_script(stand_in: NaverStandIn, rows: list, sheets_latency: float) -> dict:
+    """스크립트 경로 (check_sheet.py)"""
+    import check_sheet
+
+    sheet = FakeWorksheet(rows, latency=sheets_latency)
+    reset_state(stand_in)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        updated = check_sheet.process_sheet(sheet)
+        elapsed = time.perf_counter() - start
+
+    return summarize("script", sheet, stand_in, updated, elapsed)
+
+
+def summarize(name: str, sheet: FakeWorksheet, stand_in: NaverStandIn, rows: int, elapsed: float) -> dict:
+    exposed = sum(1 for r in range(3, len(sheet.rows) + 1) if sheet.cell(r, COL_RANK).isdigit())
+    return {
+        "runner": name,
+        "rows": rows,
+        "exposed": exposed,
+        "wall_seconds": round(elapsed, 2),
+        "rows_per_min": round(rows / elapsed * 60, 1) if elapsed else 0.0,
+        "sheets_api_calls": sheet.api_calls,
+        "sheets_calls": dict(sheet.calls),
+        "outbound_requests": sum(stand_in.requests.values()),
+        "requests": dict(stand_in.requests),
+        "failures": dict(stand_in.failures),
+    }
+
+
+def proxy_counts(proxies: list) -> list:
+    """프록시별 (요청 수, 차단 응답 수) 후 초기화"""
+    counts = [(proxy.requests, proxy.blocked) for proxy in proxies]
+    for proxy in proxies:
+        proxy.reset_counts()
+    return counts
+
+
+def report(results: list):
+    print(f"{'runner':<8} {'rows':>6} {'exposed':>8} {'wall s':>8} {'rows/min':>9} {'sheets':>7} {'outbound':>9}  detail")
+    for r in results:
+        detail = (f"sheets {r['sheets_calls']}, requests {r['requests']}, "
+                  f"failures {r['failures']}")
+        if r.get("proxy_requests"):
+            detail += f", proxies {r['proxy_requests']}"
+        print(f"{r['runner']:<8} {r['rows']:>6} {r['exposed']:>8} {r['wall_seconds']:>8.2f} "
+              f"{r['rows_per_min']:>9.1f} {r['sheets_api_calls']:>7} {r['outbound_requests']:>9}  {detail}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시트 노출 체크 종단간 처리량 벤치마크")
+    parser.add_argument('--runner', choices=['job', 'script', 'all'], default='all')
+    parser.add_argument('--rows', type=int, default=300, help="시트 데이터 행 수")
+    parser.add_argument('--keywords', type=int, default=120, help="서로 다른 키워드 수")
+    parser.add_argument('--unresolved', type=float, default=0.1, help="링크 업데이트가 필요한 행 비율")
+    parser.add_argument('--exposed', type=float, default=0.6, help="검색 결과에 있는 글 비율")
+    parser.add_argument('--latency', type=float, default=0.2, help="대체 네이버 서버 응답 지연 (초)")
+    parser.add_argument('--jitter', type=float, default=0.05, help="응답 지연 편차 (초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 응답 비율")
+    parser.add_argument('--block-rate', type=float, default=0.0, help="429 응답 비율 (속도 제한기 백오프 발생)")
+    parser.add_argument('--sheets-latency', type=float, default=0.15, help="시트 API 호출당 지연 (초)")
+    parser.add_argument('--naver-rate', type=float, default=20.0,
+                        help="네이버 호스트 초당 요청 수 (운영 기본값은 0.5)")
+    parser.add_argument('--proxies', type=int, default=0, help="검색을 이 수의 로컬 프록시로 나눠 보냄 (경로마다 --naver-rate)")
+    parser.add_argument('--blocked-proxies', type=int, default=0, help="그중 모든 요청에 429를 돌려주는 프록시 수")
+    parser.add_argument('--dead-proxies', type=int, default=0, help="그중 연결을 바로 끊는 프록시 수")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    stand_in = NaverStandIn(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                            block_rate=args.block_rate, seed=args.seed).start()
+    proxies = [
+        ProxyStandIn(block_rate=1.0 if i < args.blocked_proxies else 0.0,
+                     down=args.blocked_proxies <= i < args.blocked_proxies + args.dead_proxies,
+                     seed=args.seed + i).start()
+        for i in range(args.proxies)
+    ]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # 앱 모듈은 설정을 import 시점에 읽으므로 환경변수를 먼저 지정
+        os.environ.update(stand_in.env())
+        os.environ.update({
+            "NAVER_RATE": str(args.naver_rate),
+            "NAVER_MAX_RATE": str(max(args.naver_rate, 2.0)),
+            "JOB_DB_PATH": os.path.join(workdir, 'jobs.db'),
+            "RANK_HISTORY_DB": os.path.join(workdir, 'rank_history.db'),
+        })
+        if proxies:
+            os.environ["EGRESS_ROUTES"] = ",".join(proxy.url for proxy in proxies)
+
+        from app.services.rate_limiter import get_limiter
+        # 대체 서버 주소의 RSS/글 목록 요청에도 같은 속도 제한 적용
+        local = get_limiter('127.0.0.1')
+        local.rate = local.max_rate = args.naver_rate
+
+        rows = build_rows(stand_in, args.rows, args.keywords, args.unresolved, args.exposed, args.seed)
+        print(f"rows {args.rows}, keywords {args.keywords}, naver latency {args.latency}s, "
+              f"error {args.error_rate:.0%}, block {args.block_rate:.0%}, sheets latency {args.sheets_latency}s, "
+              f"naver rate {args.naver_rate}/s\n")
+
+        results = []
+        try:
+            if args.runner in ('job', 'all'):
+                results.append(run_job(stand_in, rows, args.sheets_latency))
+                results[-1]["proxy_requests"] = proxy_counts(proxies)
+            if args.runner in ('script', 'all'):
+                results.append(run_script(stand_in, rows, args.sheets_latency))
+                results[-1]["proxy_requests"] = proxy_counts(proxies)
+        finally:
+            stand_in.stop()
+            for proxy in proxies:
+                proxy.stop()
+
+    report(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"revision": git_revision(), "args": vars(args), "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+종단간 벤치마크용 대체 서버/시트
+
+- NaverStandIn: 저장해둔 검색 결과 페이지와 RSS 피드를 돌려주는 로컬 HTTP 서버
+  (응답 지연, 오류 비율 설정 가능, 종류별 요청 수 집계)
+- ProxyStandIn: 요청을 그대로 전달하는 로컬 HTTP 프록시 (검색 경로 풀 확인용, 차단된 IP 흉내 가능)
+- FakeWorksheet: gspread Worksheet 대신 쓰는 메모리 시트 (API 호출 수 집계, 호출 지연 흉내)
+"""
+import glob
+import http.client
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+from xml.sax.saxutils import escape
+
+from gspread.utils import a1_to_rowcol
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'serp')
+
+
+def load_serp_pages(fixture_dir: str = FIXTURE_DIR) -> list[bytes]:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+def rss_post_title(blog_id: str, n: int) -> str:
+    """RSS 대체 피드의 n번째 글 제목 (시트 데이터 생성에도 사용)"""
+    return f"{blog_id} 방문 후기 {n}번째 이야기"
+
+
+def rss_post_id(blog_id: str, n: int) -> int:
+    return 223000000000 + sum(map(ord, blog_id)) * 100 + n
+
+
+def rss_feed(blog_id: str, posts: int = 20) -> bytes:
+    items = "".join(
+        f"<item><title>{escape(rss_post_title(blog_id, n))}</title>"
+        f"<link>https://blog.naver.com/{blog_id}/{rss_post_id(blog_id, n)}?fromRss=true</link></item>"
+        for n in range(1, posts + 1)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss><channel>{items}</channel></rss>'.encode('utf-8')
+
+
+class NaverStandIn:
+    """
+    검색/RSS/글 목록 대체 서버
+    - /search.naver?query=... : 키워드마다 고정된 저장 페이지 하나
+      (블로그 탭 ssc=tab.blog.all&start=...는 페이지마다 다른 저장 페이지)
+    - /rss/{blog_id}.xml      : 생성한 RSS 피드
+    - /blog/PostList.naver    : 빈 글 목록 (RSS 실패 시 대체 경로)
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.0, error_rate: float = 0.0,
+                 block_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.block_rate = block_rate
+        self.pages = load_serp_pages() or [b'<html><body></body></html>']
+        self.requests = {"search": 0, "rss": 0, "blog": 0}
+        self.failures = {"error": 0, "blocked": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def page_for(self, keyword: str) -> bytes:
+        """키워드에 해당하는 검색 결과 페이지 (시트 데이터 생성에도 사용)"""
+        return self.pages[sum(map(ord, keyword)) % len(self.pages)]
+
+    def blog_tab_page_for(self, keyword: str, start: int) -> bytes:
+        """블로그 탭 페이지 (키워드와 start가 같으면 같은 페이지)"""
+        return self.pages[zlib.crc32(f"{keyword}|{start}".encode()) % len(self.pages)]
+
+    def _outcome(self, kind: str) -> str:
+        with self._lock:
+            self.requests[kind] += 1
+            roll = self._random.random()
+            if roll < self.block_rate:
+                self.failures["blocked"] += 1
+                return "blocked"
+            if roll < self.block_rate + self.error_rate:
+                self.failures["error"] += 1
+                return "error"
+            return "ok"
+
+    def _delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _respond(self, path: str) -> tuple:
+        """(상태 코드, Content-Type, 본문)"""
+        url = urlparse(path)
+        if url.path.startswith('/rss/'):
+            kind = "rss"
+        elif url.path.startswith('/blog/'):
+            kind = "blog"
+        else:
+            kind = "search"
+
+        outcome = self._outcome(kind)
+        time.sleep(self._delay())
+        if outcome == "blocked":
+            return 429, 'text/html; charset=utf-8', b'<html>too many requests</html>'
+        if outcome == "error":
+            return 503, 'text/html; charset=utf-8', b'<html>service unavailable</html>'
+
+        if kind == "rss":
+            blog_id = unquote(url.path[len('/rss/'):]).removesuffix('.xml')
+            return 200, 'application/xml; charset=utf-8', rss_feed(blog_id)
+        if kind == "blog":
+            return 200, 'text/html; charset=utf-8', b'<html><body></body></html>'
+
+        query = parse_qs(url.query)
+        keyword = query.get('query', [''])[0]
+        if query.get('ssc', [''])[0].startswith('tab.blog'):
+            return 200, 'text/html; charset=utf-8', self.blog_tab_page_for(keyword, int(query.get('start', ['1'])[0]))
+        return 200, 'text/html; charset=utf-8', self.page_for(keyword)
+
+    def start(self) -> "NaverStandIn":
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, content_type, body = stand_in._respond(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle(self):
+                # 순위만 확인하는 요청은 응답을 다 받기 전에 연결을 끊음
+                try:
+                    super().handle()
+                except ConnectionError:
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def env(self) -> dict:
+        """앱이 이 서버를 보도록 하는 환경변수"""
+        return {
+            "NAVER_SEARCH_URL": f"{self.base_url}/search.naver",
+            "NAVER_RSS_URL": f"{self.base_url}/rss",
+            "NAVER_BLOG_URL": f"{self.base_url}/blog",
+        }
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = dict.fromkeys(self.requests, 0)
+            self.failures = dict.fromkeys(self.failures, 0)
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+
+
+class ProxyStandIn:
+    """
+    HTTP 포워드 프록시 대체 서버 (http:// 대상만)
+    - block_rate 비율만큼은 대상에 보내지 않고 429 (이 프록시의 IP가 차단된 상황)
+    - down이면 연결을 바로 끊음 (죽은 프록시)
+    """
+
+    def __init__(self, block_rate: float = 0.0, down: bool = False, seed: int = 0):
+        self.block_rate = block_rate
+        self.down = down
+        self.requests = 0
+        self.blocked = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _blocked(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self._random.random() < self.block_rate:
+                self.blocked += 1
+                return True
+            return False
+
+    def start(self) -> "ProxyStandIn":
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if proxy.down:
+                    self.close_connection = True
+                    return
+                if proxy._blocked():
+                    body = b'<html>too many requests</html>'
+                    self.send_response(429)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                # 프록시 요청은 전체 URL (http://host:port/path?query)
+                target = urlparse(self.path)
+                headers = {k: v for k, v in self.headers.items()
+                           if k.lower() not in ('proxy-connection', 'proxy-authorization', 'connection')}
+                conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+                try:
+                    conn.request('GET', target.path + (f'?{target.query}' if target.query else ''), headers=headers)
+                    response = conn.getresponse()
+                    body = response.read()
+                finally:
+                    conn.close()
+
+                self.send_response(response.status)
+                self.send_header('Content-Type', response.getheader('Content-Type', 'text/html'))
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionError:
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = self.blocked = 0
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+
+
+def _parse_range(a1: str) -> tuple:
+    """'발행'!B3:C4 → (시작 행, 시작 열, 끝 행 또는 None, 끝 열)"""
+    a1 = a1.split('!')[-1]
+    start, _, end = a1.partition(':')
+    row, col = a1_to_rowcol(start if re.search(r'\d', start) else start + '1')
+    if not end:
+        return row, col, row, col
+    if re.search(r'\d', end):
+        end_row, end_col = a1_to_rowcol(end)
+        return row, col, end_row, end_col
+    _, end_col = a1_to_rowcol(end + '1')
+    return row, col, None, end_col
+
+
+class FakeWorksheet:
+    """
+    gspread Worksheet 대체 (노출 체크에서 쓰는 메서드만)
+    - calls: 메서드별 API 호출 수
+    - latency: 호출마다 기다리는 시간 (실제 API 응답 시간 흉내)
+    """
+
+    def __init__(self, rows: list, title: str = '발행', latency: float = 0.0):
+        self.title = title
+        self.latency = latency
+        self.rows = [list(row) for row in rows]
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _call(self, name: str):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def api_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def cell(self, row: int, col: int) -> str:
+        """로컬 확인용 (API 호출로 세지 않음)"""
+        if row - 1 < len(self.rows) and col - 1 < len(self.rows[row - 1]):
+            return self.rows[row - 1][col - 1]
+        return ""
+
+    def _set(self, row: int, col: int, value):
+        with self._lock:
+            while len(self.rows) < row:
+                self.rows.append([])
+            line = self.rows[row - 1]
+            while len(line) < col:
+                line.append("")
+            line[col - 1] = "" if value is None else str(value)
+
+    def get_all_values(self) -> list:
+        self._call('get_all_values')
+        width = max((len(row) for row in self.rows), default=0)
+        return [row + [""] * (width - len(row)) for row in self.rows]
+
+    def batch_get(self, ranges, major_dimension=None, **kwargs) -> list:
+        self._call('batch_get')
+        by_column = str(major_dimension).upper().endswith('COLUMNS')
+        results = []
+        for a1 in ranges:
+            row, col, end_row, end_col = _parse_range(a1)
+            end_row = end_row or len(self.rows)
+            block = [[self.cell(r, c) for c in range(col, end_col + 1)] for r in range(row, end_row + 1)]
+            if by_column:
+                block = [list(values) for values in zip(*block)] if block else []
+            # 실제 API처럼 끝의 빈 값은 잘라냄
+            trimmed = []
+            for values in block:
+                while values and values[-1] == "":
+                    values.pop()
+                trimmed.append(values)
+            while trimmed and not trimmed[-1]:
+                trimmed.pop()
+            results.append(trimmed)
+        return results
+
+    def batch_update(self, data: list, **kwargs):
+        self._call('batch_update')
+        for item in data:
+            row, col, _, _ = _parse_range(item['range'])
+            for r, values in enumerate(item['values']):
+                for c, value in enumerate(values):
+                    self._set(row + r, col + c, value)
+        return {"totalUpdatedCells": sum(len(values) for item in data for values in item['values'])}
+
+    def update_cell(self, row: int, col: int, value):
+        self._call('update_cell')
+        self._set(row, col, value)
+
+
+class FakeClient:
+    """gspread.authorize() 대체 (open_by_key().worksheet()가 같은 시트를 돌려줌)"""
+
+    def __init__(self, worksheet: FakeWorksheet):
+        self._worksheet = worksheet
+
+    def open_by_key(self, key: str) -> "FakeClient":
+        return self
+
+    def worksheet(self, name: str) -> FakeWorksheet:
+        return self._worksheet
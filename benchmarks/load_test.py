@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+/api/check-exposure 부하 테스트
+- 로컬 대체 검색 서버(benchmarks/fixtures/serp 페이지를 지연 후 응답)를 띄우고
+  NAVER_SEARCH_URL을 그쪽으로 돌린 앱 서버(uvicorn)에 동시 요청을 보냄
+- 출력: 상태 코드별 요청 수, 응답 시간 p50/p99, 처리량, 같은 시간 /health 응답 시간
+
+사용법:
+    python benchmarks/load_test.py [--requests 300] [--concurrency 64] [--latency 0.3]
+    python benchmarks/load_test.py --app-url http://127.0.0.1:8000   # 이미 떠 있는 서버 대상
+"""
+import argparse
+import asyncio
+import glob
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures', 'serp')
+
+
+def load_pages() -> list[bytes]:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages or [b'<html><body></body></html>']
+
+
+def start_search_server(latency: float) -> ThreadingHTTPServer:
+    """검색 결과 페이지를 latency초 뒤에 돌려주는 대체 검색 서버"""
+    pages = load_pages()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = pages[hash(self.path) % len(pages)]
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_app(search_url: str, workdir: str) -> tuple[subprocess.Popen, str]:
+    """대체 검색 서버를 보도록 설정한 앱 서버 실행"""
+    port = free_port()
+    env = dict(
+        os.environ,
+        NAVER_SEARCH_URL=search_url,
+        # 속도 제한이 아니라 서버 자체의 동시 처리 능력을 보기 위해 크게 잡음
+        NAVER_RATE='1000',
+        NAVER_MAX_RATE='1000',
+        JOB_DB_PATH=os.path.join(workdir, 'jobs.db'),
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=ROOT_DIR, env=env,
+    )
+    app_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            httpx.get(f'{app_url}/health', timeout=1)
+            return process, app_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('앱 서버가 시작되지 않았습니다.')
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(app_url: str, total: int, concurrency: int) -> dict:
+    """total개 요청을 concurrency개씩 동시에 보내면서 /health 응답 시간도 측정"""
+    latencies = {}  # 상태 코드 → [초]
+    health = []
+    retry_after = []
+    done = asyncio.Event()
+    counter = iter(range(total))
+
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=app_url, timeout=120, limits=limits) as client:
+
+        async def worker():
+            for i in counter:
+                body = {"keyword": f"부하테스트 {i % 50}", "blog_url": "blog.naver.com/loadtest"}
+                start = time.perf_counter()
+                try:
+                    response = await client.post('/api/check-exposure', json=body)
+                    status = response.status_code
+                    if 'retry-after' in response.headers:
+                        retry_after.append(int(response.headers['retry-after']))
+                except httpx.HTTPError:
+                    status = 'error'
+                latencies.setdefault(status, []).append(time.perf_counter() - start)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                try:
+                    await client.get('/health')
+                    health.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.1)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {"latencies": latencies, "health": health, "retry_after": retry_after, "elapsed": elapsed}
+
+
+def report(result: dict, total: int):
+    def ms(samples, pct):
+        return percentile(samples, pct) * 1000
+
+    print(f"{'status':<8} {'count':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for status, samples in sorted(result["latencies"].items(), key=lambda item: str(item[0])):
+        print(f"{status!s:<8} {len(samples):>6} {ms(samples, 50):>9.1f} {ms(samples, 99):>9.1f} "
+              f"{max(samples) * 1000:>9.1f}")
+
+    ok = len(result["latencies"].get(200, []))
+    print()
+    print(f"elapsed {result['elapsed']:.2f}s, {total / result['elapsed']:.1f} req/s, "
+          f"{ok / result['elapsed']:.1f} ok/s")
+    if result["retry_after"]:
+        print(f"Retry-After median {statistics.median(result['retry_after'])}s")
+    health = result["health"]
+    if health:
+        print(f"/health during load: n={len(health)} p50 {ms(health, 50):.1f} ms, p99 {ms(health, 99):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/check-exposure 부하 테스트")
+    parser.add_argument('--requests', type=int, default=300, help="보낼 요청 수")
+    parser.add_argument('--concurrency', type=int, default=64, help="동시 요청 수")
+    parser.add_argument('--latency', type=float, default=0.3, help="대체 검색 서버 응답 지연 (초)")
+    parser.add_argument('--app-url', help="이미 실행 중인 앱 서버 주소 (없으면 직접 띄움)")
+    args = parser.parse_args()
+
+    process = None
+    search_server = None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            app_url = args.app_url
+            if not app_url:
+                search_server = start_search_server(args.latency)
+                search_url = f'http://127.0.0.1:{search_server.server_port}/search.naver'
+                process, app_url = start_app(search_url, workdir)
+                print(f"search stand-in {search_url} (latency {args.latency}s), app {app_url}")
+
+            print(f"{args.requests} requests, concurrency {args.concurrency}\n")
+            result = asyncio.run(run_load(app_url, args.requests, args.concurrency))
+            report(result, args.requests)
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+            if search_server:
+                search_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
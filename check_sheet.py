@@ -5,11 +5,10 @@
 - 조건: T열이 TRUE이고 V열이 비어있는 행만
 - E열: 키워드
 - Q열: 블로그 링크
-- W열: 순위 결과 (순위 또는 "-")
+- W열: 순위 결과 (순위 또는 "-", 검색이 차단/실패하면 비워두고 다음 실행에서 다시 검색)
 """
 import gspread
 from google.oauth2.service_account import Credentials
-import time
 import sys
 import os
 import warnings
@@ -17,6 +16,8 @@ warnings.filterwarnings('ignore')
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from app.services.naver_search import search_naver_view
+from app.services.rank_history import record_ranks
+from app.services.sheet_writer import BufferedSheetWriter
 
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
@@ -33,21 +34,8 @@ EMPTY_COL = 21    # V열 (비어있어야 함)
 RESULT_COL = 23   # W열 (결과 기입, 1부터 시작하는 인덱스)
 
 
-def main():
-    creds_path = os.path.join(os.path.dirname(__file__), 'credentials.json')
-
-    if not os.path.exists(creds_path):
-        print(f"오류: {creds_path} 파일이 없습니다.")
-        return
-
-    print("구글 시트 연결 중...")
-    creds = Credentials.from_service_account_file(creds_path, scopes=SCOPES)
-    client = gspread.authorize(creds)
-
-    spreadsheet = client.open_by_key(SPREADSHEET_ID)
-    sheet = spreadsheet.worksheet("발행")
-    print(f"시트 '발행' 연결 완료")
-
+def process_sheet(sheet) -> int:
+    """조건에 맞는 행의 노출 순위를 W열에 기록. 업데이트한 행 수 반환."""
     all_values = sheet.get_all_values()
     total_rows = len(all_values)
     print(f"총 {total_rows}행")
@@ -72,34 +60,61 @@ def main():
 
     if not rows_to_process:
         print("처리할 행이 없습니다.")
-        return
+        return 0
 
     updated_count = 0
-    for i, (row_num, keyword, link) in enumerate(rows_to_process):
-        print(f"\n[{i+1}/{len(rows_to_process)}] {row_num}행: {keyword[:20]}...")
+    retry_count = 0
+    # 결과는 모아서 한 번에 기록 (종료/오류 시에도 남은 결과 전송)
+    with BufferedSheetWriter(sheet) as writer:
+        for i, (row_num, keyword, link) in enumerate(rows_to_process):
+            print(f"\n[{i+1}/{len(rows_to_process)}] {row_num}행: {keyword[:20]}...")
+
+            try:
+                result = search_naver_view(keyword, link, match_only=True)
+
+                if not result.success:
+                    # 차단/요청 실패는 노출 안됨이 아님 → W열을 비워둬서 다음 실행에서 다시 검색
+                    print(f"  → 검색 실패 (재시도 필요): {result.message}")
+                    retry_count += 1
+                    continue
+
+                if result.is_exposed:
+                    rank_value = str(result.exposed_rank)
+                    print(f"  → {rank_value}위 노출!")
+                else:
+                    rank_value = "-"
+                    print(f"  → 노출 안됨")
+
+                writer.update_cell(row_num, RESULT_COL, rank_value)
+                record_ranks([(keyword, link, rank_value)])
+                updated_count += 1
+
+            except Exception as e:
+                print(f"  → 오류: {e}")
+                writer.update_cell(row_num, RESULT_COL, "오류")
 
-        try:
-            result = search_naver_view(keyword, link)
+    print(f"\n완료! {updated_count}개 행 업데이트됨")
+    if retry_count:
+        print(f"검색 실패로 {retry_count}개 행은 비워둠 (다시 실행하면 재시도)")
+    return updated_count
 
-            if result.is_exposed:
-                rank_value = str(result.exposed_rank)
-                print(f"  → {rank_value}위 노출!")
-            else:
-                rank_value = "-"
-                print(f"  → 노출 안됨")
 
-            sheet.update_cell(row_num, RESULT_COL, rank_value)
-            updated_count += 1
+def main():
+    creds_path = os.path.join(os.path.dirname(__file__), 'credentials.json')
 
-            # API 제한 방지
-            time.sleep(1)
+    if not os.path.exists(creds_path):
+        print(f"오류: {creds_path} 파일이 없습니다.")
+        return
 
-        except Exception as e:
-            print(f"  → 오류: {e}")
-            sheet.update_cell(row_num, RESULT_COL, "오류")
-            time.sleep(1)
+    print("구글 시트 연결 중...")
+    creds = Credentials.from_service_account_file(creds_path, scopes=SCOPES)
+    client = gspread.authorize(creds)
 
-    print(f"\n완료! {updated_count}개 행 업데이트됨")
+    spreadsheet = client.open_by_key(SPREADSHEET_ID)
+    sheet = spreadsheet.worksheet("발행")
+    print(f"시트 '발행' 연결 완료")
+
+    process_sheet(sheet)
 
 
 if __name__ == "__main__":
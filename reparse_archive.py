@@ -0,0 +1,148 @@
+#!/usr/bin/env python3 -u
+"""
+보관한 검색 결과 원본으로 순위 다시 계산 (네이버에 다시 요청하지 않음)
+원본은 SERP_ARCHIVE_DIR을 지정하고 실행한 동안에만 보관됨 (기본은 보관 안 함)
+
+- 기본: 작업 저장소(jobs.db)에서 기간 내에 결과가 나온 행마다
+        그 시점 이전에 가져온 같은 키워드의 원본을 현재 파서로 다시 파싱해서
+        저장된 순위와 다른 행을 출력
+- --keyword + --blog-url: 보관된 그 키워드 원본마다 글의 순위 출력 (시간순)
+                          깊은 순위 확인으로 보관된 블로그 탭 페이지 원본이 있으면 그 위치도 출력
+
+사용법:
+    python reparse_archive.py --from 2026-10-01 --to 2026-10-18
+    python reparse_archive.py --from 2026-10-01 --to 2026-10-18 --all --csv reparse.csv
+    python reparse_archive.py --from 2026-10-01 --keyword "강남 맛집" --blog-url https://blog.naver.com/abc/223...
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app.services.job_store import get_job_store
+from app.services.naver_search import DEEP_RANK_PAGE_SIZE, DEEP_RANK_PAGES, SERP_MAX_RANK
+from app.services.serp_archive import blog_tab_key, get_archive
+from app.services.serp_parser import extract_post_id, find_ranks
+
+
+def parse_day(value: str) -> float:
+    """YYYY-MM-DD → 그날 0시 (로컬 시간) 타임스탬프"""
+    return datetime.strptime(value, "%Y-%m-%d").timestamp()
+
+
+def format_time(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+
+def reparse_rows(archive, start: float, end: float, keyword: str, max_rank: int) -> list:
+    """기간 내 작업 행 순위 다시 계산 → [(행 정보, 원본 정보 또는 None, 새 순위)]"""
+    rows = get_job_store().finished_rows(start, end)
+    if keyword:
+        rows = [row for row in rows if " ".join(row["keyword"].split()) == " ".join(keyword.split())]
+
+    # 원본별로 찾을 글을 모아서 원본 하나당 한 번만 파싱
+    matched = []
+    targets = {}
+    for row in rows:
+        entry = archive.latest("search", row["keyword"], before=row["updated_at"])
+        matched.append((row, entry))
+        if entry:
+            targets.setdefault(entry["sha"], set()).add(extract_post_id(row["link"]))
+
+    page_ranks = {}
+    results = []
+    for row, entry in matched:
+        new_rank = None
+        if entry:
+            sha = entry["sha"]
+            if sha not in page_ranks:
+                page_ranks[sha] = find_ranks([archive.read(sha)], targets[sha], max_rank)
+            new_rank = str(page_ranks[sha].get(extract_post_id(row["link"]), "-"))
+        results.append((row, entry, new_rank))
+    return results
+
+
+def report_rows(results: list, show_all: bool, csv_path: str):
+    changed = [r for r in results if r[2] is not None and r[2] != r[0]["rank"]]
+    missing = sum(1 for r in results if r[1] is None)
+
+    for row, entry, new_rank in (results if show_all else changed):
+        fetched = format_time(entry["fetched_at"]) if entry else "원본 없음"
+        print(f"{row['job_id']} {row['row_num']}행 [{fetched}] {row['keyword'][:20]}: "
+              f"{row['rank']} → {new_rank if new_rank is not None else '?'}")
+
+    print(f"\n{len(results)}개 행 중 순위가 바뀐 행 {len(changed)}개, 원본이 없는 행 {missing}개")
+
+    if csv_path:
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["job_id", "row_num", "keyword", "link", "checked_at", "fetched_at", "old_rank", "new_rank"])
+            for row, entry, new_rank in results:
+                writer.writerow([
+                    row["job_id"], row["row_num"], row["keyword"], row["link"], format_time(row["updated_at"]),
+                    format_time(entry["fetched_at"]) if entry else "", row["rank"], new_rank or "",
+                ])
+        print(f"저장: {csv_path}")
+
+
+def report_history(archive, start: float, end: float, keyword: str, blog_url: str, max_rank: int,
+                   pages: int = DEEP_RANK_PAGES):
+    """키워드 원본마다 글 하나의 순위 (통합 검색, 블로그 탭 1~pages페이지)"""
+    post_id = extract_post_id(blog_url)
+    if not post_id:
+        print(f"오류: 포스트 ID가 없는 링크입니다: {blog_url}")
+        return
+
+    entries = archive.entries("search", start, end, key=keyword)
+    for entry in entries:
+        rank = find_ranks([archive.read(entry["sha"])], [post_id], max_rank).get(post_id)
+        print(f"[{format_time(entry['fetched_at'])}] {keyword}: {f'{rank}위' if rank else '-'}")
+
+    # 블로그 탭 순위는 페이지 안에서의 순서 → 블로그 탭 위치로 (깊은 순위 확인과 같은 계산)
+    tab_entries = 0
+    for page in range(1, pages + 1):
+        for entry in archive.entries("blog_tab", start, end, key=blog_tab_key(keyword, page)):
+            tab_entries += 1
+            page_rank = find_ranks([archive.read(entry["sha"])], [post_id]).get(post_id)
+            position = f"{(page - 1) * DEEP_RANK_PAGE_SIZE + page_rank}위" if page_rank else "-"
+            print(f"[{format_time(entry['fetched_at'])}] {keyword} 블로그 탭 {page}페이지: {position}")
+    print(f"\n원본 {len(entries)}개, 블로그 탭 원본 {tab_entries}개")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보관한 검색 결과 원본으로 순위 다시 계산")
+    parser.add_argument('--from', dest='start', required=True, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end', help="종료일 (YYYY-MM-DD, 포함, 기본: 오늘)")
+    parser.add_argument('--keyword', help="이 키워드만")
+    parser.add_argument('--blog-url', help="--keyword와 함께: 원본마다 이 글의 순위 출력")
+    parser.add_argument('--max-rank', type=int, default=SERP_MAX_RANK, help="이 순위까지만 셈 (0이면 끝까지)")
+    parser.add_argument('--pages', type=int, default=DEEP_RANK_PAGES, help="--blog-url과 함께: 확인할 블로그 탭 페이지 수")
+    parser.add_argument('--all', action='store_true', help="바뀌지 않은 행도 출력")
+    parser.add_argument('--csv', help="전체 결과를 CSV로 저장할 경로")
+    args = parser.parse_args()
+
+    archive = get_archive()
+    if archive is None:
+        print("오류: SERP_ARCHIVE_DIR가 설정되어 있지 않습니다.")
+        return
+
+    start = parse_day(args.start)
+    end = parse_day(args.end) if args.end else time.time()
+    end = (datetime.fromtimestamp(end).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)).timestamp()
+
+    began = time.perf_counter()
+    if args.blog_url:
+        if not args.keyword:
+            print("오류: --blog-url은 --keyword와 함께 사용합니다.")
+            return
+        report_history(archive, start, end, args.keyword, args.blog_url, args.max_rank, args.pages)
+    else:
+        report_rows(reparse_rows(archive, start, end, args.keyword, args.max_rank), args.all, args.csv)
+    print(f"{time.perf_counter() - began:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+테스트 공통 설정
+
+앱 모듈은 설정을 import 시점에 읽으므로 앱 모듈을 import하기 전에 환경변수를 지정한다.
+(작업 저장소/순위 이력은 임시 디렉터리에, 검색 속도 제한은 테스트가 오래 걸리지 않을 만큼)
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks', 'e2e'))
+
+_workdir = tempfile.mkdtemp(prefix='exposure-tests-')
+atexit.register(shutil.rmtree, _workdir, True)
+
+os.environ.update({
+    "JOB_DB_PATH": os.path.join(_workdir, 'jobs.db'),
+    "RANK_HISTORY_DB": os.path.join(_workdir, 'rank_history.db'),
+    "SERP_ARCHIVE_DIR": "",
+    "NAVER_RATE": "20",
+    "NAVER_MAX_RATE": "50",
+    "SHEETS_RATE": "50",
+})
@@ -0,0 +1,37 @@
+"""요청 수용 제어: 대기 시간 초과 / 연결 끊김이 몰려도 처리 슬롯을 잃어버리지 않음"""
+import asyncio
+import random
+
+from app.services.admission import AdmissionController, Overloaded
+
+
+def test_wait_timeouts_never_leak_slots():
+    async def hammer():
+        admission = AdmissionController(max_in_flight=2, max_waiting=1000, wait_timeout=0.001)
+        start = admission._semaphore._value
+        outcomes = {"admitted": 0, "rejected": 0}
+        rng = random.Random(0)
+
+        async def request(hold):
+            try:
+                async with admission.admit():
+                    outcomes["admitted"] += 1
+                    await asyncio.sleep(hold)
+            except Overloaded:
+                outcomes["rejected"] += 1
+
+        for _ in range(200):
+            tasks = [asyncio.ensure_future(request(rng.choice([0, 0.0005, 0.001]))) for _ in range(20)]
+            for _ in range(rng.randint(0, 3)):
+                await asyncio.sleep(0)
+            # 클라이언트 연결 끊김
+            for task in rng.sample(tasks, 5):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return admission, start, outcomes
+
+    admission, start, outcomes = asyncio.run(hammer())
+
+    assert outcomes["admitted"] and outcomes["rejected"]
+    assert admission._semaphore._value == start
+    assert admission.in_flight == 0 and admission.waiting == 0
@@ -0,0 +1,113 @@
+"""차단기 상태 전이: closed → open → half-open (확인 요청) → closed / 다시 open"""
+import time
+
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+COOLDOWN = 0.05
+
+
+@pytest.fixture
+def breaker() -> CircuitBreaker:
+    return CircuitBreaker("test", threshold=2, cooldown=COOLDOWN, max_cooldown=COOLDOWN * 4)
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.threshold):
+        breaker.record_block()
+
+
+def test_opens_after_consecutive_blocks(breaker):
+    breaker.record_block()
+    assert breaker.state == "closed"
+    breaker.record_success()
+    breaker.record_block()
+    assert breaker.state == "closed"  # 정상 응답이 끼면 연속 횟수 초기화
+
+    breaker.record_block()
+    assert breaker.state == "open"
+    assert breaker.trips == 1
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.check()
+    assert 0 < error.value.retry_after <= COOLDOWN
+
+
+def test_half_open_lets_one_probe_through(breaker):
+    open_breaker(breaker)
+    time.sleep(COOLDOWN * 1.2)
+    assert breaker.state == "half_open"
+
+    assert breaker.try_pass() == 0
+    assert breaker.try_pass() == circuit_breaker.PROBE_WAIT
+    assert breaker.pending() == circuit_breaker.PROBE_WAIT
+
+
+def test_probe_success_closes_and_resets_cooldown(breaker):
+    open_breaker(breaker)
+    time.sleep(COOLDOWN * 1.2)
+    breaker.try_pass()
+    breaker.record_block()  # 확인 요청 차단 → 두 배
+    assert breaker.snapshot()["cooldown"] == COOLDOWN * 2
+
+    time.sleep(COOLDOWN * 2.2)
+    assert breaker.try_pass() == 0
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["cooldown"] == COOLDOWN
+    assert breaker.try_pass() == 0
+
+
+def test_probe_block_reopens_with_doubled_cooldown_up_to_max(breaker):
+    open_breaker(breaker)
+    for expected in (COOLDOWN * 2, COOLDOWN * 4, COOLDOWN * 4):
+        time.sleep(breaker.snapshot()["cooldown"] * 1.2)
+        assert breaker.try_pass() == 0
+        breaker.record_block()
+        assert breaker.state == "open"
+        assert breaker.snapshot()["cooldown"] == expected
+    assert breaker.trips == 4
+
+
+def test_probe_error_frees_probe_slot(breaker):
+    open_breaker(breaker)
+    time.sleep(COOLDOWN * 1.2)
+    assert breaker.try_pass() == 0
+    breaker.record_error()
+    assert breaker.state == "half_open"
+    assert breaker.try_pass() == 0  # 다음 요청이 다시 확인
+
+
+def test_stale_probe_times_out(breaker, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "PROBE_TIMEOUT", 0.05)
+    open_breaker(breaker)
+    time.sleep(COOLDOWN * 1.2)
+    assert breaker.try_pass() == 0
+    assert breaker.try_pass() > 0
+    time.sleep(0.06)
+    assert breaker.try_pass() == 0
+
+
+def test_late_responses_while_open_are_ignored(breaker):
+    open_breaker(breaker)
+    until = breaker._open_until
+
+    # 열리기 전에 보낸 요청의 늦은 응답
+    breaker.record_success()
+    assert breaker.state == "open"
+    breaker.record_block()
+    breaker.record_block()
+    assert breaker._open_until == until
+    assert breaker.trips == 1
+
+    # half-open에서도 확인 요청이 아닌 응답은 무시
+    time.sleep(COOLDOWN * 1.2)
+    breaker.record_success()
+    assert breaker.state == "half_open"
+
+
+def test_trip_opens_without_threshold(breaker):
+    breaker.record_block(trip=True)
+    assert breaker.state == "open"
+    assert breaker.trips == 1
@@ -0,0 +1,125 @@
+"""깊은 순위 확인: 페이지 동시 요청, 위치가 정해지면 남은 페이지 취소, 호출한 쪽이 취소하면 모두 취소"""
+import asyncio
+
+import pytest
+
+from stand_ins import NaverStandIn
+
+from app.services import naver_search
+from app.services.fetch_engine import FetchEngine
+from app.services.naver_search import DEEP_RANK_PAGE_SIZE
+from app.services.serp_parser import extract_post_id, parse_blog_results
+
+
+class FakePages:
+    """
+    _fetch_ranks 대신: 페이지마다 (지연, {포스트 ID: 페이지 안 순위} 또는 예외)
+    시작/완료/취소된 페이지를 기록
+    """
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+        self.started, self.finished, self.cancelled = [], [], []
+
+    async def __call__(self, keyword, target_ids, max_rank, page=0):
+        self.started.append(page)
+        delay, ranks = self.pages.get(page, (0.0, {}))
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(page)
+            raise
+        self.finished.append(page)
+        if isinstance(ranks, Exception):
+            raise ranks
+        return {post_id: rank for post_id, rank in ranks.items() if post_id in target_ids}, len(ranks)
+
+
+def run_deep(pages: dict, targets: list, page_count: int = 5) -> tuple:
+    engine = FetchEngine()
+    fake = FakePages(pages)
+    engine._fetch_ranks = fake
+    return asyncio.run(engine._deep_ranks("키워드", targets, page_count)), fake
+
+
+def test_integrated_hit_cancels_blog_pages():
+    positions, fake = run_deep({0: (0.01, {"100": 4})} | {page: (1.0, {}) for page in range(1, 6)}, ["100"])
+
+    assert positions == {"100": {"rank": 4, "page": 1, "section": "integrated", "page_rank": 4}}
+    assert sorted(fake.cancelled) == [1, 2, 3, 4, 5]
+
+
+def test_blog_hit_cancels_later_pages_but_waits_for_integrated_and_earlier():
+    pages = {0: (0.1, {}), 1: (0.05, {}), 2: (0.01, {"200": 7})} | {page: (1.0, {}) for page in (3, 4, 5)}
+    positions, fake = run_deep(pages, ["200"])
+
+    assert positions == {"200": {"rank": DEEP_RANK_PAGE_SIZE + 7, "page": 2, "section": "blog", "page_rank": 7}}
+    assert sorted(fake.finished) == [0, 1, 2]
+    assert sorted(fake.cancelled) == [3, 4, 5]
+
+
+def test_integrated_rank_wins_over_blog_tab():
+    positions, _ = run_deep({0: (0.05, {"100": 9}), 1: (0.01, {"100": 2})}, ["100"])
+    assert positions["100"]["section"] == "integrated"
+    assert positions["100"]["rank"] == 9
+
+
+def test_earliest_blog_page_wins_even_if_it_answers_last():
+    positions, _ = run_deep({0: (0.0, {}), 1: (0.05, {"200": 3}), 3: (0.01, {"200": 1})}, ["200"])
+    assert positions["200"]["page"] == 1
+    assert positions["200"]["rank"] == 3
+
+
+def test_page_error_is_raised_only_when_a_target_is_missing():
+    error = RuntimeError("차단")
+    positions, _ = run_deep({0: (0.0, {"100": 1}), 2: (0.0, error)}, ["100"])
+    assert positions["100"]["section"] == "integrated"
+
+    with pytest.raises(RuntimeError):
+        run_deep({0: (0.0, {}), 2: (0.0, error)}, ["100"])
+
+
+def test_not_found_waits_for_every_page():
+    positions, fake = run_deep({}, ["100"], page_count=3)
+    assert positions == {}
+    assert sorted(fake.finished) == [0, 1, 2, 3]
+    assert fake.cancelled == []
+
+
+def test_caller_cancel_cancels_every_page():
+    engine = FetchEngine()
+    fake = FakePages({page: (1.0, {}) for page in range(0, 6)})
+    engine._fetch_ranks = fake
+
+    async def cancel_midway():
+        task = asyncio.ensure_future(engine._deep_ranks("키워드", ["100"], 5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)  # 페이지 작업의 취소 처리
+
+    asyncio.run(cancel_midway())
+    assert sorted(fake.cancelled) == [0, 1, 2, 3, 4, 5]
+    assert fake.finished == []
+
+
+def test_deep_ranks_against_stand_in(monkeypatch):
+    naver = NaverStandIn(latency=0.0).start()
+    monkeypatch.setattr(naver_search, "NAVER_SEARCH_URL", f"{naver.base_url}/search.naver")
+    engine = FetchEngine()
+    try:
+        keyword = "깊은 순위 테스트"
+        result = parse_blog_results(naver.page_for(keyword))[2]
+        post_id = extract_post_id(result.url)
+
+        positions = engine.find_deep_ranks_sync(keyword, [post_id], 3)
+        assert positions[post_id]["section"] == "integrated"
+        assert positions[post_id]["rank"] == result.rank
+
+        naver.reset_counts()
+        assert engine.find_deep_ranks_sync(keyword, ["1"], 3) == {}
+        assert naver.requests["search"] == 4
+    finally:
+        engine.close()
+        naver.stop()
@@ -0,0 +1,158 @@
+"""검색 경로 풀: 경로 선택, 차단/죽은 프록시 회피, 경로별 속도 제한 (로컬 프록시 대체 서버 사용)"""
+import time
+
+import pytest
+import requests
+
+from stand_ins import NaverStandIn, ProxyStandIn
+
+from app.services import naver_search
+from app.services.circuit_breaker import PROBE_WAIT, CircuitBreaker, CircuitOpenError
+from app.services.egress import EgressPool
+from app.services.naver_search import BlockedError
+
+
+@pytest.fixture(scope="module")
+def naver():
+    stand_in = NaverStandIn(latency=0.0).start()
+    yield stand_in
+    stand_in.stop()
+
+
+@pytest.fixture
+def proxies():
+    started = []
+
+    def start(**kwargs):
+        proxy = ProxyStandIn(**kwargs).start()
+        started.append(proxy)
+        return proxy
+
+    yield start
+    for proxy in started:
+        proxy.stop()
+
+
+@pytest.fixture
+def search(naver, monkeypatch):
+    """풀을 지정해서 검색하는 함수 (실패는 예외 대신 결과로)"""
+    monkeypatch.setattr(naver_search, "NAVER_SEARCH_URL", f"{naver.base_url}/search.naver")
+
+    def run(pool: EgressPool, count: int) -> dict:
+        monkeypatch.setattr(naver_search, "get_egress_pool", lambda: pool)
+        outcomes = {"ok": 0, "blocked": 0, "error": 0}
+        for i in range(count):
+            try:
+                naver_search.fetch_blog_results(f"경로 테스트 {i}")
+                outcomes["ok"] += 1
+            except BlockedError:
+                outcomes["blocked"] += 1
+            except requests.RequestException:
+                outcomes["error"] += 1
+        return outcomes
+
+    return run
+
+
+def test_spreads_requests_over_healthy_routes(proxies, search):
+    first, second = proxies(), proxies()
+    pool = EgressPool(f"{first.url},{second.url}")
+
+    assert search(pool, 10) == {"ok": 10, "blocked": 0, "error": 0}
+    assert first.requests > 0 and second.requests > 0
+    assert first.requests + second.requests == 10
+
+
+def test_fails_over_from_blocked_proxy(proxies, search):
+    blocked, healthy = proxies(block_rate=1.0), proxies()
+    pool = EgressPool(f"{blocked.url},{healthy.url}")
+
+    outcomes = search(pool, 12)
+    assert outcomes["blocked"] == blocked.requests
+    assert blocked.requests <= 3
+    assert outcomes["ok"] == healthy.requests == 12 - blocked.requests
+
+    blocked_route = pool.routes[0]
+    assert blocked_route.health < pool.routes[1].health
+
+
+def test_fails_over_from_dead_proxy(proxies, search):
+    dead, healthy = proxies(down=True), proxies()
+    pool = EgressPool(f"{dead.url},{healthy.url}")
+
+    outcomes = search(pool, 12)
+    assert outcomes["error"] <= 3
+    assert outcomes["ok"] == healthy.requests == 12 - outcomes["error"]
+
+
+def test_dead_proxy_trips_its_breaker(proxies, search):
+    dead, healthy = proxies(down=True), proxies()
+    pool = EgressPool(f"{dead.url},{healthy.url}")
+    dead_route, healthy_route = pool.routes
+
+    # 점수와 상관없이 죽은 경로만 고르게 해서 연속 실패를 쌓음
+    pool.routes = [dead_route]
+    assert search(pool, 3)["error"] == 3
+    assert dead_route.breaker.state == "open"
+
+    pool.routes = [dead_route, healthy_route]
+    assert pool.choose() is healthy_route
+
+
+def test_route_rate_option_limits_that_route(proxies, search):
+    slow, fast = proxies(), proxies()
+    pool = EgressPool(f"{slow.url};rate=2,{fast.url}")
+    assert pool.routes[0].limiter.max_rate == 2
+    assert pool.routes[0].limiter.rate <= 2
+    assert pool.routes[1].limiter.rate == 20
+
+    only_slow = EgressPool(f"{slow.url};rate=2")
+    start = time.monotonic()
+    search(only_slow, 3)
+    # 버스트 1개 뒤로는 초당 2개
+    assert time.monotonic() - start >= 0.9
+    assert slow.requests == 3
+
+
+def test_check_matches_choose_while_probe_is_running():
+    pool = EgressPool("http://127.0.0.1:9")
+    route = pool.routes[0]
+    route.breaker = CircuitBreaker(route.name, threshold=1, cooldown=0.05)
+
+    route.breaker.record_block()
+    with pytest.raises(CircuitOpenError):
+        pool.check()
+
+    time.sleep(0.06)
+    pool.check()  # half-open, 아직 확인 요청 없음
+    assert pool.choose() is route  # 이 요청이 확인 요청
+
+    with pytest.raises(CircuitOpenError) as check_error:
+        pool.check()
+    assert check_error.value.retry_after == PROBE_WAIT
+    with pytest.raises(CircuitOpenError):
+        pool.choose()
+
+    route.breaker.record_success()
+    pool.check()
+    assert route.breaker.state == "closed"
+
+
+def test_server_errors_do_not_raise_route_rate(proxies, monkeypatch):
+    failing = NaverStandIn(latency=0.0, error_rate=1.0).start()
+    monkeypatch.setattr(naver_search, "NAVER_SEARCH_URL", f"{failing.base_url}/search.naver")
+    proxy = proxies()
+    pool = EgressPool(proxy.url)
+    monkeypatch.setattr(naver_search, "get_egress_pool", lambda: pool)
+    route = pool.routes[0]
+    rate = route.limiter.rate
+    try:
+        for i in range(3):
+            with pytest.raises(requests.HTTPError):
+                naver_search.fetch_blog_results(f"오류 테스트 {i}")
+    finally:
+        failing.stop()
+
+    assert failing.failures["error"] == 3
+    assert route.limiter.rate < rate
+    assert route.health < 1.0
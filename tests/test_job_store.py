@@ -0,0 +1,155 @@
+"""작업 저장소: 행 임대 큐, 멈춘 작업 정리 (interrupted)"""
+import time
+
+import pytest
+
+from app.services.job_store import JobStore
+
+
+@pytest.fixture
+def store(tmp_path) -> JobStore:
+    return JobStore(str(tmp_path / "jobs.db"))
+
+
+def add_job(store: JobStore, rows: list, status: str = "running", row_status: str = "pending") -> str:
+    """rows: [(행 번호, 키워드)] 또는 [(행 번호, 키워드, 우선순위)]"""
+    job_id = store.create_job({"sheet_name": "발행"})
+    store.set_status(job_id, status)
+    store.queue_rows(job_id, [
+        {"row_num": row[0], "keyword": row[1], "link": f"https://blog.naver.com/a/{row[0]}",
+         "priority": row[2] if len(row) > 2 else 0}
+        for row in rows
+    ], row_status)
+    return job_id
+
+
+def leased(rows: list) -> list:
+    return [row["row_num"] for row in rows]
+
+
+def age_job(store: JobStore, job_id: str, seconds: float):
+    store._execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time() - seconds, job_id))
+
+
+def test_lease_takes_whole_keywords(store):
+    add_job(store, [(3, "a"), (4, "b"), (5, "a"), (6, "c")])
+
+    assert leased(store.lease_rows("w1", 2, 60, 1)) == [3, 4, 5]
+    assert leased(store.lease_rows("w2", 2, 60, 1)) == [6]
+    assert store.lease_rows("w3", 2, 60, 1) == []
+
+
+def test_lease_only_from_running_jobs(store):
+    add_job(store, [(3, "a")], status="paused")
+    assert store.lease_rows("w1", 8, 60, 1) == []
+
+
+def test_expired_lease_is_taken_over_unless_renewed(store):
+    add_job(store, [(3, "a"), (4, "b")])
+    assert leased(store.lease_rows("w1", 1, 0.05, 1)) == [3]
+    assert leased(store.lease_rows("w1", 1, 0.05, 1)) == [4]
+
+    store.renew_leases("w1", 60)
+    time.sleep(0.1)
+    assert store.lease_rows("w2", 8, 60, 1) == []
+
+    store._execute("UPDATE job_rows SET lease_until = ? WHERE row_num = 3", (time.time() - 1,))
+    rows = store.lease_rows("w2", 8, 60, 1)
+    assert leased(rows) == [3]
+    assert rows[0]["attempts"] == 2
+
+
+def test_release_returns_rows_without_counting_attempt(store):
+    job_id = add_job(store, [(3, "a"), (4, "a"), (5, "b")])
+    store.lease_rows("w1", 8, 60, 1)
+
+    assert store.release_leases("w1", job_id, [4]) == 1
+    assert leased(store.lease_rows("w2", 8, 60, 1)) == [4]
+
+    assert store.release_leases("w1") == 2
+    rows = store.lease_rows("w2", 8, 60, 1)
+    assert leased(rows) == [3, 5]
+    assert {row["attempts"] for row in rows} == {1}
+
+
+def test_failed_rows_retry_after_fresh_rows_up_to_limit(store):
+    job_id = add_job(store, [(3, "a"), (4, "b")])
+    store.lease_rows("w1", 1, 60, 1)
+    store.mark_retry(job_id, [3])
+
+    assert leased(store.lease_rows("w1", 1, 60, 1)) == [4]
+    assert leased(store.lease_rows("w1", 1, 60, 1)) == [3]
+    store.mark_retry(job_id, [3])
+    assert store.lease_rows("w1", 1, 60, 1) == []
+    assert store.open_rows(job_id, 1) == 1  # 4행은 임대 중, 3행은 재시도 횟수 소진
+
+
+def test_checkpoint_marks_rows_done(store):
+    job_id = add_job(store, [(3, "a"), (4, "a")])
+    store.lease_rows("w1", 8, 60, 1)
+    store.checkpoint(job_id, [(3, "2"), (4, "-")], 0)
+
+    assert store.open_rows(job_id, 1) == 0
+    assert store.done_rows(job_id) == {3: "2", 4: "-"}
+    assert store.release_leases("w1") == 0
+
+
+def test_priority_orders_keywords(store):
+    add_job(store, [(3, "a", 1.0), (4, "b", 5.0), (5, "c", 3.0)])
+    assert leased(store.lease_rows("w1", 1, 60, 1)) == [4]
+    assert leased(store.lease_rows("w1", 1, 60, 1)) == [5]
+
+
+def test_scheduled_rows_wait_for_release(store):
+    job_id = add_job(store, [(3, "a"), (4, "b"), (5, "b")], row_status="scheduled")
+    assert store.lease_rows("w1", 8, 60, 1) == []
+    assert store.scheduled_keywords(job_id) == 2
+
+    assert store.release_scheduled(job_id, 1) == 1
+    assert leased(store.lease_rows("w1", 8, 60, 1)) == [3]
+    assert store.open_rows(job_id, 1) == 3
+
+
+def test_stale_running_job_is_interrupted(store):
+    stale = add_job(store, [(3, "a")])
+    fresh = add_job(store, [(4, "b")])
+    done = add_job(store, [(5, "c")], status="completed")
+    age_job(store, stale, 120)
+    age_job(store, done, 120)
+
+    assert store.mark_interrupted(60) == 1
+    assert store.job_status(stale) == "interrupted"
+    assert store.job_status(fresh) == "running"
+    assert store.job_status(done) == "completed"
+
+
+@pytest.mark.parametrize("status", ["queued", "running", "paused"])
+def test_held_jobs_survive_the_sweep(store, status):
+    job_id = add_job(store, [(3, "a")], status=status)
+    store.hold(job_id)
+    age_job(store, job_id, 120)
+
+    assert store.mark_interrupted(60) == 0
+    assert store.job_status(job_id) == status
+
+    store.release(job_id)
+    age_job(store, job_id, 120)
+    assert store.mark_interrupted(60) == 1
+    assert store.job_status(job_id) == "interrupted"
+
+
+def test_other_process_sweep_spares_touched_jobs(store):
+    other = JobStore(store.path)
+    queued = add_job(store, [(3, "a")], status="queued")
+    store.hold(queued)
+    age_job(store, queued, 120)
+
+    # 이 프로세스의 행 작업자가 주기적으로 정리를 돌면서 맡은 작업을 갱신
+    store.mark_interrupted(60)
+    assert other.mark_interrupted(60) == 0
+    assert other.job_status(queued) == "queued"
+
+    # 갱신이 멈추면 (프로세스 종료) 다른 프로세스가 정리
+    age_job(store, queued, 120)
+    assert other.mark_interrupted(60) == 1
+    assert store.job_status(queued) == "interrupted"
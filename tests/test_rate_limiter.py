@@ -0,0 +1,118 @@
+"""적응형 속도 제한: 토큰 간격, 차단 시 감속/지수 백오프, 오류 응답 시 감속, 정상 응답 시 회복"""
+import asyncio
+import time
+
+import pytest
+
+from stand_ins import NaverStandIn
+
+from app.services import blog_fetcher
+from app.services.rate_limiter import AdaptiveRateLimiter, limiter_for_url
+
+
+def make_limiter(**kwargs) -> AdaptiveRateLimiter:
+    options = dict(rate=10.0, min_rate=1.0, max_rate=20.0, jitter=0.0,
+                   increase_step=1.0, backoff_base=0.2, backoff_max=0.5, name="test")
+    options.update(kwargs)
+    return AdaptiveRateLimiter(**options)
+
+
+def test_tokens_space_out_requests():
+    limiter = make_limiter()
+    waits = [limiter._reserve() for _ in range(3)]
+    assert waits[0] == 0
+    assert waits[1] == pytest.approx(0.1, abs=0.01)
+    assert waits[2] == pytest.approx(0.2, abs=0.01)
+
+
+def test_block_halves_rate_and_backs_off_exponentially():
+    limiter = make_limiter(rate=100.0, max_rate=200.0)
+
+    limiter.record_block()
+    assert limiter.rate == 50.0
+    assert limiter.snapshot()["block_streak"] == 1
+    assert limiter.next_available() == pytest.approx(0.2, abs=0.02)
+
+    limiter.record_block()
+    assert limiter.rate == 25.0
+    assert limiter.next_available() == pytest.approx(0.4, abs=0.02)
+
+    # 백오프는 backoff_max, 속도는 min_rate 아래로 내려가지 않음
+    for _ in range(5):
+        limiter.record_block()
+    assert limiter.rate == 1.0
+    assert limiter.snapshot()["blocked_for"] == pytest.approx(0.5, abs=0.05)
+
+
+def test_acquire_waits_out_backoff():
+    limiter = make_limiter(rate=100.0, max_rate=200.0)
+    limiter.record_block()
+
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.19
+
+
+def test_success_resets_streak_and_raises_rate_up_to_max():
+    limiter = make_limiter(rate=100.0, max_rate=200.0, increase_step=10.0)
+    limiter.record_block()
+    limiter.record_block()
+
+    limiter.record_success()
+    assert limiter.snapshot()["block_streak"] == 0
+    assert limiter.rate == 35.0
+
+    # 다음 차단은 다시 처음 백오프부터
+    time.sleep(0.45)
+    limiter.record_block()
+    assert limiter.next_available() == pytest.approx(0.2, abs=0.02)
+
+    for _ in range(30):
+        limiter.record_success()
+    assert limiter.rate == 200.0
+
+
+def test_cancelled_async_wait_returns_token():
+    limiter = make_limiter(rate=1.0, min_rate=0.5, max_rate=1.0)
+
+    async def cancel_waiter():
+        await limiter.acquire_async()  # 버스트 토큰
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(cancel_waiter())
+    # 취소된 요청의 예약이 남아 있으면 2초를 기다려야 함
+    assert limiter.next_available() <= 1.0
+
+
+def test_error_responses_never_raise_rate():
+    limiter = make_limiter(rate=10.0)
+
+    limiter.record_error(404)
+    assert limiter.rate == 10.0
+
+    limiter.record_error(500)
+    limiter.record_error(503)
+    assert limiter.rate == pytest.approx(6.4)
+    assert limiter.snapshot()["blocked_for"] == 0  # 차단과 달리 요청을 멈추지는 않음
+
+    for _ in range(20):
+        limiter.record_error(502)
+    assert limiter.rate == limiter.min_rate
+
+
+def test_failing_host_does_not_ramp_up(monkeypatch):
+    naver = NaverStandIn(latency=0.0, error_rate=1.0).start()
+    url = f"{naver.base_url}/rss/blog.xml"
+    limiter = limiter_for_url(url)
+    monkeypatch.setattr(limiter, "rate", 20.0)
+    monkeypatch.setattr(limiter, "max_rate", 20.0)
+    try:
+        for _ in range(3):
+            assert blog_fetcher._get(url, {}).status_code == 503
+        assert limiter.rate < 20.0
+    finally:
+        naver.stop()
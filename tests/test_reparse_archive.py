@@ -0,0 +1,28 @@
+"""보관 원본 다시 파싱: 통합 검색과 깊은 순위 확인의 블로그 탭 페이지 원본 모두"""
+import time
+
+from stand_ins import NaverStandIn
+
+import reparse_archive
+from app.services.naver_search import DEEP_RANK_PAGE_SIZE
+from app.services.serp_archive import SerpArchive, blog_tab_key
+from app.services.serp_parser import parse_blog_results
+
+
+def test_history_reports_blog_tab_position(tmp_path, capsys):
+    naver = NaverStandIn()
+    keyword = "벤치마크 키워드 0"
+    search_page = naver.page_for(keyword)
+    tab_page = naver.blog_tab_page_for(keyword, DEEP_RANK_PAGE_SIZE + 1)
+    target = parse_blog_results(tab_page)[2]
+
+    archive = SerpArchive(str(tmp_path))
+    now = time.time()
+    archive.put("search", keyword, search_page, now)
+    archive.put("blog_tab", blog_tab_key(keyword, 2), tab_page, now)
+
+    reparse_archive.report_history(archive, now - 60, now + 60, keyword, target.url, 0, pages=3)
+    out = capsys.readouterr().out
+
+    assert f"블로그 탭 2페이지: {DEEP_RANK_PAGE_SIZE + target.rank}위" in out
+    assert "원본 1개, 블로그 탭 원본 1개" in out
@@ -0,0 +1,78 @@
+"""순위만 확인(RankFinder)과 전체 파싱(parse_blog_results)의 순위 일치 (저장해둔 검색 결과 페이지)"""
+import glob
+import os
+
+import pytest
+
+from app.services.serp_parser import RankFinder, extract_post_id, find_ranks, parse_blog_results
+
+FIXTURES = sorted(glob.glob(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures', 'serp', '*.html')))
+
+
+def chunked(data: bytes, size: int) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.fixture(params=FIXTURES, ids=os.path.basename)
+def page(request) -> tuple:
+    """(HTML 바이트, 전체 파싱 순위 {포스트 ID: 순위})"""
+    with open(request.param, 'rb') as f:
+        data = f.read()
+    ranks = {extract_post_id(result.url): result.rank for result in parse_blog_results(data.decode('utf-8'))}
+    assert ranks, "블로그 글이 없는 저장 페이지"
+    return data, ranks
+
+
+def test_fixtures_exist():
+    assert FIXTURES
+
+
+@pytest.mark.parametrize("chunk_size", [512, 4096, 16384, 1 << 20])
+def test_all_ranks_match_full_parse(page, chunk_size):
+    data, expected = page
+    assert find_ranks(chunked(data, chunk_size), expected) == expected
+
+
+def test_each_target_matches_full_parse(page):
+    data, expected = page
+    for post_id, rank in expected.items():
+        assert find_ranks(chunked(data, 4096), [post_id]) == {post_id: rank}
+
+
+def test_missing_target_counts_every_result(page):
+    data, expected = page
+    finder = RankFinder(["0"])
+    for chunk in chunked(data, 4096):
+        finder.feed(chunk)
+    assert finder.close() == {}
+    assert finder.count == len(expected)
+
+
+def test_stops_reading_once_targets_are_found(page):
+    data, expected = page
+    first = min(expected, key=expected.get)
+    chunks = chunked(data, 1024)
+    read = []
+
+    def counted():
+        for chunk in chunks:
+            read.append(chunk)
+            yield chunk
+
+    assert find_ranks(counted(), [first]) == {first: 1}
+    assert len(read) < len(chunks)
+
+
+def test_max_rank_limits_counted_results(page):
+    data, expected = page
+    last = max(expected, key=expected.get)
+    if expected[last] < 2:
+        pytest.skip("결과가 하나뿐인 페이지")
+
+    finder = RankFinder([last], max_rank=expected[last] - 1)
+    for chunk in chunked(data, 4096):
+        if finder.feed(chunk):
+            break
+    assert finder.close() == {}
+    assert finder.count == expected[last] - 1
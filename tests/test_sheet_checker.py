@@ -0,0 +1,65 @@
+"""시트 노출 체크 작업: 진행 상태에 파이프라인 단계별 대기 항목 수 보고, 검색 단계 캐시 miss 집계"""
+import time
+from unittest import mock
+
+import pytest
+
+from stand_ins import FakeClient, FakeWorksheet, NaverStandIn
+
+import run_e2e
+from app.services import naver_search
+from app.services import sheet_checker
+from app.services.fetch_engine import FetchEngine
+from app.services.serp_parser import parse_blog_results
+
+
+def test_progress_reports_pipeline_queue_depths(monkeypatch):
+    naver = NaverStandIn(latency=0.05).start()
+    monkeypatch.setattr(naver_search, "NAVER_SEARCH_URL", f"{naver.base_url}/search.naver")
+    sheet = FakeWorksheet(run_e2e.build_rows(naver, 40, 40, 0.0, 0.5, 1))
+
+    published = []
+    finished = []
+
+    def record(state):
+        if state["status"] == "running":
+            published.append(dict(state["queues"]))
+        elif state["status"] == "completed":
+            finished.append(dict(state["queues"]))
+
+    try:
+        with mock.patch.object(sheet_checker, "get_credentials", return_value=object()), \
+                mock.patch.object(sheet_checker.gspread, "authorize", return_value=FakeClient(sheet)), \
+                mock.patch.object(sheet_checker, "publish_state", side_effect=record):
+            sheet_checker.get_row_worker().start()
+            deadline = time.monotonic() + 5
+            while not sheet_checker.get_row_worker().depths() and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+            result = sheet_checker.check_sheet_exposure("1/1", "12/31")
+    finally:
+        naver.stop()
+
+    assert result["success"] and result["processed"] == 40
+    assert any(set(queues) == {"fetch", "parse", "write"} for queues in published)
+    assert finished == [{}]
+
+
+@pytest.mark.parametrize("match_only", [True, False])
+def test_fetch_stage_counts_one_miss_per_search(monkeypatch, match_only):
+    naver = NaverStandIn().start()
+    monkeypatch.setattr(naver_search, "NAVER_SEARCH_URL", f"{naver.base_url}/search.naver")
+    monkeypatch.setattr(sheet_checker, "SERP_MATCH_ONLY", match_only)
+    engine = FetchEngine()
+    monkeypatch.setattr(sheet_checker, "get_engine", lambda: engine)
+    keyword = "벤치마크 키워드 0"
+    link = parse_blog_results(naver.page_for(keyword))[0].url
+    item = {"keyword": keyword, "rows": [{"link": link}]}
+
+    try:
+        item = sheet_checker._fetch_stage(item, {"status": "running"})
+    finally:
+        naver.stop()
+
+    assert "error" not in item
+    assert engine.cache.misses == 1
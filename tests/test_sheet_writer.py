@@ -0,0 +1,54 @@
+"""시트 버퍼 쓰기: 행 수 기준 전송, 타이머 전송"""
+import time
+
+from app.services.sheet_writer import BufferedSheetWriter
+
+
+class RecordingSheet:
+    def __init__(self):
+        self.batches = []
+
+    def batch_update(self, data, value_input_option=None):
+        self.batches.append([item["range"] for item in data])
+
+
+def test_batch_counts_rows_not_cells():
+    sheet = RecordingSheet()
+    writer = BufferedSheetWriter(sheet, batch_rows=2, flush_interval=0)
+
+    writer.update_cell(3, 17, "https://blog.naver.com/a/1")
+    writer.update_cell(3, 23, "1")
+    assert sheet.batches == []
+    assert writer.pending_count == 2
+
+    writer.update_cell(4, 23, "-")
+    assert sheet.batches == [["Q3", "W3", "W4"]]
+    assert writer.pending_count == 0
+
+
+def test_timer_flushes_without_further_writes():
+    sheet = RecordingSheet()
+    writer = BufferedSheetWriter(sheet, batch_rows=50, flush_interval=0.1)
+
+    writer.update_cell(3, 23, "1")
+    deadline = time.monotonic() + 2
+    while not sheet.batches and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert sheet.batches == [["W3"]]
+    assert writer.pending_count == 0
+    writer.close()
+
+
+def test_close_without_flush_drops_timer():
+    sheet = RecordingSheet()
+    writer = BufferedSheetWriter(sheet, batch_rows=50, flush_interval=0.05)
+
+    writer.update_cell(3, 23, "1")
+    writer.close(flush=False)
+    time.sleep(0.15)
+    assert sheet.batches == []
+
+    with BufferedSheetWriter(sheet, flush_interval=10) as buffered:
+        buffered.update_cell(5, 23, "2")
+    assert sheet.batches == [["W5"]]